@@ -0,0 +1,27 @@
+import pytest
+from django.core.cache import cache
+
+
+def pytest_sessionstart(session):
+    """Caches live in a temporary RUNTIME_DIR, not in the project tree.
+
+    Started before collection: importing test modules already touches the cache.
+    """
+    from core.testing import RuntimeDirectory
+
+    session.runtime_directory = RuntimeDirectory()
+    session.runtime_directory.__enter__()
+
+
+def pytest_sessionfinish(session):
+    runtime_directory = getattr(session, 'runtime_directory', None)
+    if runtime_directory is not None:
+        runtime_directory.__exit__()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Pages, counts and versions cached by one test must not leak into the next one."""
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,34 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+
+@pytest.fixture
+def large_dataset(django_user_model):
+    """Return the first author of a dataset with 20 authors, 5 groups and 500 posts."""
+    from posts.models import Group, Post
+    Group.objects.bulk_create(
+        Group(title=f'Группа {number}', slug=f'group-{number}', description='Описание группы')
+        for number in range(5)
+    )
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'author{number}', first_name='Имя', last_name=f'Фамилия {number}')
+        for number in range(20)
+    )
+    groups = list(Group.objects.all())
+    authors = list(django_user_model.objects.all())
+    Post.objects.bulk_create(
+        Post(text=f'Тестовый пост номер {number}', author=authors[number % 20], group=groups[number % 5])
+        for number in range(500)
+    )
+    call_command('rebuild_post_counters', verbosity=0)
+    cache.clear()
+    return authors[0]
+
+
+@pytest.fixture
+def query_budget(settings):
+    """Make QueryBudgetMiddleware raise instead of logging and return the budgets."""
+    settings.QUERY_BUDGET_RAISE = True
+    cache.clear()
+    return settings.QUERY_BUDGETS
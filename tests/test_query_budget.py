@@ -0,0 +1,41 @@
+from urllib.parse import urlsplit
+
+import pytest
+from django.core.cache import cache
+from django.urls import resolve, reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+def posts_urls(author):
+    post = author.posts.first()
+    return [
+        reverse('app_posts:index'),
+        reverse('app_posts:index') + '?page=10',
+        reverse('app_posts:group_list', kwargs={'slug': post.group.slug}),
+        reverse('app_posts:profile', kwargs={'username': author.username}),
+        reverse('app_posts:post_detail', kwargs={'post_id': post.pk}),
+        reverse('app_posts:post_create'),
+        reverse('app_posts:post_edit', kwargs={'post_id': post.pk}),
+    ]
+
+
+def view_budget(query_budget, url):
+    """Budget of the view the URL resolves to, not the largest budget."""
+    return query_budget[resolve(urlsplit(url).path).view_name]
+
+
+class TestQueryBudget:
+
+    def test_posts_urls_anonymous(self, client, large_dataset, query_budget, django_assert_max_num_queries):
+        for url in posts_urls(large_dataset):
+            cache.clear()
+            with django_assert_max_num_queries(view_budget(query_budget, url)):
+                client.get(url)
+
+    def test_posts_urls_author(self, client, large_dataset, query_budget, django_assert_max_num_queries):
+        client.force_login(large_dataset)
+        for url in posts_urls(large_dataset):
+            cache.clear()
+            with django_assert_max_num_queries(view_budget(query_budget, url)):
+                client.get(url)
@@ -1,7 +1,17 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(
     AppConfig
 ):
     name = 'core'
+
+    def ready(
+        self
+    ):
+        from . import auth  # noqa: F401
+        from .sqlite import apply_pragmas
+        connection_created.connect(
+            apply_pragmas
+        )
@@ -0,0 +1,175 @@
+"""Пользователь запроса из кэша вместо запроса к таблице пользователей.
+
+AuthenticationMiddleware на каждый запрос загружает пользователя по id из
+сессии. CachedModelBackend держит его в кэше AUTH_USER_CACHE_TIMEOUT
+секунд; сохранение или удаление пользователя (в том числе смена пароля)
+удаляет запись из кэша. Хэша пароля в кэше нет: там поля пользователя
+без password и готовый get_session_auth_hash(), который сверяется с
+сессией, поэтому смена пароля разлогинивает другие сессии. Сам пароль
+загружается из базы, только когда его нужно проверить.
+
+Все это верно, только если кэш общий для процессов сервера: запись,
+удаленная одним процессом, не должна остаться в памяти другого. Проверка
+cache_is_shared предупреждает о кэшах, которые живут внутри процесса.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.core.checks import Tags, Warning, register
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+User = get_user_model()
+
+# Кэши, содержимое которых видит только процесс, который их заполнил.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+# Поле, которое не попадает в кэш.
+PASSWORD_FIELD = 'password'
+
+
+def make_key(
+    user_id
+):
+    return f'auth:user:{user_id}'
+
+
+class SessionAuthHash:
+    """get_session_auth_hash() пользователя из кэша.
+
+    Пока пароль не загружен, возвращает хэш из кэша; после загрузки или
+    set_password считает его заново, как обычный пользователь.
+    """
+
+    def __init__(
+        self,
+        user,
+        value
+    ):
+        self.user = user
+        self.value = value
+
+    def __call__(
+        self
+    ):
+        if PASSWORD_FIELD in self.user.__dict__:
+            return type(self.user).get_session_auth_hash(
+                self.user
+            )
+        return self.value
+
+
+def dump_user(
+    user
+):
+    """Поля пользователя для кэша: все, кроме хэша пароля."""
+    return {
+        'db': user._state.db,
+        'fields': {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.attname != PASSWORD_FIELD
+        },
+        'session_auth_hash': user.get_session_auth_hash(),
+    }
+
+
+def load_user(
+    data
+):
+    """Пользователь из кэша; password отложен и читается из базы."""
+    user = User.from_db(
+        data['db'],
+        list(data['fields']),
+        list(data['fields'].values())
+    )
+    user.get_session_auth_hash = SessionAuthHash(
+        user,
+        data['session_auth_hash']
+    )
+    return user
+
+
+class CachedModelBackend(
+    ModelBackend
+):
+    def get_user(
+        self,
+        user_id
+    ):
+        key = make_key(
+            user_id
+        )
+        data = cache.get(
+            key
+        )
+        if data is None:
+            user = super().get_user(
+                user_id
+            )
+            if user is None:
+                return None
+            cache.set(
+                key,
+                dump_user(
+                    user
+                ),
+                settings.AUTH_USER_CACHE_TIMEOUT
+            )
+        else:
+            user = load_user(
+                data
+            )
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(
+    post_save,
+    sender=User
+)
+@receiver(
+    post_delete,
+    sender=User
+)
+def forget_user(
+    sender,
+    instance,
+    **kwargs
+):
+    cache.delete(
+        make_key(
+            instance.pk
+        )
+    )
+
+
+@register(
+    Tags.caches
+)
+def cache_is_shared(
+    app_configs,
+    **kwargs
+):
+    """Сессии, пользователи и версии страниц должны быть в общем кэше."""
+    aliases = {
+        DEFAULT_CACHE_ALIAS,
+        settings.SESSION_CACHE_ALIAS,
+    }
+    return [
+        Warning(
+            f'Кэш {alias!r} хранится в памяти процесса.',
+            hint=(
+                'Выход, смена пароля и изменения постов не дойдут до '
+                'других процессов сервера: выберите общий кэш '
+                '(FileBasedCache, memcached).'
+            ),
+            id='core.W001'
+        )
+        for alias in sorted(aliases)
+        if settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_CACHES
+    ]
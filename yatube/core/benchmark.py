@@ -0,0 +1,250 @@
+"""Нагрузочный замер страниц через тестовый клиент Django."""
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from statistics import mean
+
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from .query_budget import QueryCounter
+
+
+class Route:
+    """Страница для замера: имя URL, его аргументы и нужен ли вход."""
+
+    def __init__(
+        self,
+        name,
+        kwargs=None,
+        login=False,
+        query='',
+        label=None
+    ):
+        self.name = name
+        self.kwargs = kwargs or {}
+        self.login = login
+        self.query = query
+        self._label = label
+
+    @property
+    def label(
+        self
+    ):
+        if self._label:
+            return self._label
+        if self.query:
+            return f'{self.name}?{self.query}'
+        return self.name
+
+    @property
+    def url(
+        self
+    ):
+        url = reverse(
+            self.name,
+            kwargs=self.kwargs
+        )
+        if self.query:
+            url = f'{url}?{self.query}'
+        return url
+
+
+@contextmanager
+def temporary_database():
+    """Временная тестовая база вместо текущей на время замера."""
+    old_name = connection.settings_dict['NAME']
+    directory = tempfile.TemporaryDirectory()
+    if connection.vendor == 'sqlite':
+        # Общая база в памяти блокирует таблицы целиком, и параллельные
+        # клиенты падали бы на записи; нужен настоящий файл.
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            directory.name,
+            'benchmark.sqlite3'
+        )
+    connection.creation.create_test_db(
+        verbosity=0,
+        autoclobber=True
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(
+            old_name,
+            verbosity=0
+        )
+        directory.cleanup()
+
+
+def percentile(
+    values,
+    percent
+):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(
+        values
+    )
+    rank = math.ceil(
+        percent / 100 * len(ordered)
+    )
+    return ordered[max(rank, 1) - 1]
+
+
+def measure_requests(
+    route,
+    user,
+    requests
+):
+    """Выполняет requests запросов к маршруту одним клиентом."""
+    client = Client()
+    if route.login:
+        client.force_login(
+            user
+        )
+    url = route.url
+    samples = []
+    counter = QueryCounter()
+    try:
+        for _ in range(requests):
+            counter.count = 0
+            with connections['default'].execute_wrapper(counter):
+                started = time.perf_counter()
+                response = client.get(
+                    url
+                )
+                elapsed = time.perf_counter() - started
+            samples.append(
+                (
+                    elapsed,
+                    counter.count,
+                    len(response.content),
+                    response.status_code,
+                )
+            )
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connections.close_all()
+    return samples
+
+
+def run_route(
+    route,
+    user,
+    requests,
+    concurrency
+):
+    """Гоняет маршрут concurrency клиентами и сводит метрики."""
+    per_client = max(
+        requests // concurrency,
+        1
+    )
+    started = time.perf_counter()
+    if concurrency == 1:
+        batches = [
+            measure_requests(
+                route,
+                user,
+                per_client
+            )
+        ]
+    else:
+        with ThreadPoolExecutor(concurrency) as executor:
+            batches = list(
+                executor.map(
+                    lambda _: measure_requests(
+                        route,
+                        user,
+                        per_client
+                    ),
+                    range(concurrency)
+                )
+            )
+    wall_time = time.perf_counter() - started
+    samples = [
+        sample for batch in batches for sample in batch
+    ]
+    latencies = [
+        sample[0] * 1000 for sample in samples
+    ]
+    return {
+        'url': route.url,
+        'requests': len(samples),
+        'errors': sum(
+            1 for sample in samples if sample[3] >= 400
+        ),
+        'p50_ms': percentile(
+            latencies,
+            50
+        ),
+        'p95_ms': percentile(
+            latencies,
+            95
+        ),
+        'p99_ms': percentile(
+            latencies,
+            99
+        ),
+        'throughput_rps': len(samples) / wall_time,
+        'queries': mean(
+            sample[1] for sample in samples
+        ),
+        'bytes': mean(
+            sample[2] for sample in samples
+        ),
+    }
+
+
+def compare(
+    results,
+    baseline,
+    threshold
+):
+    """Маршруты, у которых p95 или пропускная способность хуже базовых.
+
+    threshold — допустимое ухудшение в долях (0.1 — на 10%).
+    """
+    regressions = []
+    for name, current in results['routes'].items():
+        previous = baseline.get(
+            'routes',
+            {}
+        ).get(
+            name
+        )
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append(
+                (
+                    name,
+                    'p95_ms',
+                    previous['p95_ms'],
+                    current['p95_ms'],
+                )
+            )
+        if current['throughput_rps'] < (
+            previous['throughput_rps'] * (1 - threshold)
+        ):
+            regressions.append(
+                (
+                    name,
+                    'throughput_rps',
+                    previous['throughput_rps'],
+                    current['throughput_rps'],
+                )
+            )
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                (
+                    name,
+                    'queries',
+                    previous['queries'],
+                    current['queries'],
+                )
+            )
+    return regressions
@@ -0,0 +1,56 @@
+import time
+
+from django.core.cache import cache
+
+KEY_PREFIX = 'version'
+
+
+def make_key(
+    scope
+):
+    return f'{KEY_PREFIX}:{scope}'
+
+
+def get_versions(
+    *scopes
+):
+    """Текущие версии областей кэша: {область: время последнего изменения}.
+
+    Если версии нет в кэше (например, ее вытеснили), она создается заново
+    с текущим временем, поэтому зависимые записи считаются устаревшими.
+    """
+    keys = {
+        make_key(scope): scope for scope in scopes
+    }
+    found = cache.get_many(
+        keys
+    )
+    versions = {
+        keys[key]: value for key, value in found.items()
+    }
+    for key, scope in keys.items():
+        if scope in versions:
+            continue
+        cache.add(
+            key,
+            time.time(),
+            None
+        )
+        versions[scope] = cache.get(
+            key,
+            time.time()
+        )
+    return versions
+
+
+def bump_versions(
+    *scopes
+):
+    """Помечает все данные, закэшированные для областей scopes, устаревшими."""
+    now = time.time()
+    cache.set_many(
+        {
+            make_key(scope): now for scope in scopes
+        },
+        None
+    )
@@ -0,0 +1,174 @@
+"""Чтение с реплик для GET-запросов и запись в основную базу.
+
+ReplicaMiddleware решает, можно ли читать с реплики: только для
+GET/HEAD-запросов к view из settings.REPLICA_READ_VIEWS. ReplicaRouter
+выполняет это решение. После записи ответ получает cookie, и пока она
+жива (REPLICA_PIN_SECONDS), запросы клиента читают из default: так
+пользователь сразу видит свои изменения, даже если реплика отстает.
+"""
+import os
+import random
+import threading
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+PIN_COOKIE = 'pin_primary'
+
+# Данные, которые нужны сразу после записи, всегда читаются из default.
+PRIMARY_ONLY_APPS = (
+    'sessions',
+)
+
+_state = threading.local()
+
+
+def get_replica():
+    """Реплика, выбранная для текущего запроса, или None."""
+    if getattr(_state, 'wrote', False):
+        return None
+    return getattr(
+        _state,
+        'replica',
+        None
+    )
+
+
+def replica_version(
+    alias
+):
+    """Версия снимка реплики: время изменения ее файла.
+
+    Обновление (core.replica) подменяет файл, поэтому каждый процесс
+    сервера сам замечает новый снимок, где бы ни запускалось обновление.
+    """
+    try:
+        return os.stat(
+            connections[alias].settings_dict['NAME']
+        ).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def open_snapshot(
+    alias
+):
+    """Версия реплики для запроса; соединение со старым снимком закрывается.
+
+    Соединение, открытое до обновления (например, при CONN_MAX_AGE у
+    реплики), держит подмененный файл и читало бы из него старые данные.
+    """
+    version = replica_version(
+        alias
+    )
+    connection = connections[alias]
+    if getattr(connection, 'replica_version', None) != version:
+        connection.close()
+    connection.replica_version = version
+    return version
+
+
+def record_write():
+    """Отмечает запись: до конца запроса и по cookie читаем из default."""
+    _state.wrote = True
+
+
+class ReplicaRouter:
+    def db_for_read(
+        self,
+        model,
+        **hints
+    ):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY
+        return get_replica() or PRIMARY
+
+    def db_for_write(
+        self,
+        model,
+        **hints
+    ):
+        record_write()
+        return PRIMARY
+
+    def allow_relation(
+        self,
+        obj1,
+        obj2,
+        **hints
+    ):
+        # Реплики — копии default, объекты из них можно связывать.
+        return True
+
+    def allow_migrate(
+        self,
+        db,
+        app_label,
+        model_name=None,
+        **hints
+    ):
+        return db == PRIMARY
+
+
+class ReplicaMiddleware:
+    def __init__(
+        self,
+        get_response
+    ):
+        self.get_response = get_response
+
+    def __call__(
+        self,
+        request
+    ):
+        _state.replica = None
+        _state.wrote = False
+        try:
+            response = self.get_response(
+                request
+            )
+            wrote = _state.wrote
+        finally:
+            _state.replica = None
+            _state.wrote = False
+        if wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    def process_view(
+        self,
+        request,
+        view_func,
+        view_args,
+        view_kwargs
+    ):
+        replicas = getattr(
+            settings,
+            'DATABASE_REPLICAS',
+            ()
+        )
+        if (
+            replicas
+            and request.method in ('GET', 'HEAD')
+            and view_func.__module__ in settings.REPLICA_READ_VIEWS
+            and PIN_COOKIE not in request.COOKIES
+        ):
+            # Одна реплика на весь запрос: все чтения видят один снимок.
+            _state.replica = random.choice(
+                replicas
+            )
+            # Страницы с реплики кэшируются отдельно от страниц из
+            # default и для каждого снимка реплики свои.
+            request.page_cache_variant = 'replica-{}-{}-'.format(
+                _state.replica,
+                open_snapshot(
+                    _state.replica
+                )
+            )
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.prerender import render_pages, save_pages, template_fingerprint
+
+
+class Command(
+    BaseCommand
+):
+    help = (
+        'Рендерит страницы из settings.PRERENDERED_PAGES и сохраняет их '
+        'в PRERENDER_ROOT для core.prerender.PrerenderedPagesMiddleware.'
+    )
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            '--output',
+            default=settings.PRERENDER_ROOT,
+            help='Каталог для страниц; по умолчанию PRERENDER_ROOT.'
+        )
+
+    def handle(
+        self,
+        *args,
+        **options
+    ):
+        fingerprint = template_fingerprint()
+        pages = render_pages()
+        save_pages(
+            options['output'],
+            fingerprint,
+            pages
+        )
+        if options['verbosity'] >= 1:
+            self.stdout.write(
+                'Страниц отрендерено: {} в {}'.format(
+                    len(pages),
+                    options['output']
+                )
+            )
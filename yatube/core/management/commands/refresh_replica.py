@@ -0,0 +1,70 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replica import refresh_replica
+
+
+class Command(
+    BaseCommand
+):
+    help = (
+        'Обновляет SQLite-копии основной базы, которые служат '
+        'репликами для чтения (settings.DATABASE_REPLICAS).'
+    )
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            'aliases',
+            nargs='*',
+            help='Псевдонимы реплик; по умолчанию DATABASE_REPLICAS.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Обновлять каждые столько секунд, пока не остановят.'
+        )
+
+    def handle(
+        self,
+        *args,
+        aliases,
+        interval,
+        **options
+    ):
+        aliases = aliases or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError(
+                'Не указаны реплики, и settings.DATABASE_REPLICAS пуст.'
+            )
+        unknown = set(
+            aliases
+        ) - set(
+            settings.DATABASES
+        )
+        if unknown:
+            raise CommandError(
+                'Нет таких баз: {}'.format(
+                    ', '.join(sorted(unknown))
+                )
+            )
+        while True:
+            started = time.perf_counter()
+            for alias in aliases:
+                refresh_replica(
+                    alias
+                )
+            elapsed = time.perf_counter() - started
+            if options['verbosity'] >= 1:
+                self.stdout.write(
+                    f'Реплики обновлены за {elapsed:.2f} с'
+                )
+            if interval is None:
+                return
+            time.sleep(
+                max(interval - elapsed, 0)
+            )
@@ -0,0 +1,498 @@
+"""Метрики запросов в текстовом формате Prometheus.
+
+MetricsMiddleware стоит первым и для каждого имени view (например,
+app_posts:index) записывает гистограмму времени ответа, число и время
+SQL-запросов, время рендера шаблонов и размер ответа. Время шаблонов
+считает бэкенд DjangoTemplates из этого модуля. Страница /metrics
+доступна сотрудникам и сборщику с токеном METRICS_TOKEN.
+
+Метрики хранятся в файле METRICS_SHARED_FILE (core.shared_metrics) и
+видны на /metrics со всех процессов WSGI-сервера сразу.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connections
+from django.http import HttpResponse
+from django.template.backends import django as django_backend
+from django.utils.crypto import constant_time_compare
+
+from . import query_budget
+from .shared_metrics import SharedRegistry
+from .write_queue import write_queue
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Метрики очереди записей, которые только растут.
+WRITE_QUEUE_COUNTERS = (
+    'submitted',
+    'completed',
+    'failed',
+    'batches',
+    'retries',
+    'timeouts',
+)
+
+# Метрики текущего запроса в потоке, который его обрабатывает.
+local = threading.local()
+
+
+class RequestMetrics:
+    """Счетчики одного запроса; заодно execute_wrapper для SQL."""
+
+    def __init__(
+        self
+    ):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.rendering = False
+
+    def __call__(
+        self,
+        execute,
+        sql,
+        params,
+        many,
+        context
+    ):
+        start = time.perf_counter()
+        try:
+            return execute(
+                sql,
+                params,
+                many,
+                context
+            )
+        finally:
+            self.queries += 1
+            self.query_seconds += time.perf_counter() - start
+
+
+class Registry:
+    """Метрики одного процесса по именам view."""
+
+    def __init__(
+        self
+    ):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(
+        self,
+        view,
+        status,
+        duration,
+        metrics,
+        response_bytes
+    ):
+        bucket = bisect_left(
+            settings.METRICS_LATENCY_BUCKETS,
+            duration
+        )
+        with self.lock:
+            view_metrics = self.views.get(
+                view
+            )
+            if view_metrics is None:
+                view_metrics = self.views[view] = {
+                    'responses': {},
+                    'buckets': [0] * (
+                        len(settings.METRICS_LATENCY_BUCKETS) + 1
+                    ),
+                    'duration_seconds': 0.0,
+                    'queries': 0,
+                    'query_seconds': 0.0,
+                    'template_seconds': 0.0,
+                    'response_bytes': 0,
+                }
+            responses = view_metrics['responses']
+            responses[status] = responses.get(status, 0) + 1
+            view_metrics['buckets'][bucket] += 1
+            view_metrics['duration_seconds'] += duration
+            view_metrics['queries'] += metrics.queries
+            view_metrics['query_seconds'] += metrics.query_seconds
+            view_metrics['template_seconds'] += metrics.template_seconds
+            view_metrics['response_bytes'] += response_bytes
+
+    def collect(
+        self
+    ):
+        """Копия метрик: {view: {...}}."""
+        with self.lock:
+            return {
+                view: {
+                    **view_metrics,
+                    'responses': dict(view_metrics['responses']),
+                    'buckets': list(view_metrics['buckets']),
+                }
+                for view, view_metrics in self.views.items()
+            }
+
+    def clear(
+        self
+    ):
+        with self.lock:
+            self.views.clear()
+
+
+# Хранилища метрик по пути файла; None — метрики только этого процесса.
+registries = {}
+
+
+def get_registry():
+    """Хранилище метрик из settings.METRICS_SHARED_FILE."""
+    path = settings.METRICS_SHARED_FILE
+    registry = registries.get(
+        path
+    )
+    if registry is None:
+        registry = registries[path] = (
+            SharedRegistry(path) if path else Registry()
+        )
+    return registry
+
+
+def view_name(
+    request
+):
+    match = getattr(
+        request,
+        'resolver_match',
+        None
+    )
+    if match is not None:
+        return match.view_name
+    if request.path_info.startswith(settings.STATIC_URL):
+        return 'static'
+    return 'unresolved'
+
+
+def response_size(
+    response
+):
+    if response.streaming:
+        # Файлы статики отдаются потоком, но длину знают заранее.
+        return int(
+            response.get('Content-Length', 0)
+        )
+    return len(
+        response.content
+    )
+
+
+class MetricsMiddleware:
+    def __init__(
+        self,
+        get_response
+    ):
+        self.get_response = get_response
+
+    def __call__(
+        self,
+        request
+    ):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(
+                request
+            )
+        metrics = local.current = RequestMetrics()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(
+                            metrics
+                        )
+                    )
+                response = self.get_response(
+                    request
+                )
+        finally:
+            local.current = None
+        get_registry().record(
+            view_name(request),
+            response.status_code,
+            time.perf_counter() - start,
+            metrics,
+            response_size(response)
+        )
+        return response
+
+
+class Template(
+    django_backend.Template
+):
+    def render(
+        self,
+        context=None,
+        request=None
+    ):
+        metrics = getattr(
+            local,
+            'current',
+            None
+        )
+        # Вложенный render_to_string уже учтен во внешнем шаблоне.
+        if metrics is None or metrics.rendering:
+            return super().render(
+                context,
+                request
+            )
+        metrics.rendering = True
+        start = time.perf_counter()
+        try:
+            return super().render(
+                context,
+                request
+            )
+        finally:
+            metrics.template_seconds += time.perf_counter() - start
+            metrics.rendering = False
+
+
+class DjangoTemplates(
+    django_backend.DjangoTemplates
+):
+    """Шаблоны Django с замером времени рендера для MetricsMiddleware."""
+
+    def from_string(
+        self,
+        template_code
+    ):
+        return Template(
+            super().from_string(template_code).template,
+            self
+        )
+
+    def get_template(
+        self,
+        template_name
+    ):
+        return Template(
+            super().get_template(template_name).template,
+            self
+        )
+
+
+def escape(
+    value
+):
+    return str(
+        value
+    ).replace(
+        '\\', '\\\\'
+    ).replace(
+        '"', '\\"'
+    ).replace(
+        '\n', '\\n'
+    )
+
+
+def format_value(
+    value
+):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Exposition:
+    """Собирает текст в формате Prometheus."""
+
+    def __init__(
+        self
+    ):
+        self.lines = []
+
+    def metric(
+        self,
+        name,
+        kind,
+        help_text
+    ):
+        self.lines.append(
+            f'# HELP {name} {help_text}'
+        )
+        self.lines.append(
+            f'# TYPE {name} {kind}'
+        )
+
+    def sample(
+        self,
+        name,
+        value,
+        **labels
+    ):
+        if labels:
+            name += '{{{}}}'.format(
+                ','.join(
+                    f'{label}="{escape(label_value)}"'
+                    for label, label_value in labels.items()
+                )
+            )
+        self.lines.append(
+            f'{name} {format_value(value)}'
+        )
+
+    def text(
+        self
+    ):
+        return '\n'.join(
+            self.lines
+        ) + '\n'
+
+
+def expose_views(
+    exposition,
+    views
+):
+    bounds = settings.METRICS_LATENCY_BUCKETS
+    name = 'yatube_http_requests_total'
+    exposition.metric(
+        name,
+        'counter',
+        'Ответы по view и коду ответа.'
+    )
+    for view, metrics in sorted(views.items()):
+        for status, count in sorted(
+            metrics['responses'].items(),
+            key=str
+        ):
+            exposition.sample(
+                name,
+                count,
+                view=view,
+                status=status
+            )
+    name = 'yatube_http_request_duration_seconds'
+    exposition.metric(
+        name,
+        'histogram',
+        'Время ответа view.'
+    )
+    for view, metrics in sorted(views.items()):
+        total = 0
+        for bound, count in zip((*bounds, '+Inf'), metrics['buckets']):
+            total += count
+            exposition.sample(
+                f'{name}_bucket',
+                total,
+                view=view,
+                le=bound
+            )
+        exposition.sample(
+            f'{name}_sum',
+            metrics['duration_seconds'],
+            view=view
+        )
+        exposition.sample(
+            f'{name}_count',
+            total,
+            view=view
+        )
+    for key, name, help_text in (
+        ('queries', 'yatube_db_queries_total', 'SQL-запросы view.'),
+        (
+            'query_seconds',
+            'yatube_db_query_seconds_total',
+            'Время SQL-запросов view.'
+        ),
+        (
+            'template_seconds',
+            'yatube_template_render_seconds_total',
+            'Время рендера шаблонов view.'
+        ),
+        (
+            'response_bytes',
+            'yatube_http_response_bytes_total',
+            'Размер ответов view.'
+        ),
+    ):
+        exposition.metric(
+            name,
+            'counter',
+            help_text
+        )
+        for view, metrics in sorted(views.items()):
+            exposition.sample(
+                name,
+                metrics[key],
+                view=view
+            )
+
+
+def expose_process(
+    exposition
+):
+    """Статистика очереди записей и бюджетов запросов этого процесса."""
+    for key, value in sorted(write_queue.metrics().items()):
+        if key in WRITE_QUEUE_COUNTERS:
+            name = f'yatube_write_queue_{key}_total'
+            kind = 'counter'
+        else:
+            name = f'yatube_write_queue_{key}'
+            kind = 'gauge'
+        exposition.metric(
+            name,
+            kind,
+            f'Очередь записей: {key}.'
+        )
+        exposition.sample(
+            name,
+            value
+        )
+    name = 'yatube_view_max_queries'
+    exposition.metric(
+        name,
+        'gauge',
+        'Наибольшее число SQL-запросов view за один запрос.'
+    )
+    for view, view_stats in sorted(query_budget.stats.items()):
+        exposition.sample(
+            name,
+            view_stats['max_queries'],
+            view=view
+        )
+
+
+def has_access(
+    request
+):
+    token = settings.METRICS_TOKEN
+    if token:
+        scheme, _, value = request.META.get(
+            'HTTP_AUTHORIZATION',
+            ''
+        ).partition(' ')
+        if scheme == 'Bearer' and constant_time_compare(value, token):
+            return True
+    user = getattr(
+        request,
+        'user',
+        None
+    )
+    return user is not None and user.is_active and user.is_staff
+
+
+def metrics_view(
+    request
+):
+    """Метрики для Prometheus: только сотрудникам и по METRICS_TOKEN."""
+    if not has_access(request):
+        raise PermissionDenied
+    exposition = Exposition()
+    expose_views(
+        exposition,
+        get_registry().collect()
+    )
+    expose_process(
+        exposition
+    )
+    return HttpResponse(
+        exposition.text(),
+        content_type=CONTENT_TYPE
+    )
@@ -0,0 +1,263 @@
+import hashlib
+import zlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache_versions import get_versions
+
+# Место в закэшированной странице, куда подставляется меню пользователя.
+USER_MENU_HOLE = '<!--page-cache:user-menu-->'
+USER_MENU_TEMPLATE = 'includes/header_user.html'
+
+
+def render_user_menu(
+    request
+):
+    return render_to_string(
+        USER_MENU_TEMPLATE,
+        request=request
+    )
+
+
+def fill_holes(
+    request,
+    content
+):
+    return content.replace(
+        USER_MENU_HOLE,
+        render_user_menu(
+            request
+        ),
+        1
+    )
+
+
+def add_scopes(
+    request,
+    *scopes
+):
+    """Добавляет странице области, при изменении которых ее кэш сбросится.
+
+    Вызывается из view, когда зависимость становится известна только
+    после загрузки данных.
+    """
+    if hasattr(request, 'page_cache_scopes'):
+        request.page_cache_scopes.extend(
+            scopes
+        )
+
+
+def make_key(
+    request
+):
+    """Ключ страницы: ее адрес и вариант рендера (request.page_cache_variant).
+
+    Вариант задает middleware, если одна и та же страница может быть
+    собрана из разных источников, например с реплики базы.
+    """
+    return 'page:{}{}'.format(
+        getattr(
+            request,
+            'page_cache_variant',
+            ''
+        ),
+        hashlib.md5(
+            request.get_full_path().encode()
+        ).hexdigest()
+    )
+
+
+def get_validators(
+    request,
+    key,
+    versions
+):
+    """ETag и Last-Modified страницы по версиям ее областей кэша.
+
+    Версия области — время ее последнего изменения, поэтому самая свежая
+    из них и есть время изменения страницы. В ETag входит еще имя
+    пользователя: от него зависит меню в шапке. Версии лежат в общем
+    кэше, поэтому все процессы сервера дают странице один и тот же ETag.
+    """
+    user = request.user.get_username() if (
+        request.user.is_authenticated
+    ) else ''
+    etag = hashlib.md5(
+        '{}|{}|{}'.format(
+            key,
+            sorted(
+                versions.items()
+            ),
+            user
+        ).encode()
+    ).hexdigest()
+    return quote_etag(etag), int(max(versions.values(), default=0))
+
+
+def set_validators(
+    response,
+    etag,
+    last_modified
+):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(
+        last_modified
+    )
+    return response
+
+
+def cached_page(
+    scopes
+):
+    """Кэширует страницу целиком, сжатой, без зависимой от пользователя части.
+
+    scopes(request, **kwargs) возвращает области кэша страницы; запись
+    действительна, пока не изменилась версия ни одной из них
+    (core.cache_versions). Меню пользователя из шапки в кэш не попадает:
+    при рендере на его месте остается метка, которая заполняется для
+    каждого запроса, поэтому кэш обслуживает и анонимов, и авторизованных.
+
+    Ответы получают ETag и Last-Modified (get_validators). Если запись
+    в кэше действительна и у клиента та же версия страницы, ответ 304
+    отдается без запросов к данным и без рендера.
+    """
+    def decorator(
+        view_func
+    ):
+        @wraps(view_func)
+        def wrapper(
+            request,
+            *args,
+            **kwargs
+        ):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(
+                    request,
+                    *args,
+                    **kwargs
+                )
+            key = make_key(
+                request
+            )
+            entry = cache.get(
+                key
+            )
+            if entry is not None:
+                body, content_type, versions = entry
+                if get_versions(*versions) == versions:
+                    etag, last_modified = get_validators(
+                        request,
+                        key,
+                        versions
+                    )
+                    response = get_conditional_response(
+                        request,
+                        etag=etag,
+                        last_modified=last_modified
+                    )
+                    if response is not None:
+                        response['X-Page-Cache'] = 'hit'
+                        return set_validators(
+                            response,
+                            etag,
+                            last_modified
+                        )
+                    response = HttpResponse(
+                        fill_holes(
+                            request,
+                            zlib.decompress(
+                                body
+                            ).decode()
+                        ),
+                        content_type=content_type
+                    )
+                    response['X-Page-Cache'] = 'hit'
+                    return set_validators(
+                        response,
+                        etag,
+                        last_modified
+                    )
+
+            # Области, добавленные middleware до view, сохраняются.
+            request.page_cache_scopes = [
+                *scopes(
+                    request,
+                    *args,
+                    **kwargs
+                ),
+                *getattr(
+                    request,
+                    'page_cache_scopes',
+                    ()
+                ),
+            ]
+            versions = get_versions(
+                *request.page_cache_scopes
+            )
+            request.punch_holes = True
+            try:
+                response = view_func(
+                    request,
+                    *args,
+                    **kwargs
+                )
+            finally:
+                request.punch_holes = False
+            if response.status_code != 200 or response.streaming:
+                return response
+            content = response.content.decode(
+                response.charset
+            )
+            if response.cookies:
+                response.content = fill_holes(
+                    request,
+                    content
+                )
+                return response
+            versions.update(
+                get_versions(
+                    *(
+                        scope for scope in request.page_cache_scopes
+                        if scope not in versions
+                    )
+                )
+            )
+            cache.set(
+                key,
+                (
+                    zlib.compress(
+                        content.encode()
+                    ),
+                    response['Content-Type'],
+                    versions
+                ),
+                settings.PAGE_CACHE_TIMEOUT
+            )
+            response.content = fill_holes(
+                request,
+                content
+            )
+            response['X-Page-Cache'] = 'miss'
+            etag, last_modified = get_validators(
+                request,
+                key,
+                versions
+            )
+            return get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=last_modified,
+                response=set_validators(
+                    response,
+                    etag,
+                    last_modified
+                )
+            )
+        return wrapper
+    return decorator
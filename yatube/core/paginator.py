@@ -0,0 +1,356 @@
+import base64
+import binascii
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .cache_versions import get_versions
+
+
+class InvalidCursor(
+    InvalidPage
+):
+    pass
+
+
+class ElidedPageRangeMixin:
+    """Окно номеров страниц вокруг текущей вместо полного page_range.
+
+    Повторяет Paginator.get_elided_page_range из Django 3.2.
+    """
+
+    ELLIPSIS = '…'
+
+    def get_elided_page_range(
+        self,
+        number=1,
+        *,
+        on_each_side=3,
+        on_ends=2
+    ):
+        number = self.validate_number(
+            number
+        )
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > (1 + on_each_side + on_ends) + 1:
+            yield from range(
+                1,
+                on_ends + 1
+            )
+            yield self.ELLIPSIS
+            yield from range(
+                number - on_each_side,
+                number + 1
+            )
+        else:
+            yield from range(
+                1,
+                number + 1
+            )
+        if number < (self.num_pages - on_each_side - on_ends) - 1:
+            yield from range(
+                number + 1,
+                number + on_each_side + 1
+            )
+            yield self.ELLIPSIS
+            yield from range(
+                self.num_pages - on_ends + 1,
+                self.num_pages + 1
+            )
+        else:
+            yield from range(
+                number + 1,
+                self.num_pages + 1
+            )
+
+
+class CountedPaginator(
+    ElidedPageRangeMixin,
+    Paginator
+):
+    """Paginator, которому можно передать уже известное число объектов.
+
+    Например, хранимый счетчик вместо отдельного SELECT COUNT(*).
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        count=None,
+        **kwargs
+    ):
+        super().__init__(
+            object_list,
+            per_page,
+            **kwargs
+        )
+        self.known_count = count
+
+    @cached_property
+    def count(
+        self
+    ):
+        if self.known_count is not None:
+            return self.known_count
+        return super().count
+
+
+class CachedCountPaginator(
+    CountedPaginator
+):
+    """Paginator, который берет число объектов из кэша.
+
+    Ключ кэша строится по SQL запроса, то есть по его фильтрам, и по версии
+    модели: сигналы сохранения и удаления меняют версию, и счетчик
+    пересчитывается. Для больших выборок (не меньше
+    PAGINATOR_APPROXIMATE_COUNT_THRESHOLD) устаревшее значение еще
+    PAGINATOR_APPROXIMATE_COUNT_TIMEOUT секунд отдается как приблизительное,
+    вместо нового SELECT COUNT(*) после каждого поста.
+    """
+
+    @cached_property
+    def count(
+        self
+    ):
+        if self.known_count is not None:
+            return self.known_count
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        scope = self.object_list.model._meta.label_lower
+        version = get_versions(
+            scope
+        )[scope]
+        try:
+            sql = str(
+                self.object_list.order_by().query
+            )
+        except EmptyResultSet:
+            return 0
+        key = 'paginator_count:{}'.format(
+            hashlib.md5(
+                sql.encode()
+            ).hexdigest()
+        )
+        cached = cache.get(
+            key
+        )
+        if cached is not None:
+            count, cached_version, counted_at = cached
+            if cached_version == version:
+                return count
+            if (
+                count >= settings.PAGINATOR_APPROXIMATE_COUNT_THRESHOLD
+                and time.time() - counted_at
+                < settings.PAGINATOR_APPROXIMATE_COUNT_TIMEOUT
+            ):
+                return count
+        count = self.object_list.count()
+        cache.set(
+            key,
+            (
+                count,
+                version,
+                time.time()
+            ),
+            settings.PAGINATOR_COUNT_CACHE_TIMEOUT
+        )
+        return count
+
+
+class CursorPage(
+    Page
+):
+    """Страница, которая знает только соседей, но не общее число страниц."""
+
+    is_cursor = True
+
+    def __init__(
+        self,
+        object_list,
+        paginator,
+        next_cursor=None,
+        previous_cursor=None
+    ):
+        super().__init__(
+            object_list,
+            None,
+            paginator
+        )
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(
+        self
+    ):
+        return '<Cursor page>'
+
+    def has_next(
+        self
+    ):
+        return self.next_cursor is not None
+
+    def has_previous(
+        self
+    ):
+        return self.previous_cursor is not None
+
+
+class CursorPaginator(
+    Paginator
+):
+    """Keyset-пагинация по паре (pub_date, pk) от новых записей к старым.
+
+    Страница выбирается условием по индексу вместо OFFSET и не требует
+    COUNT(*), поэтому глубокие страницы стоят столько же, сколько первая.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        date_field='pub_date'
+    ):
+        self.date_field = date_field
+        super().__init__(
+            object_list.order_by(
+                f'-{date_field}',
+                '-pk'
+            ),
+            per_page
+        )
+
+    def encode_cursor(
+        self,
+        obj
+    ):
+        value = '{}|{}'.format(
+            getattr(
+                obj,
+                self.date_field
+            ).isoformat(),
+            obj.pk
+        )
+        return base64.urlsafe_b64encode(
+            value.encode()
+        ).decode()
+
+    def decode_cursor(
+        self,
+        cursor
+    ):
+        try:
+            value = base64.urlsafe_b64decode(
+                cursor.encode()
+            ).decode()
+            date, pk = value.rsplit(
+                '|',
+                1
+            )
+            date = parse_datetime(
+                date
+            )
+            pk = int(
+                pk
+            )
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidCursor(
+                'Некорректный курсор страницы'
+            )
+        if date is None:
+            raise InvalidCursor(
+                'Некорректный курсор страницы'
+            )
+        return date, pk
+
+    def _older_than(
+        self,
+        date,
+        pk
+    ):
+        # Условие pub_date <= date задает диапазон по индексу,
+        # а второе условие отсекает уже показанные записи.
+        return self.object_list.filter(
+            Q(**{f'{self.date_field}__lt': date}) | Q(pk__lt=pk),
+            **{f'{self.date_field}__lte': date}
+        )
+
+    def _newer_than(
+        self,
+        date,
+        pk
+    ):
+        return self.object_list.filter(
+            Q(**{f'{self.date_field}__gt': date}) | Q(pk__gt=pk),
+            **{f'{self.date_field}__gte': date}
+        ).order_by(
+            self.date_field,
+            'pk'
+        )
+
+    def cursor_page(
+        self,
+        after=None,
+        before=None
+    ):
+        """Страница записей старше курсора after или новее курсора before."""
+        if before:
+            rows = list(
+                self._newer_than(
+                    *self.decode_cursor(
+                        before
+                    )
+                )[:self.per_page + 1]
+            )
+            if not rows:
+                return self.cursor_page()
+            has_newer = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_older = True
+        else:
+            queryset = self.object_list
+            if after:
+                queryset = self._older_than(
+                    *self.decode_cursor(
+                        after
+                    )
+                )
+            rows = list(
+                queryset[:self.per_page + 1]
+            )
+            has_older = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_newer = bool(after) and bool(rows)
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(
+                rows[-1]
+            ) if has_older else None,
+            previous_cursor=self.encode_cursor(
+                rows[0]
+            ) if has_newer else None
+        )
+
+    def get_cursor_page(
+        self,
+        after=None,
+        before=None
+    ):
+        """Как cursor_page, но при неверном курсоре отдает первую страницу."""
+        try:
+            return self.cursor_page(
+                after,
+                before
+            )
+        except InvalidCursor:
+            return self.cursor_page()
@@ -0,0 +1,324 @@
+"""Заранее отрендеренные статические страницы (settings.PRERENDERED_PAGES).
+
+Страницы рендерятся один раз для анонима, с меткой USER_MENU_HOLE на
+месте меню пользователя. Команда prerender_pages сохраняет их в
+PRERENDER_ROOT вместе с отпечатком шаблонов проекта. PrerenderedPages-
+Middleware отдает их раньше сессий и пользователя: меню заполняется
+только для запросов с cookie сессии. Если шаблоны изменились, страницы
+рендерятся заново прямо в процессе.
+"""
+import hashlib
+import json
+import os
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+from django.urls import resolve, reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.utils.module_loading import import_string
+
+from .page_cache import USER_MENU_HOLE, render_user_menu
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def template_dirs():
+    """Каталоги шаблонов проекта; шаблоны библиотек не меняются."""
+    return [
+        *engines['django'].engine.dirs,
+        *(
+            directory for directory in get_app_template_dirs('templates')
+            if directory.startswith(settings.BASE_DIR)
+        ),
+    ]
+
+
+def template_fingerprint():
+    """Отпечаток шаблонов проекта: меняется при правке любого из них."""
+    files = []
+    for directory in template_dirs():
+        for root, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(
+                    root,
+                    name
+                )
+                stat = os.stat(
+                    path
+                )
+                files.append(
+                    (path, stat.st_mtime_ns, stat.st_size)
+                )
+    return hashlib.md5(
+        repr(sorted(files)).encode()
+    ).hexdigest()
+
+
+def reset_template_cache():
+    """Сбрасывает кэш скомпилированных шаблонов после их правки."""
+    for loader in engines['django'].engine.template_loaders:
+        if hasattr(loader, 'reset'):
+            loader.reset()
+
+
+def make_request(
+    path
+):
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.META = {
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+    }
+    request.user = AnonymousUser()
+    request.resolver_match = resolve(
+        path
+    )
+    return request
+
+
+def render_page(
+    name
+):
+    """HTML страницы с меткой на месте меню пользователя."""
+    request = make_request(
+        reverse(name)
+    )
+    request.punch_holes = True
+    match = request.resolver_match
+    response = match.func(
+        request,
+        *match.args,
+        **match.kwargs
+    )
+    if hasattr(response, 'render'):
+        response.render()
+    return response.content.decode(
+        response.charset
+    )
+
+
+def render_pages():
+    return {
+        name: render_page(name) for name in settings.PRERENDERED_PAGES
+    }
+
+
+def page_file(
+    root,
+    name
+):
+    return os.path.join(
+        root,
+        name.replace(':', '-') + '.html'
+    )
+
+
+def save_pages(
+    root,
+    fingerprint,
+    pages
+):
+    """Записывает страницы и манифест; манифест — последним."""
+    os.makedirs(
+        root,
+        exist_ok=True
+    )
+    for name, content in pages.items():
+        replace_file(
+            page_file(root, name),
+            content
+        )
+    replace_file(
+        os.path.join(root, MANIFEST_NAME),
+        json.dumps(
+            {
+                'fingerprint': fingerprint,
+                'pages': sorted(pages),
+            }
+        )
+    )
+
+
+def replace_file(
+    path,
+    content
+):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        file.write(
+            content
+        )
+    os.replace(
+        temporary,
+        path
+    )
+
+
+def load_pages(
+    root,
+    fingerprint
+):
+    """Сохраненные страницы, если они собраны из текущих шаблонов."""
+    try:
+        with open(os.path.join(root, MANIFEST_NAME)) as file:
+            manifest = json.load(
+                file
+            )
+        if (
+            manifest['fingerprint'] != fingerprint
+            or set(manifest['pages']) != set(settings.PRERENDERED_PAGES)
+        ):
+            return None
+        pages = {}
+        for name in manifest['pages']:
+            with open(page_file(root, name), encoding='utf-8') as file:
+                pages[name] = file.read()
+        return pages
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class PrerenderedPagesMiddleware:
+    """Отдает PRERENDERED_PAGES без сессии, пользователя и рендера.
+
+    Стоит раньше SessionMiddleware и AuthenticationMiddleware. Сессия и
+    пользователь загружаются, только если у запроса есть cookie сессии,
+    и только чтобы собрать меню пользователя.
+    """
+
+    def __init__(
+        self,
+        get_response
+    ):
+        self.get_response = get_response
+        self.paths = None
+        self.pages = {}
+        self.anonymous_menu = ''
+        self.fingerprint = None
+        self.checked = None
+
+    def __call__(
+        self,
+        request
+    ):
+        if request.method in ('GET', 'HEAD'):
+            if self.paths is None:
+                self.paths = {
+                    reverse(name): resolve(reverse(name))
+                    for name in settings.PRERENDERED_PAGES
+                }
+            match = self.paths.get(
+                request.path_info
+            )
+            if match is not None:
+                # Как после разбора URL: по имени view страницу
+                # находят метрики.
+                request.resolver_match = match
+                return self.serve(
+                    request,
+                    match.view_name
+                )
+        return self.get_response(
+            request
+        )
+
+    def refresh(
+        self
+    ):
+        now = time.monotonic()
+        if (
+            self.checked is not None
+            and now - self.checked < settings.PRERENDER_CHECK_INTERVAL
+        ):
+            return
+        self.checked = now
+        fingerprint = template_fingerprint()
+        if fingerprint == self.fingerprint:
+            return
+        reset_template_cache()
+        pages = load_pages(
+            settings.PRERENDER_ROOT,
+            fingerprint
+        )
+        if pages is None:
+            pages = render_pages()
+        self.anonymous_menu = render_user_menu(
+            make_request(
+                reverse(settings.PRERENDERED_PAGES[0])
+            )
+        )
+        self.pages = pages
+        self.fingerprint = fingerprint
+
+    def get_user(
+        self,
+        request
+    ):
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            return AnonymousUser()
+        engine = import_string(
+            settings.SESSION_ENGINE + '.SessionStore'
+        )
+        request.session = engine(
+            request.COOKIES[settings.SESSION_COOKIE_NAME]
+        )
+        return auth.get_user(
+            request
+        )
+
+    def serve(
+        self,
+        request,
+        name
+    ):
+        self.refresh()
+        request.user = self.get_user(
+            request
+        )
+        etag = quote_etag(
+            hashlib.md5(
+                '{}|{}|{}'.format(
+                    name,
+                    self.fingerprint,
+                    request.user.get_username()
+                ).encode()
+            ).hexdigest()
+        )
+        response = get_conditional_response(
+            request,
+            etag=etag
+        )
+        if response is None:
+            if request.user.is_authenticated:
+                menu = render_user_menu(
+                    request
+                )
+            else:
+                menu = self.anonymous_menu
+            response = HttpResponse(
+                self.pages[name].replace(
+                    USER_MENU_HOLE,
+                    menu,
+                    1
+                )
+            )
+        response['ETag'] = etag
+        response['X-Prerendered'] = '1'
+        response['X-Frame-Options'] = getattr(
+            settings,
+            'X_FRAME_OPTIONS',
+            'SAMEORIGIN'
+        )
+        patch_vary_headers(
+            response,
+            ('Cookie',)
+        )
+        return response
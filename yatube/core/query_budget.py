@@ -0,0 +1,157 @@
+import logging
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(
+    __name__
+)
+
+# Статистика процесса: имя view -> число запросов и худший случай.
+stats = defaultdict(
+    lambda: {
+        'requests': 0,
+        'queries': 0,
+        'max_queries': 0,
+    }
+)
+
+
+class QueryBudgetExceeded(
+    Exception
+):
+    pass
+
+
+def query_budget(
+    limit
+):
+    """Задает view бюджет SQL-запросов на один запрос к странице.
+
+    Значение из settings.QUERY_BUDGETS для имени view имеет приоритет.
+    """
+    def decorator(
+        view_func
+    ):
+        view_func.query_budget = limit
+        return view_func
+    return decorator
+
+
+class QueryCounter:
+    def __init__(
+        self
+    ):
+        self.count = 0
+
+    def __call__(
+        self,
+        execute,
+        sql,
+        params,
+        many,
+        context
+    ):
+        self.count += 1
+        return execute(
+            sql,
+            params,
+            many,
+            context
+        )
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL-запросы каждого view и сверяет их с бюджетом.
+
+    При превышении пишет предупреждение в лог или, если включен
+    QUERY_BUDGET_RAISE, выбрасывает QueryBudgetExceeded.
+    """
+
+    def __init__(
+        self,
+        get_response
+    ):
+        self.get_response = get_response
+
+    def __call__(
+        self,
+        request
+    ):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(
+                        counter
+                    )
+                )
+            response = self.get_response(
+                request
+            )
+        self.check_budget(
+            request,
+            counter.count
+        )
+        return response
+
+    def process_view(
+        self,
+        request,
+        view_func,
+        view_args,
+        view_kwargs
+    ):
+        request.query_budget = getattr(
+            view_func,
+            'query_budget',
+            None
+        )
+
+    def check_budget(
+        self,
+        request,
+        count
+    ):
+        match = getattr(
+            request,
+            'resolver_match',
+            None
+        )
+        if match is None:
+            return
+        view_name = match.view_name
+        view_stats = stats[view_name]
+        view_stats['requests'] += 1
+        view_stats['queries'] += count
+        view_stats['max_queries'] = max(
+            view_stats['max_queries'],
+            count
+        )
+        limit = getattr(
+            settings,
+            'QUERY_BUDGETS',
+            {}
+        ).get(
+            view_name,
+            getattr(
+                request,
+                'query_budget',
+                None
+            )
+        )
+        if limit is None or count <= limit:
+            return
+        message = (
+            f'{view_name}: {count} SQL-запросов '
+            f'при бюджете {limit} ({request.method} {request.path})'
+        )
+        if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(
+                message
+            )
+        logger.warning(
+            message
+        )
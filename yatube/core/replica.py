@@ -0,0 +1,59 @@
+"""Локальная замена реплики: копия SQLite-базы через backup API.
+
+Копия пишется во временный файл и атомарно подменяет файл реплики,
+поэтому читатели не ждут блокировок: открытые соединения дочитывают
+старую копию, новые открывают свежую. Время изменения файла — версия
+снимка, по ней процессы сервера сбрасывают кэш страниц с реплики
+(core.db_router.replica_version).
+"""
+import os
+import sqlite3
+import time
+
+from django.db import connections
+
+from .db_router import PRIMARY
+
+
+def refresh_replica(
+    alias,
+    source=PRIMARY
+):
+    """Копирует базу source в файл реплики alias."""
+    target = connections[alias].settings_dict['NAME']
+    temporary = f'{target}.tmp'
+    connection = connections[source]
+    connection.ensure_connection()
+    destination = sqlite3.connect(
+        temporary
+    )
+    try:
+        connection.connection.backup(
+            destination
+        )
+        # Копия WAL-базы тоже в режиме WAL; реплике нужен обычный журнал,
+        # чтобы подмена файла не оставляла чужой -wal.
+        destination.execute(
+            'PRAGMA journal_mode = delete'
+        ).fetchall()
+    finally:
+        destination.close()
+    # Точное и растущее время изменения: два обновления подряд не должны
+    # получить одну версию из-за грубых отметок времени файловой системы.
+    version = time.time_ns()
+    try:
+        version = max(
+            version,
+            os.stat(target).st_mtime_ns + 1
+        )
+    except OSError:
+        pass
+    os.utime(
+        temporary,
+        ns=(version, version)
+    )
+    os.replace(
+        temporary,
+        target
+    )
+    connections[alias].close()
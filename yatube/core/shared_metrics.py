@@ -0,0 +1,361 @@
+"""Метрики запросов, общие для всех процессов WSGI-сервера.
+
+Файл METRICS_SHARED_FILE отображается в память каждым процессом. В нем
+METRICS_SHARED_REGIONS областей фиксированного размера: массив чисел
+double по всем именам view из URLconf. Процесс захватывает свою область
+один раз (под flock) и дальше пишет в нее без межпроцессных блокировок;
+страница /metrics складывает все области. Область завершившегося
+процесса занимает следующий, и счетчики продолжают расти с того же
+места.
+"""
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger(
+    __name__
+)
+
+# В заголовке файла — отпечаток раскладки (32 байта md5 в hex).
+HEADER_SIZE = 64
+DOUBLE_SIZE = 8
+
+SCALARS = (
+    'duration_seconds',
+    'queries',
+    'query_seconds',
+    'template_seconds',
+    'response_bytes',
+)
+# View без имени в URLconf и прочие ответы вне таблицы.
+EXTRA_VIEWS = (
+    'static',
+    'unresolved',
+    'other',
+)
+OTHER_STATUS = 'other'
+
+
+def url_names(
+    patterns,
+    namespace=''
+):
+    """Полные имена URL (namespace:name) из списка шаблонов URL."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = namespace
+            if pattern.namespace:
+                prefix = f'{namespace}{pattern.namespace}:'
+            yield from url_names(
+                pattern.url_patterns,
+                prefix
+            )
+        elif pattern.name:
+            yield namespace + pattern.name
+
+
+class Layout:
+    """Смещения счетчиков внутри области процесса (в числах double)."""
+
+    def __init__(
+        self,
+        views,
+        codes,
+        bounds,
+        regions
+    ):
+        self.views = {
+            view: index for index, view in enumerate(views)
+        }
+        self.codes = {
+            code: index for index, code in enumerate(codes)
+        }
+        self.bounds = bounds
+        self.regions = regions
+        self.buckets = len(codes) + 1
+        self.scalars = self.buckets + len(bounds) + 1
+        self.fields = self.scalars + len(SCALARS)
+        # Первое число области — pid процесса-владельца.
+        self.region = 1 + len(views) * self.fields
+        self.size = HEADER_SIZE + regions * self.region * DOUBLE_SIZE
+        self.digest = hashlib.md5(
+            repr((views, codes, bounds, regions)).encode()
+        ).hexdigest().encode()
+
+    @classmethod
+    def from_settings(
+        cls
+    ):
+        return cls(
+            (
+                *sorted(set(url_names(get_resolver().url_patterns))),
+                *EXTRA_VIEWS,
+            ),
+            tuple(settings.METRICS_STATUS_CODES),
+            tuple(settings.METRICS_LATENCY_BUCKETS),
+            settings.METRICS_SHARED_REGIONS
+        )
+
+    def base(
+        self,
+        view
+    ):
+        """Смещение счетчиков view от начала области."""
+        index = self.views.get(
+            view
+        )
+        if index is None:
+            index = self.views['other']
+        return 1 + index * self.fields
+
+
+def is_alive(
+    pid
+):
+    try:
+        os.kill(
+            pid,
+            0
+        )
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedRegistry:
+    """Метрики по именам view в общем файле; интерфейс как у Registry."""
+
+    def __init__(
+        self,
+        path
+    ):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pid = None
+        self.layout = None
+        self.map = None
+        self.values = None
+
+    def attach(
+        self
+    ):
+        """Открывает файл и захватывает область текущего процесса.
+
+        Вызывается заново после fork: дочерний процесс не должен писать
+        в область родителя.
+        """
+        layout = Layout.from_settings()
+        os.makedirs(
+            os.path.dirname(self.path),
+            exist_ok=True
+        )
+        with open(f'{self.path}.lock', 'a') as lock_file:
+            fcntl.flock(
+                lock_file,
+                fcntl.LOCK_EX
+            )
+            shared = self.open_map(
+                layout
+            )
+            regions = memoryview(
+                shared
+            )[HEADER_SIZE:].cast('d')
+            region = self.claim_region(
+                regions,
+                layout
+            )
+            if region is None:
+                logger.warning(
+                    'Все %s областей %s заняты: метрики процесса %s '
+                    'не попадут на /metrics',
+                    layout.regions,
+                    self.path,
+                    os.getpid()
+                )
+                values = memoryview(
+                    bytearray(layout.region * DOUBLE_SIZE)
+                ).cast('d')
+            else:
+                start = region * layout.region
+                values = regions[start:start + layout.region]
+            values[0] = os.getpid()
+        self.layout = layout
+        self.map = shared
+        self.values = values
+        self.pid = os.getpid()
+
+    def open_map(
+        self,
+        layout
+    ):
+        """Файл с раскладкой layout; другой раскладки файл создается заново.
+
+        Новый файл подменяет старый через os.replace: процессы со старой
+        раскладкой (до перезапуска после деплоя) дописывают в старый
+        файл, не портя новый.
+        """
+        try:
+            with open(self.path, 'r+b') as file:
+                if (
+                    os.fstat(file.fileno()).st_size == layout.size
+                    and file.read(len(layout.digest)) == layout.digest
+                ):
+                    return mmap.mmap(
+                        file.fileno(),
+                        layout.size
+                    )
+        except FileNotFoundError:
+            pass
+        temporary = f'{self.path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(
+                layout.digest
+            )
+            file.truncate(
+                layout.size
+            )
+        os.replace(
+            temporary,
+            self.path
+        )
+        with open(self.path, 'r+b') as file:
+            return mmap.mmap(
+                file.fileno(),
+                layout.size
+            )
+
+    def claim_region(
+        self,
+        regions,
+        layout
+    ):
+        """Номер свободной области или области завершившегося процесса."""
+        for region in range(layout.regions):
+            pid = int(
+                regions[region * layout.region]
+            )
+            if pid == 0 or not is_alive(pid):
+                return region
+        return None
+
+    def ensure_attached(
+        self
+    ):
+        if self.pid != os.getpid():
+            self.attach()
+
+    def record(
+        self,
+        view,
+        status,
+        duration,
+        metrics,
+        response_bytes
+    ):
+        with self.lock:
+            self.ensure_attached()
+            layout = self.layout
+            values = self.values
+            base = layout.base(
+                view
+            )
+            values[base + layout.codes.get(status, len(layout.codes))] += 1
+            values[
+                base + layout.buckets + bisect_left(layout.bounds, duration)
+            ] += 1
+            base += layout.scalars
+            values[base] += duration
+            values[base + 1] += metrics.queries
+            values[base + 2] += metrics.query_seconds
+            values[base + 3] += metrics.template_seconds
+            values[base + 4] += response_bytes
+
+    def totals(
+        self
+    ):
+        """Сумма областей всех процессов, которые писали в файл."""
+        with self.lock:
+            self.ensure_attached()
+        layout = self.layout
+        regions = memoryview(
+            self.map
+        )[HEADER_SIZE:].cast('d')
+        totals = [0.0] * layout.region
+        for region in range(layout.regions):
+            start = region * layout.region
+            if not regions[start]:
+                continue
+            for index, value in enumerate(
+                regions[start + 1:start + layout.region],
+                1
+            ):
+                totals[index] += value
+        return totals
+
+    def collect(
+        self
+    ):
+        """Метрики всех процессов в формате Registry.collect()."""
+        totals = self.totals()
+        layout = self.layout
+        codes = [
+            *layout.codes,
+            OTHER_STATUS,
+        ]
+        views = {}
+        for view in layout.views:
+            base = layout.base(
+                view
+            )
+            buckets = [
+                int(value) for value in totals[
+                    base + layout.buckets:base + layout.scalars
+                ]
+            ]
+            if not any(buckets):
+                continue
+            responses = totals[base:base + layout.buckets]
+            scalars = totals[base + layout.scalars:base + layout.fields]
+            views[view] = {
+                'responses': {
+                    code: int(count)
+                    for code, count in zip(codes, responses) if count
+                },
+                'buckets': buckets,
+                **dict(zip(SCALARS, scalars)),
+            }
+            for key in ('queries', 'response_bytes'):
+                views[view][key] = int(
+                    views[view][key]
+                )
+        return views
+
+    def clear(
+        self
+    ):
+        """Обнуляет счетчики всех процессов; владельцы областей те же."""
+        with self.lock:
+            self.ensure_attached()
+            layout = self.layout
+            regions = memoryview(
+                self.map
+            )[HEADER_SIZE:].cast('d')
+            zeros = array(
+                'd',
+                bytes((layout.region - 1) * DOUBLE_SIZE)
+            )
+            for region in range(layout.regions):
+                start = region * layout.region + 1
+                regions[start:start + layout.region - 1] = memoryview(
+                    zeros
+                )
@@ -0,0 +1,35 @@
+"""Настройка каждого нового соединения SQLite.
+
+PRAGMA берутся из settings.SQLITE_PRAGMAS, а ключ SQLITE_PRAGMAS
+в настройках отдельной базы дополняет или переопределяет их.
+"""
+from django.conf import settings
+
+
+def apply_pragmas(
+    sender,
+    connection,
+    **kwargs
+):
+    """Выполняет PRAGMA сразу после открытия соединения.
+
+    Команды идут мимо обертки курсора Django, поэтому не попадают
+    в счетчики SQL-запросов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = {
+        **getattr(
+            settings,
+            'SQLITE_PRAGMAS',
+            {}
+        ),
+        **connection.settings_dict.get(
+            'SQLITE_PRAGMAS',
+            {}
+        ),
+    }
+    for name, value in pragmas.items():
+        connection.connection.execute(
+            f'PRAGMA {name} = {value}'
+        ).fetchall()
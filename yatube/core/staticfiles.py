@@ -0,0 +1,301 @@
+"""Статика с хэшами в именах, сжатая заранее и раздаваемая из процесса.
+
+CompressedManifestStorage при collectstatic добавляет к именам файлов
+хэш содержимого и пишет рядом сжатые копии .gz и .br (если установлен
+brotli). StaticFilesMiddleware отдает файлы из STATIC_ROOT раньше всех
+остальных middleware: выбирает сжатую копию по Accept-Encoding, а
+файлы с хэшем в имени помечает неизменяемыми на год.
+"""
+import gzip
+import io
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Форматы, которые уже сжаты и от повторного сжатия не выигрывают.
+COMPRESSIBLE_EXTENSIONS = (
+    '.css',
+    '.js',
+    '.svg',
+    '.ico',
+    '.json',
+    '.map',
+    '.txt',
+    '.xml',
+)
+# Сжатая копия пишется, только если она меньше оригинала хотя бы на 5%.
+MIN_RATIO = 0.95
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Файлы без хэша в имени (например, favicon.ico по старой ссылке)
+# могут смениться при следующем collectstatic.
+MUTABLE_CACHE_CONTROL = 'public, max-age=60'
+
+
+def gzip_compress(
+    content
+):
+    """gzip без времени в заголовке: одинаковый файл при каждой сборке.
+
+    gzip.compress принимает mtime только с Python 3.8.
+    """
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+        fileobj=buffer,
+        mode='wb',
+        compresslevel=9,
+        mtime=0
+    ) as file:
+        file.write(
+            content
+        )
+    return buffer.getvalue()
+
+
+def compress(
+    content
+):
+    """Сжатые варианты содержимого: {расширение: байты}."""
+    variants = {
+        '.gz': gzip_compress(
+            content
+        ),
+    }
+    if brotli is not None:
+        variants['.br'] = brotli.compress(
+            content
+        )
+    return {
+        extension: data for extension, data in variants.items()
+        if len(data) < len(content) * MIN_RATIO
+    }
+
+
+class CompressedManifestStorage(
+    ManifestStaticFilesStorage
+):
+    def stored_name(
+        self,
+        name
+    ):
+        # Пока collectstatic не запускался (разработка, тесты), ссылки
+        # ведут на исходные файлы.
+        if not self.hashed_files:
+            return name
+        return super().stored_name(
+            name
+        )
+
+    def post_process(
+        self,
+        paths,
+        dry_run=False,
+        **options
+    ):
+        yield from super().post_process(
+            paths,
+            dry_run,
+            **options
+        )
+        if dry_run:
+            return
+        # Промежуточные версии многопроходной обработки не сжимаются:
+        # ссылки есть только на исходные имена и имена из манифеста.
+        names = set(
+            paths
+        ) | set(
+            self.hashed_files.values()
+        )
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.save_variants(
+                    name
+                )
+
+    def save_variants(
+        self,
+        name
+    ):
+        with self.open(name) as file:
+            content = file.read()
+        for extension, data in compress(content).items():
+            variant = name + extension
+            if self.exists(variant):
+                self.delete(variant)
+            self._save(
+                variant,
+                ContentFile(data)
+            )
+
+
+class StaticFileResponse(
+    FileResponse
+):
+    block_size = 64 * 1024
+
+
+def accepted_encodings(
+    header
+):
+    """Кодировки из Accept-Encoding, кроме явно запрещенных через q=0."""
+    encodings = set()
+    for item in header.split(','):
+        encoding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if params in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        encodings.add(
+            encoding.strip().lower()
+        )
+    return encodings
+
+
+class StaticFilesMiddleware:
+    """Отдает файлы из STATIC_ROOT без сессий, пользователя и БД.
+
+    Тело передается через wsgi.file_wrapper, поэтому WSGI-сервер
+    может отправить файл через sendfile, не читая его в Python.
+    """
+
+    ENCODINGS = (
+        ('br', '.br'),
+        ('gzip', '.gz'),
+    )
+
+    def __init__(
+        self,
+        get_response
+    ):
+        self.get_response = get_response
+        self.hashed_source = None
+        self.hashed_names = set()
+
+    def __call__(
+        self,
+        request
+    ):
+        response = None
+        if request.method in ('GET', 'HEAD'):
+            response = self.serve(
+                request
+            )
+        if response is None:
+            response = self.get_response(
+                request
+            )
+        return response
+
+    def find(
+        self,
+        request
+    ):
+        """Путь к файлу в STATIC_ROOT или None."""
+        if not (
+            settings.STATIC_ROOT
+            and request.path_info.startswith(settings.STATIC_URL)
+        ):
+            return None
+        name = request.path_info[len(settings.STATIC_URL):]
+        try:
+            path = safe_join(
+                settings.STATIC_ROOT,
+                name
+            )
+        except (SuspiciousFileOperation, ValueError):
+            return None
+        if not os.path.isfile(path):
+            return None
+        return name, path
+
+    def serve(
+        self,
+        request
+    ):
+        found = self.find(
+            request
+        )
+        if found is None:
+            return None
+        name, path = found
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        encoding = None
+        has_variants = False
+        served = path
+        for candidate, extension in self.ENCODINGS:
+            if os.path.isfile(path + extension):
+                has_variants = True
+                if encoding is None and candidate in accepted:
+                    encoding = candidate
+                    served = path + extension
+        stat = os.stat(
+            served
+        )
+        etag = quote_etag(
+            f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+        )
+        last_modified = int(
+            stat.st_mtime
+        )
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified
+        )
+        if response is None:
+            content_type, _ = mimetypes.guess_type(
+                name
+            )
+            response = StaticFileResponse(
+                open(served, 'rb'),
+                content_type=content_type or 'application/octet-stream'
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(
+            last_modified
+        )
+        if has_variants:
+            patch_vary_headers(
+                response,
+                ('Accept-Encoding',)
+            )
+        response['Cache-Control'] = (
+            IMMUTABLE_CACHE_CONTROL if self.is_hashed(name)
+            else MUTABLE_CACHE_CONTROL
+        )
+        return response
+
+    def is_hashed(
+        self,
+        name
+    ):
+        hashed_files = getattr(
+            staticfiles_storage,
+            'hashed_files',
+            {}
+        )
+        # Манифест меняется только при collectstatic: множество имен
+        # пересобирается, когда хранилище загрузило новый.
+        if self.hashed_source is not hashed_files:
+            self.hashed_source = hashed_files
+            self.hashed_names = set(
+                hashed_files.values()
+            )
+        return name in self.hashed_names
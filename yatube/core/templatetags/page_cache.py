@@ -0,0 +1,27 @@
+from django import template
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core.page_cache import USER_MENU_HOLE, USER_MENU_TEMPLATE
+
+register = template.Library()
+
+
+@register.simple_tag(
+    takes_context=True
+)
+def user_menu(
+    context
+):
+    """Меню пользователя или метка для него, если страница идет в кэш."""
+    request = context.get(
+        'request'
+    )
+    if getattr(request, 'punch_holes', False):
+        return mark_safe(
+            USER_MENU_HOLE
+        )
+    return render_to_string(
+        USER_MENU_TEMPLATE,
+        context.flatten()
+    )
@@ -0,0 +1,18 @@
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def elided_page_range(
+    page_obj,
+    on_each_side=3
+):
+    """Номера страниц вокруг текущей, первые и последние, с пропусками."""
+    paginator = page_obj.paginator
+    if not hasattr(paginator, 'get_elided_page_range'):
+        return paginator.page_range
+    return paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=on_each_side
+    )
@@ -0,0 +1,133 @@
+"""Окружение тестов: файлы процессов во временном каталоге.
+
+Кэши и общие метрики (файлы из RUNTIME_DIR) в тестах лежат во временном
+каталоге: тесты не трогают кэши запущенного сервера и не оставляют
+файлов в проекте. TestRunner подключается через TEST_RUNNER, для pytest
+то же делают хуки в tests/fixtures/fixture_cache.py.
+"""
+import os
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def runtime_settings(
+    directory
+):
+    """Настройки, в которых RUNTIME_DIR заменен на directory."""
+    return {
+        'RUNTIME_DIR': directory,
+        'METRICS_SHARED_FILE': os.path.join(
+            directory,
+            'metrics.mmap'
+        ),
+        'CACHES': {
+            alias: {
+                **config,
+                'LOCATION': os.path.join(
+                    directory,
+                    'cache',
+                    alias
+                ),
+            }
+            for alias, config in settings.CACHES.items()
+        },
+    }
+
+
+class RuntimeDirectory:
+    """Временный RUNTIME_DIR на время тестов."""
+
+    def __enter__(
+        self
+    ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(
+            **runtime_settings(
+                self.directory.name
+            )
+        )
+        self.settings.enable()
+        return self.directory.name
+
+    def __exit__(
+        self,
+        *exc_info
+    ):
+        self.settings.disable()
+        self.directory.cleanup()
+
+
+class TestRunner(
+    DiscoverRunner
+):
+    def setup_test_environment(
+        self,
+        **kwargs
+    ):
+        super().setup_test_environment(
+            **kwargs
+        )
+        self.runtime_directory = RuntimeDirectory()
+        self.runtime_directory.__enter__()
+
+    def teardown_test_environment(
+        self,
+        **kwargs
+    ):
+        self.runtime_directory.__exit__()
+        super().teardown_test_environment(
+            **kwargs
+        )
+
+
+def in_other_process(
+    func,
+    action=None
+):
+    """Выполняет func() в дочернем процессе, как другой worker сервера.
+
+    Если задан action, дочерний процесс ждет, пока текущий выполнит
+    action(), и только потом вызывает func(). Возвращает True, если
+    func() вернула истину.
+    """
+    ready_read, ready_write = os.pipe()
+    go_read, go_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.write(
+                ready_write,
+                b'1'
+            )
+            os.read(
+                go_read,
+                1
+            )
+            code = 0 if func() else 2
+        finally:
+            os._exit(code)
+    try:
+        os.read(
+            ready_read,
+            1
+        )
+        if action is not None:
+            action()
+    finally:
+        os.write(
+            go_write,
+            b'1'
+        )
+        _, status = os.waitpid(
+            pid,
+            0
+        )
+        for descriptor in (ready_read, ready_write, go_read, go_write):
+            os.close(
+                descriptor
+            )
+    return os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
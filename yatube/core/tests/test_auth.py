@@ -0,0 +1,243 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..auth import CachedModelBackend, cache_is_shared, make_key
+from ..testing import in_other_process
+
+User = get_user_model()
+
+# Сессия в базе и пользователь из базы на каждый запрос.
+DATABASE_AUTH = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': [
+        'django.contrib.auth.backends.ModelBackend',
+    ],
+}
+
+
+class CachedAuthTest(
+    TestCase
+):
+    def setUp(
+        self
+    ):
+        # Тесты меняют пользователя, поэтому он создается заново.
+        self.user = User.objects.create_user(
+            username='auth',
+            password='old-password-42'
+        )
+        self.url = reverse(
+            'about:author'
+        )
+        self.client.force_login(
+            self.user
+        )
+
+    def count_queries(
+        self
+    ):
+        """Запросы второго из двух обращений к странице."""
+        self.client.get(
+            self.url
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url
+            )
+        self.assertContains(
+            response,
+            f'Пользователь: {self.user.username}'
+        )
+        return len(queries)
+
+    def test_session_and_user_come_from_cache(
+        self
+    ):
+        """Страница авторизованного пользователя не читает сессию и его."""
+        cached = self.count_queries()
+        with override_settings(**DATABASE_AUTH):
+            # Новый клиент собирает middleware с сессиями в базе.
+            self.client = Client()
+            self.client.force_login(
+                self.user
+            )
+            uncached = self.count_queries()
+
+        self.assertEqual(
+            cached,
+            0
+        )
+        self.assertEqual(
+            uncached - cached,
+            2
+        )
+
+    def test_user_change_is_visible(
+        self
+    ):
+        """Сохранение пользователя сбрасывает его копию в кэше."""
+        self.client.get(
+            self.url
+        )
+
+        self.user.username = 'renamed'
+        self.user.save()
+
+        self.assertContains(
+            self.client.get(
+                self.url
+            ),
+            'Пользователь: renamed'
+        )
+
+    def test_password_change_logs_out_other_sessions(
+        self
+    ):
+        """После смены пароля старая сессия больше не действует."""
+        self.client.get(
+            self.url
+        )
+
+        self.user.set_password(
+            'new-password-42'
+        )
+        self.user.save()
+
+        self.assertNotContains(
+            self.client.get(
+                self.url
+            ),
+            f'Пользователь: {self.user.username}'
+        )
+
+    def test_password_hash_is_not_cached(
+        self
+    ):
+        """В кэше нет хэша пароля; проверка пароля читает его из базы."""
+        self.client.get(
+            self.url
+        )
+
+        self.assertNotIn(
+            self.user.password,
+            repr(
+                cache.get(
+                    make_key(
+                        self.user.pk
+                    )
+                )
+            )
+        )
+        user = CachedModelBackend().get_user(
+            self.user.pk
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(
+                user.check_password(
+                    'old-password-42'
+                )
+            )
+
+    def test_own_password_change_keeps_session(
+        self
+    ):
+        """Пользователь, сменивший пароль, остается в своей сессии."""
+        self.client.get(
+            self.url
+        )
+
+        self.client.post(
+            reverse(
+                'password_change'
+            ),
+            {
+                'old_password': 'old-password-42',
+                'new_password1': 'new-password-42',
+                'new_password2': 'new-password-42',
+            }
+        )
+        self.assertTrue(
+            User.objects.get(
+                pk=self.user.pk
+            ).check_password(
+                'new-password-42'
+            )
+        )
+        self.assertContains(
+            self.client.get(
+                self.url
+            ),
+            f'Пользователь: {self.user.username}'
+        )
+
+    def test_logout_reaches_other_processes(
+        self
+    ):
+        """После выхода другой процесс сервера не находит сессию в кэше."""
+        self.client.get(
+            self.url
+        )
+        session_key = self.client.session.cache_key
+        sessions = caches[settings.SESSION_CACHE_ALIAS]
+        self.assertIsNotNone(
+            sessions.get(session_key)
+        )
+
+        self.assertTrue(
+            in_other_process(
+                lambda: sessions.get(session_key) is None,
+                action=self.client.logout
+            )
+        )
+
+    def test_password_change_reaches_other_processes(
+        self
+    ):
+        """После смены пароля другой процесс не берет пользователя из кэша."""
+        self.client.get(
+            self.url
+        )
+        key = make_key(
+            self.user.pk
+        )
+        self.assertIsNotNone(
+            cache.get(key)
+        )
+
+        def change_password():
+            self.user.set_password(
+                'new-password-42'
+            )
+            self.user.save()
+
+        self.assertTrue(
+            in_other_process(
+                lambda: cache.get(key) is None,
+                action=change_password
+            )
+        )
+
+    def test_process_local_cache_is_reported(
+        self
+    ):
+        """Проверка проекта предупреждает о кэше в памяти процесса."""
+        self.assertEqual(
+            cache_is_shared(None),
+            []
+        )
+        local_caches = {
+            alias: {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }
+            for alias in settings.CACHES
+        }
+        with override_settings(CACHES=local_caches):
+            self.assertEqual(
+                [warning.id for warning in cache_is_shared(None)],
+                ['core.W001', 'core.W001']
+            )
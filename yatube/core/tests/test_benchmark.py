@@ -0,0 +1,183 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from posts.management.commands.benchmark_routes import API_PAIRS
+
+from ..benchmark import compare, percentile
+
+
+def make_results(
+    p95_ms,
+    throughput_rps,
+    queries
+):
+    return {
+        'routes': {
+            'app_posts:index': {
+                'p95_ms': p95_ms,
+                'throughput_rps': throughput_rps,
+                'queries': queries,
+            },
+        },
+    }
+
+
+class BenchmarkStatsTest(
+    SimpleTestCase
+):
+    def test_percentile(
+        self
+    ):
+        """Перцентиль считается по ближайшему рангу."""
+        values = list(
+            range(1, 101)
+        )
+        for percent, expected in ((50, 50), (95, 95), (99, 99), (100, 100)):
+            with self.subTest(percent=percent):
+                self.assertEqual(
+                    percentile(
+                        values,
+                        percent
+                    ),
+                    expected
+                )
+
+    def test_compare_within_threshold(
+        self
+    ):
+        """Колебания в пределах порога не считаются ухудшением."""
+        self.assertEqual(
+            compare(
+                make_results(10.5, 95, 3),
+                make_results(10, 100, 3),
+                0.1
+            ),
+            []
+        )
+
+    def test_compare_finds_regressions(
+        self
+    ):
+        """Рост p95, падение пропускной способности и новые запросы."""
+        regressions = compare(
+            make_results(20, 50, 4),
+            make_results(10, 100, 3),
+            0.1
+        )
+        self.assertEqual(
+            [metric for _, metric, _, _ in regressions],
+            [
+                'p95_ms',
+                'throughput_rps',
+                'queries',
+            ]
+        )
+
+
+class BenchmarkRoutesCommandTest(
+    TestCase
+):
+    def setUp(
+        self
+    ):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(
+            directory.cleanup
+        )
+        self.output = os.path.join(
+            directory.name,
+            'results.json'
+        )
+
+    def benchmark(
+        self,
+        *args
+    ):
+        call_command(
+            'benchmark_routes',
+            '--current-db',
+            '--users=2',
+            '--groups=2',
+            '--posts=20',
+            '--requests=2',
+            '--concurrency=1',
+            *args,
+            stdout=StringIO()
+        )
+
+    def test_results_are_saved(
+        self
+    ):
+        """Результаты по всем страницам сохраняются в JSON без ошибок."""
+        self.benchmark(
+            f'--output={self.output}'
+        )
+        with open(self.output) as file:
+            results = json.load(
+                file
+            )
+        for name in (
+            'app_posts:index',
+            'app_posts:post_detail',
+            'app_posts:post_create',
+            'about:author',
+            'users:signup',
+        ):
+            with self.subTest(name=name):
+                route = results['routes'][name]
+                self.assertEqual(
+                    route['requests'],
+                    2
+                )
+                self.assertEqual(
+                    route['errors'],
+                    0
+                )
+                self.assertLessEqual(
+                    route['p50_ms'],
+                    route['p99_ms']
+                )
+
+    def test_api_is_compared_with_uncached_html(
+        self
+    ):
+        """HTML для сравнения с API собирается без кэша страниц."""
+        self.benchmark(
+            f'--output={self.output}'
+        )
+        with open(self.output) as file:
+            results = json.load(
+                file
+            )
+
+        self.assertEqual(
+            set(results['html_uncached']),
+            set(API_PAIRS)
+        )
+        for route in results['html_uncached'].values():
+            self.assertEqual(
+                route['errors'],
+                0
+            )
+
+    def test_regression_fails_command(
+        self
+    ):
+        """Ухудшение относительно baseline завершает команду ошибкой."""
+        with open(self.output, 'w') as file:
+            json.dump(
+                make_results(0, 10 ** 9, 0),
+                file
+            )
+        with self.assertRaises(CommandError):
+            self.benchmark(
+                f'--baseline={self.output}'
+            )
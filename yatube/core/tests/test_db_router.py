@@ -0,0 +1,185 @@
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..db_router import PIN_COOKIE
+from ..replica import refresh_replica
+from ..testing import in_other_process
+
+User = get_user_model()
+
+
+@override_settings(
+    DATABASE_REPLICAS=['replica']
+)
+class ReplicaRouterTest(
+    TransactionTestCase
+):
+    databases = {
+        'default',
+        'replica',
+    }
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(
+            directory.cleanup
+        )
+        # В тестах реплика — зеркало default; здесь она настоящая копия.
+        replica = connections['replica']
+        name = replica.settings_dict['NAME']
+        replica.close()
+        replica.settings_dict['NAME'] = os.path.join(
+            directory.name,
+            'replica.sqlite3'
+        )
+        self.addCleanup(
+            replica.settings_dict.__setitem__,
+            'NAME',
+            name
+        )
+        self.addCleanup(
+            replica.close
+        )
+
+        self.user = User.objects.create_user(
+            username='auth'
+        )
+        Post.objects.create(
+            author=self.user,
+            text='Пост, который есть на реплике'
+        )
+        refresh_replica(
+            'replica'
+        )
+        Post.objects.create(
+            author=self.user,
+            text='Пост, которого на реплике еще нет'
+        )
+
+    def test_get_reads_from_replica(
+        self
+    ):
+        """GET-запрос к ленте читает с реплики."""
+        response = self.client.get(
+            reverse('app_posts:index')
+        )
+
+        self.assertContains(
+            response,
+            'Пост, который есть на реплике'
+        )
+        self.assertNotContains(
+            response,
+            'Пост, которого на реплике еще нет'
+        )
+
+    def test_reads_stick_to_primary_after_write(
+        self
+    ):
+        """После записи клиент читает из default и видит свой пост."""
+        self.client.force_login(
+            self.user
+        )
+        response = self.client.post(
+            reverse('app_posts:post_create'),
+            {
+                'text': 'Только что написанный пост'
+            }
+        )
+        self.assertIn(
+            PIN_COOKIE,
+            response.cookies
+        )
+
+        response = self.client.get(
+            reverse('app_posts:index')
+        )
+
+        self.assertContains(
+            response,
+            'Только что написанный пост'
+        )
+        self.assertContains(
+            response,
+            'Пост, которого на реплике еще нет'
+        )
+
+    def test_sessions_are_read_from_primary(
+        self
+    ):
+        """Сессия нового входа, которой нет на реплике, не теряется."""
+        self.client.force_login(
+            self.user
+        )
+        self.assertFalse(
+            Session.objects.using(
+                'replica'
+            ).exists()
+        )
+
+        response = self.client.get(
+            reverse('app_posts:index')
+        )
+
+        self.assertContains(
+            response,
+            f'Пользователь: {self.user.username}'
+        )
+
+    def test_refresh_updates_replica(
+        self
+    ):
+        """После обновления реплики лента показывает новые посты."""
+        url = reverse(
+            'app_posts:index'
+        )
+        self.client.get(
+            url
+        )
+
+        refresh_replica(
+            'replica'
+        )
+
+        self.assertContains(
+            self.client.get(
+                url
+            ),
+            'Пост, которого на реплике еще нет'
+        )
+
+    def test_refresh_in_other_process_updates_replica(
+        self
+    ):
+        """Обновление реплики командой в другом процессе видно серверу."""
+        url = reverse(
+            'app_posts:index'
+        )
+        self.client.get(
+            url
+        )
+
+        self.assertTrue(
+            in_other_process(
+                lambda: refresh_replica('replica') or True
+            )
+        )
+
+        self.assertContains(
+            self.client.get(
+                url
+            ),
+            'Пост, которого на реплике еще нет'
+        )
@@ -0,0 +1,224 @@
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..metrics import Registry, get_registry
+
+User = get_user_model()
+
+
+def parse(
+    content
+):
+    """Строки метрик Prometheus: {имя с метками: значение}."""
+    return {
+        sample: float(value)
+        for sample, value in (
+            line.rsplit(' ', 1) for line in content.decode().splitlines()
+            if not line.startswith('#')
+        )
+    }
+
+
+class MetricsTest(
+    TestCase
+):
+    def setUp(
+        self
+    ):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(
+            directory.cleanup
+        )
+        settings_override = override_settings(
+            METRICS_SHARED_FILE=os.path.join(
+                directory.name,
+                'metrics.mmap'
+            )
+        )
+        settings_override.enable()
+        self.addCleanup(
+            settings_override.disable
+        )
+        self.staff = User.objects.create_user(
+            username='staff',
+            is_staff=True
+        )
+
+    def scrape(
+        self
+    ):
+        self.client.force_login(
+            self.staff
+        )
+        response = self.client.get(
+            reverse('metrics')
+        )
+        self.assertEqual(
+            response.status_code,
+            200
+        )
+        self.assertTrue(
+            response['Content-Type'].startswith('text/plain; version=0.0.4')
+        )
+        return parse(
+            response.content
+        )
+
+    def test_view_metrics(
+        self
+    ):
+        """Для каждого view записываются время, SQL, шаблоны и размер."""
+        response = self.client.get(
+            reverse('app_posts:index')
+        )
+
+        samples = self.scrape()
+
+        view = 'view="app_posts:index"'
+        self.assertEqual(
+            samples[f'yatube_http_requests_total{{{view},status="200"}}'],
+            1
+        )
+        self.assertEqual(
+            samples[
+                f'yatube_http_request_duration_seconds_bucket'
+                f'{{{view},le="+Inf"}}'
+            ],
+            1
+        )
+        self.assertEqual(
+            samples[f'yatube_http_request_duration_seconds_count{{{view}}}'],
+            1
+        )
+        self.assertEqual(
+            samples[f'yatube_http_response_bytes_total{{{view}}}'],
+            len(response.content)
+        )
+        for name in (
+            'yatube_db_queries_total',
+            'yatube_db_query_seconds_total',
+            'yatube_template_render_seconds_total',
+        ):
+            with self.subTest(name=name):
+                self.assertGreater(
+                    samples[f'{name}{{{view}}}'],
+                    0
+                )
+
+    def test_buckets_are_cumulative(
+        self
+    ):
+        """Корзины гистограммы не убывают и заканчиваются на +Inf."""
+        for _ in range(3):
+            self.client.get(
+                reverse('app_posts:index')
+            )
+
+        samples = self.scrape()
+
+        buckets = [
+            value for sample, value in samples.items()
+            if sample.startswith(
+                'yatube_http_request_duration_seconds_bucket'
+                '{view="app_posts:index"'
+            )
+        ]
+        self.assertEqual(
+            buckets,
+            sorted(buckets)
+        )
+        self.assertEqual(
+            buckets[-1],
+            3
+        )
+
+    def test_prerendered_page_has_view_name(
+        self
+    ):
+        """Заранее отрендеренная страница учитывается под своим view."""
+        self.client.get(
+            reverse('about:author')
+        )
+
+        self.assertIn(
+            'yatube_http_requests_total{view="about:author",status="200"}',
+            self.scrape()
+        )
+
+    def test_process_metrics(
+        self
+    ):
+        """Страница содержит метрики очереди записей."""
+        self.assertIn(
+            'yatube_write_queue_depth',
+            self.scrape()
+        )
+
+    @override_settings(
+        METRICS_SHARED_FILE=None
+    )
+    def test_process_registry(
+        self
+    ):
+        """Без общего файла метрики хранятся в памяти процесса."""
+        get_registry().clear()
+        self.client.get(
+            reverse('app_posts:index')
+        )
+
+        self.assertIsInstance(
+            get_registry(),
+            Registry
+        )
+        self.assertEqual(
+            self.scrape()[
+                'yatube_http_requests_total'
+                '{view="app_posts:index",status="200"}'
+            ],
+            1
+        )
+
+    @override_settings(
+        METRICS_TOKEN='secret'
+    )
+    def test_access(
+        self
+    ):
+        """Метрики видят только сотрудники и сборщик с токеном."""
+        user = User.objects.create_user(
+            username='auth'
+        )
+        url = reverse(
+            'metrics'
+        )
+        self.assertEqual(
+            self.client.get(url).status_code,
+            403
+        )
+        self.assertEqual(
+            self.client.get(
+                url,
+                HTTP_AUTHORIZATION='Bearer wrong'
+            ).status_code,
+            403
+        )
+        self.assertEqual(
+            self.client.get(
+                url,
+                HTTP_AUTHORIZATION='Bearer secret'
+            ).status_code,
+            200
+        )
+        self.client.force_login(
+            user
+        )
+        self.assertEqual(
+            self.client.get(url).status_code,
+            403
+        )
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from posts.models import Post
+
+from ..paginator import CachedCountPaginator, CountedPaginator
+
+User = get_user_model()
+
+
+class CachedCountPaginatorTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='auth',
+        )
+
+        Post.objects.bulk_create(
+            Post(
+                text=f'Тестовый пост номер {number}',
+                author=cls.user
+            )
+            for number in range(3)
+        )
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+
+    def get_count(
+        self
+    ):
+        return CachedCountPaginator(
+            Post.objects.filter(
+                author=self.user
+            ),
+            10
+        ).count
+
+    def test_count_is_cached(
+        self
+    ):
+        """Повторный подсчет берется из кэша без запроса к БД."""
+        self.assertEqual(
+            self.get_count(),
+            3
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.get_count(),
+                3
+            )
+
+    def test_count_is_invalidated_by_post_signals(
+        self
+    ):
+        """Создание и удаление поста сбрасывает закэшированное число."""
+        self.get_count()
+
+        post = Post.objects.create(
+            author=self.user,
+            text='Тестовый пост'
+        )
+        self.assertEqual(
+            self.get_count(),
+            4
+        )
+
+        post.delete()
+        self.assertEqual(
+            self.get_count(),
+            3
+        )
+
+    @override_settings(
+        PAGINATOR_APPROXIMATE_COUNT_THRESHOLD=3
+    )
+    def test_large_count_is_approximate(
+        self
+    ):
+        """Большое число после изменений отдается приблизительным."""
+        self.get_count()
+
+        Post.objects.create(
+            author=self.user,
+            text='Тестовый пост'
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.get_count(),
+                3
+            )
+
+
+class ElidedPageRangeTest(
+    TestCase
+):
+    def test_page_range_is_windowed(
+        self
+    ):
+        """Окно страниц не растет вместе с числом страниц."""
+        paginator = CountedPaginator(
+            range(1000000),
+            10
+        )
+        ellipsis = paginator.ELLIPSIS
+
+        self.assertEqual(
+            list(
+                paginator.get_elided_page_range(
+                    50000
+                )
+            ),
+            [
+                1, 2, ellipsis,
+                49997, 49998, 49999, 50000, 50001, 50002, 50003,
+                ellipsis, 99999, 100000,
+            ]
+        )
+
+    def test_short_page_range_is_not_elided(
+        self
+    ):
+        paginator = CountedPaginator(
+            range(30),
+            10
+        )
+
+        self.assertEqual(
+            list(
+                paginator.get_elided_page_range(
+                    2
+                )
+            ),
+            [1, 2, 3]
+        )
@@ -0,0 +1,226 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..prerender import page_file
+
+User = get_user_model()
+
+
+class PrerenderedPagesTest(
+    TestCase
+):
+    def setUp(
+        self
+    ):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(
+            directory.cleanup
+        )
+        self.root = os.path.join(
+            directory.name,
+            'prerendered'
+        )
+        # Копия шаблонов, которую тест может править.
+        self.templates = os.path.join(
+            directory.name,
+            'templates'
+        )
+        shutil.copytree(
+            settings.TEMPLATES[0]['DIRS'][0],
+            self.templates
+        )
+        templates = [
+            {
+                **settings.TEMPLATES[0],
+                'DIRS': [self.templates],
+            },
+        ]
+        settings_override = override_settings(
+            TEMPLATES=templates,
+            PRERENDER_ROOT=self.root,
+            PRERENDER_CHECK_INTERVAL=0
+        )
+        settings_override.enable()
+        self.addCleanup(
+            settings_override.disable
+        )
+        self.url = reverse(
+            'about:author'
+        )
+
+    def test_anonymous_page_skips_session_and_db(
+        self
+    ):
+        """Аноним получает готовую страницу без запросов и cookie."""
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url
+            )
+
+        self.assertEqual(
+            response['X-Prerendered'],
+            '1'
+        )
+        self.assertContains(
+            response,
+            'Привет, я автор'
+        )
+        self.assertContains(
+            response,
+            reverse('users:login')
+        )
+        self.assertContains(
+            response,
+            'nav-link active'
+        )
+        self.assertFalse(
+            response.cookies
+        )
+
+    @override_settings(
+        SECURE_SSL_REDIRECT=True,
+        SECURE_HSTS_SECONDS=3600,
+        SECURE_CONTENT_TYPE_NOSNIFF=True
+    )
+    def test_security_middleware_applies(
+        self
+    ):
+        """Готовая страница получает заголовки безопасности и HTTPS."""
+        self.assertRedirects(
+            self.client.get(
+                self.url
+            ),
+            f'https://testserver{self.url}',
+            status_code=301,
+            fetch_redirect_response=False
+        )
+
+        response = self.client.get(
+            self.url,
+            secure=True
+        )
+
+        self.assertEqual(
+            response['X-Prerendered'],
+            '1'
+        )
+        self.assertEqual(
+            response['Strict-Transport-Security'],
+            'max-age=3600'
+        )
+        self.assertEqual(
+            response['X-Content-Type-Options'],
+            'nosniff'
+        )
+
+    def test_user_menu_is_filled_in(
+        self
+    ):
+        """Авторизованный пользователь видит в шапке свое меню."""
+        user = User.objects.create_user(
+            username='auth'
+        )
+        self.client.force_login(
+            user
+        )
+
+        response = self.client.get(
+            self.url
+        )
+
+        self.assertContains(
+            response,
+            f'Пользователь: {user.username}'
+        )
+        self.assertIn(
+            'Cookie',
+            response['Vary']
+        )
+
+    def test_not_modified(
+        self
+    ):
+        """Повторный запрос с ETag получает 304."""
+        etag = self.client.get(
+            self.url
+        )['ETag']
+
+        self.assertEqual(
+            self.client.get(
+                self.url,
+                HTTP_IF_NONE_MATCH=etag
+            ).status_code,
+            304
+        )
+
+    def test_built_pages_are_served(
+        self
+    ):
+        """Страницы, собранные командой, отдаются из PRERENDER_ROOT."""
+        call_command(
+            'prerender_pages',
+            output=self.root,
+            verbosity=0
+        )
+        path = page_file(
+            self.root,
+            'about:author'
+        )
+        with open(path, encoding='utf-8') as file:
+            content = file.read()
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(
+                content.replace(
+                    'Привет, я автор',
+                    'Страница из PRERENDER_ROOT'
+                )
+            )
+
+        self.assertContains(
+            self.client.get(
+                self.url
+            ),
+            'Страница из PRERENDER_ROOT'
+        )
+
+    def test_template_change_rerenders_page(
+        self
+    ):
+        """После правки шаблона страница рендерится заново."""
+        call_command(
+            'prerender_pages',
+            output=self.root,
+            verbosity=0
+        )
+        self.client.get(
+            self.url
+        )
+
+        template = os.path.join(
+            self.templates,
+            'about',
+            'author.html'
+        )
+        with open(template, encoding='utf-8') as file:
+            content = file.read()
+        with open(template, 'w', encoding='utf-8') as file:
+            file.write(
+                content.replace(
+                    'Привет, я автор',
+                    'Обновленный шаблон'
+                )
+            )
+
+        self.assertContains(
+            self.client.get(
+                self.url
+            ),
+            'Обновленный шаблон'
+        )
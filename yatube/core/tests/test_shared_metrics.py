@@ -0,0 +1,209 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from ..metrics import RequestMetrics
+from ..shared_metrics import HEADER_SIZE, SharedRegistry
+
+PROCESSES = 4
+REQUESTS = 250
+
+
+def record_requests(
+    registry,
+    count,
+    view='app_posts:index',
+    status=200
+):
+    metrics = RequestMetrics()
+    metrics.queries = 2
+    for _ in range(count):
+        registry.record(
+            view,
+            status,
+            0.01,
+            metrics,
+            100
+        )
+
+
+def in_child(
+    func,
+    *args
+):
+    """Выполняет func в дочернем процессе; pid процесса."""
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            func(
+                *args
+            )
+        except BaseException:
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+class SharedMetricsTest(
+    SimpleTestCase
+):
+    def setUp(
+        self
+    ):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(
+            directory.cleanup
+        )
+        self.path = os.path.join(
+            directory.name,
+            'metrics.mmap'
+        )
+        self.registry = SharedRegistry(
+            self.path
+        )
+
+    def wait(
+        self,
+        *pids
+    ):
+        for pid in pids:
+            _, status = os.waitpid(
+                pid,
+                0
+            )
+            self.assertTrue(
+                os.WIFEXITED(status)
+            )
+            self.assertEqual(
+                os.WEXITSTATUS(status),
+                0
+            )
+
+    def owners(
+        self
+    ):
+        """pid владельцев занятых областей файла."""
+        registry = self.registry
+        regions = memoryview(
+            registry.map
+        )[HEADER_SIZE:].cast('d')
+        return [
+            int(regions[region * registry.layout.region])
+            for region in range(registry.layout.regions)
+            if regions[region * registry.layout.region]
+        ]
+
+    def test_processes_add_up(
+        self
+    ):
+        """Счетчики параллельных процессов складываются без потерь."""
+        self.registry.collect()
+
+        self.wait(
+            *[
+                in_child(
+                    record_requests,
+                    self.registry,
+                    REQUESTS
+                )
+                for _ in range(PROCESSES)
+            ]
+        )
+
+        view = self.registry.collect()['app_posts:index']
+        total = PROCESSES * REQUESTS
+        self.assertEqual(
+            view['responses'],
+            {200: total}
+        )
+        self.assertEqual(
+            sum(view['buckets']),
+            total
+        )
+        self.assertEqual(
+            view['queries'],
+            2 * total
+        )
+        self.assertEqual(
+            view['response_bytes'],
+            100 * total
+        )
+        self.assertAlmostEqual(
+            view['duration_seconds'],
+            0.01 * total
+        )
+
+    def test_region_of_finished_process_is_reused(
+        self
+    ):
+        """Новый процесс продолжает счетчики завершившегося."""
+        self.registry.collect()
+
+        self.wait(
+            in_child(
+                record_requests,
+                self.registry,
+                10
+            )
+        )
+        self.wait(
+            in_child(
+                record_requests,
+                self.registry,
+                5
+            )
+        )
+
+        self.assertEqual(
+            self.registry.collect()['app_posts:index']['responses'],
+            {200: 15}
+        )
+        self.assertEqual(
+            len(self.owners()),
+            2
+        )
+
+    def test_unknown_view_and_status(
+        self
+    ):
+        """View и коды ответа вне таблицы учитываются как other."""
+        record_requests(
+            self.registry,
+            1,
+            view='posts.views.unnamed',
+            status=418
+        )
+
+        self.assertEqual(
+            self.registry.collect()['other']['responses'],
+            {'other': 1}
+        )
+
+    def test_layout_change_replaces_file(
+        self
+    ):
+        """Процесс с другой раскладкой создает новый файл, старый цел."""
+        record_requests(
+            self.registry,
+            1
+        )
+        with override_settings(METRICS_SHARED_REGIONS=8):
+            registry = SharedRegistry(
+                self.path
+            )
+            self.assertEqual(
+                registry.collect(),
+                {}
+            )
+        record_requests(
+            self.registry,
+            1
+        )
+
+        self.assertEqual(
+            self.registry.collect()['app_posts:index']['responses'],
+            {200: 2}
+        )
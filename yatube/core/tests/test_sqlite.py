@@ -0,0 +1,96 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+
+class SqlitePragmasTest(
+    SimpleTestCase
+):
+    def setUp(
+        self
+    ):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(
+            directory.cleanup
+        )
+        # Отдельное соединение с файлом: у базы в памяти нет WAL.
+        self.connection = connection.copy()
+        self.connection.settings_dict['NAME'] = os.path.join(
+            directory.name,
+            'pragmas.sqlite3'
+        )
+        self.addCleanup(
+            self.connection.close
+        )
+
+    def pragma(
+        self,
+        name
+    ):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'PRAGMA {name}'
+            )
+            return cursor.fetchone()[0]
+
+    def test_new_connection_gets_pragmas(
+        self
+    ):
+        """Новое соединение получает PRAGMA из SQLITE_PRAGMAS."""
+        expected = {
+            'journal_mode': 'wal',
+            # 1 — NORMAL.
+            'synchronous': 1,
+            'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+            'cache_size': settings.SQLITE_PRAGMAS['cache_size'],
+        }
+        for name, value in expected.items():
+            with self.subTest(
+                pragma=name
+            ):
+                self.assertEqual(
+                    self.pragma(
+                        name
+                    ),
+                    value
+                )
+
+    def test_database_settings_override_pragmas(
+        self
+    ):
+        """SQLITE_PRAGMAS базы дополняют общие: у реплики обычный журнал."""
+        self.connection.settings_dict['SQLITE_PRAGMAS'] = {
+            'journal_mode': 'delete',
+        }
+
+        self.assertEqual(
+            self.pragma(
+                'journal_mode'
+            ),
+            'delete'
+        )
+        self.assertEqual(
+            self.pragma(
+                'busy_timeout'
+            ),
+            settings.SQLITE_PRAGMAS['busy_timeout']
+        )
+
+    @override_settings(
+        SQLITE_PRAGMAS={
+            'journal_mode': 'delete',
+        }
+    )
+    def test_pragmas_come_from_settings(
+        self
+    ):
+        """Набор PRAGMA берется из настроек при открытии соединения."""
+        self.assertEqual(
+            self.pragma(
+                'journal_mode'
+            ),
+            'delete'
+        )
@@ -0,0 +1,211 @@
+import gzip
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..staticfiles import (IMMUTABLE_CACHE_CONTROL, MUTABLE_CACHE_CONTROL,
+                           accepted_encodings, gzip_compress)
+
+CSS = 'css/bootstrap.min.css'
+
+
+class StaticFilesTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.static_root = tempfile.TemporaryDirectory()
+        cls.settings_override = override_settings(
+            STATIC_ROOT=cls.static_root.name
+        )
+        cls.settings_override.enable()
+        call_command(
+            'collectstatic',
+            interactive=False,
+            verbosity=0
+        )
+
+    @classmethod
+    def tearDownClass(
+        cls
+    ):
+        cls.settings_override.disable()
+        cls.static_root.cleanup()
+        super().tearDownClass()
+
+    def setUp(
+        self
+    ):
+        # В кэше могли остаться страницы со ссылками без хэшей.
+        cache.clear()
+
+    def get(
+        self,
+        url,
+        **headers
+    ):
+        response = self.client.get(
+            url,
+            **headers
+        )
+        self.assertEqual(
+            response.status_code,
+            200
+        )
+        return response, b''.join(
+            response.streaming_content
+        )
+
+    def test_templates_link_hashed_names(
+        self
+    ):
+        """Шаблоны ссылаются на файлы с хэшем содержимого в имени."""
+        url = staticfiles_storage.url(
+            CSS
+        )
+
+        self.assertRegex(
+            url,
+            r'^/static/css/bootstrap\.min\.[0-9a-f]{12}\.css$'
+        )
+        self.assertContains(
+            self.client.get(
+                '/about/author/'
+            ),
+            url
+        )
+
+    def test_precompressed_variant(
+        self
+    ):
+        """Клиент, принимающий gzip, получает сжатую заранее копию."""
+        url = staticfiles_storage.url(
+            CSS
+        )
+        _, original = self.get(
+            url
+        )
+
+        response, content = self.get(
+            url,
+            HTTP_ACCEPT_ENCODING='gzip, deflate, br;q=0'
+        )
+
+        self.assertEqual(
+            response['Content-Encoding'],
+            'gzip'
+        )
+        self.assertEqual(
+            response['Vary'],
+            'Accept-Encoding'
+        )
+        self.assertEqual(
+            int(response['Content-Length']),
+            len(content)
+        )
+        self.assertLess(
+            len(content),
+            len(original)
+        )
+        self.assertEqual(
+            gzip.decompress(content),
+            original
+        )
+
+    def test_cache_headers(
+        self
+    ):
+        """Файлы с хэшем кэшируются на год, исходные имена — ненадолго."""
+        cases = {
+            staticfiles_storage.url(CSS): IMMUTABLE_CACHE_CONTROL,
+            '/static/' + CSS: MUTABLE_CACHE_CONTROL,
+        }
+        for url, cache_control in cases.items():
+            with self.subTest(
+                url=url
+            ):
+                response, _ = self.get(
+                    url
+                )
+                self.assertEqual(
+                    response['Cache-Control'],
+                    cache_control
+                )
+                self.assertEqual(
+                    response['Content-Type'],
+                    'text/css'
+                )
+
+    def test_not_modified(
+        self
+    ):
+        """Повторный запрос с ETag получает 304 без тела."""
+        url = staticfiles_storage.url(
+            CSS
+        )
+        response, _ = self.get(
+            url
+        )
+
+        self.assertEqual(
+            self.client.get(
+                url,
+                HTTP_IF_NONE_MATCH=response['ETag']
+            ).status_code,
+            304
+        )
+
+    def test_files_outside_static_root(
+        self
+    ):
+        """Пути вне STATIC_ROOT и неизвестные файлы отдают 404."""
+        for url in ('/static/../manage.py', '/static/css/missing.css'):
+            with self.subTest(
+                url=url
+            ):
+                self.assertEqual(
+                    self.client.get(
+                        url
+                    ).status_code,
+                    404
+                )
+
+    def test_accepted_encodings(
+        self
+    ):
+        """q=0 исключает кодировку из Accept-Encoding."""
+        self.assertEqual(
+            accepted_encodings(
+                'gzip;q=1.0, br; q=0, identity'
+            ),
+            {'gzip', 'identity'}
+        )
+
+    def test_gzip_is_reproducible(
+        self
+    ):
+        """Сжатие не зависит от времени сборки и обратимо."""
+        content = b'body { color: black; }' * 100
+        compressed = gzip_compress(
+            content
+        )
+
+        self.assertEqual(
+            compressed,
+            gzip_compress(content)
+        )
+        self.assertEqual(
+            compressed[4:8],
+            bytes(4)
+        )
+        self.assertEqual(
+            gzip.decompress(compressed),
+            content
+        )
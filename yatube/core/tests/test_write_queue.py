@@ -0,0 +1,263 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ..write_queue import WriteQueue, WriteTimeout, run_write, stats
+
+User = get_user_model()
+
+
+def current_thread_name():
+    return threading.current_thread().name
+
+
+@override_settings(
+    WRITE_QUEUE_BACKOFF=0
+)
+class WriteQueueTest(
+    TransactionTestCase
+):
+    def setUp(
+        self
+    ):
+        self.queue = WriteQueue()
+        self.addCleanup(
+            self.queue.stop
+        )
+
+    def submit_in_threads(
+        self,
+        funcs
+    ):
+        """Отправляет записи из отдельных потоков, как параллельные запросы."""
+        results = {}
+        threads = [
+            threading.Thread(
+                target=lambda func=func: results.__setitem__(
+                    func,
+                    self.queue.submit(
+                        func
+                    )
+                )
+            )
+            for func in funcs
+        ]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_write_runs_in_writer_thread(
+        self
+    ):
+        """Запись выполняется потоком-писателем и видна после ответа."""
+        user = self.queue.submit(
+            User.objects.create_user,
+            username='auth'
+        )
+
+        self.assertTrue(
+            User.objects.filter(
+                pk=user.pk
+            ).exists()
+        )
+        self.assertEqual(
+            self.queue.submit(
+                current_thread_name
+            ),
+            'write-queue'
+        )
+
+    def test_waiting_writes_share_transaction(
+        self
+    ):
+        """Записи, накопившиеся в очереди, выполняются одним пакетом."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        blocker, _ = self.submit_in_threads(
+            [block]
+        )
+        started.wait()
+        batches = stats['batches']
+        funcs = [
+            lambda number=number: User.objects.create_user(
+                username=f'user{number}'
+            ).pk
+            for number in range(5)
+        ]
+        threads, results = self.submit_in_threads(
+            funcs
+        )
+        while self.queue.metrics()['depth'] < len(funcs):
+            release.wait(0.01)
+        release.set()
+        for thread in blocker + threads:
+            thread.join()
+
+        self.assertEqual(
+            stats['batches'] - batches,
+            1
+        )
+        self.assertEqual(
+            User.objects.filter(
+                pk__in=results.values()
+            ).count(),
+            len(funcs)
+        )
+        self.assertGreaterEqual(
+            self.queue.metrics()['max_depth'],
+            len(funcs)
+        )
+
+    def test_failed_write_does_not_break_batch(
+        self
+    ):
+        """Ошибка одной записи не откатывает соседние в пакете."""
+        def fail():
+            User.objects.create_user(
+                username='rolled-back'
+            )
+            raise ValueError('Ошибка записи')
+
+        with self.assertRaises(ValueError):
+            self.queue.submit(
+                fail
+            )
+        self.queue.submit(
+            User.objects.create_user,
+            username='saved'
+        )
+
+        self.assertEqual(
+            list(
+                User.objects.values_list(
+                    'username',
+                    flat=True
+                )
+            ),
+            ['saved']
+        )
+
+    def test_locked_database_is_retried(
+        self
+    ):
+        """Занятая база дает повтор с паузой, а не ошибку запроса."""
+        attempts = []
+
+        def flaky():
+            attempts.append(
+                1
+            )
+            if len(attempts) < 3:
+                raise OperationalError('database is locked')
+            return len(attempts)
+
+        retries = stats['retries']
+
+        self.assertEqual(
+            self.queue.submit(
+                flaky
+            ),
+            3
+        )
+        self.assertEqual(
+            stats['retries'] - retries,
+            2
+        )
+
+    @override_settings(
+        WRITE_QUEUE_RETRIES=2
+    )
+    def test_retries_are_bounded(
+        self
+    ):
+        """После WRITE_QUEUE_RETRIES повторов ошибка доходит до вызова."""
+        def locked():
+            raise OperationalError('database is locked')
+
+        with self.assertLogs('core.write_queue', 'WARNING'):
+            with self.assertRaises(OperationalError):
+                self.queue.submit(
+                    locked
+                )
+
+    @override_settings(
+        WRITE_QUEUE_TIMEOUT=0.05
+    )
+    def test_stuck_writer_times_out(
+        self
+    ):
+        """Зависший писатель дает ошибку, а запись снимается с очереди."""
+        started = threading.Event()
+        release = threading.Event()
+        self.addCleanup(
+            release.set
+        )
+
+        def block():
+            started.set()
+            release.wait()
+
+        errors = []
+
+        def submit_block():
+            try:
+                self.queue.submit(
+                    block
+                )
+            except WriteTimeout as error:
+                errors.append(
+                    str(error)
+                )
+
+        timeouts = stats['timeouts']
+        blocker = threading.Thread(
+            target=submit_block
+        )
+        blocker.start()
+        started.wait()
+
+        with self.assertRaisesMessage(WriteTimeout, 'запись отменена'):
+            self.queue.submit(
+                User.objects.create_user,
+                username='late'
+            )
+        release.set()
+        blocker.join()
+
+        self.assertEqual(
+            len(errors),
+            1
+        )
+        self.assertIn(
+            'запись еще выполняется',
+            errors[0]
+        )
+        self.assertEqual(
+            stats['timeouts'] - timeouts,
+            2
+        )
+        self.assertFalse(
+            User.objects.exists()
+        )
+
+
+class RunWriteTest(
+    TestCase
+):
+    def test_write_inside_transaction_runs_in_place(
+        self
+    ):
+        """Внутри транзакции запись не уходит в очередь."""
+        self.assertEqual(
+            run_write(
+                current_thread_name
+            ),
+            threading.current_thread().name
+        )
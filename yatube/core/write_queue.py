@@ -0,0 +1,414 @@
+"""Очередь записей в SQLite: один поток-писатель на процесс.
+
+SQLite допускает одного писателя, и параллельные запросы на запись
+сталкиваются на блокировке базы. run_write передает запись потоку-
+писателю и ждет ее результата. Писатель берет из очереди все, что
+накопилось (до WRITE_QUEUE_BATCH_SIZE записей), и выполняет одной
+транзакцией, каждую запись в своей точке сохранения. Если база занята
+другим процессом, транзакция повторяется с растущей паузой, не больше
+WRITE_QUEUE_RETRIES раз. После отката объекты моделей, которые
+сохраняла запись, снова считаются несохраненными: повтор вставит
+строку заново, а не обновит строку, которой больше нет.
+
+Запрос ждет свою запись не дольше WRITE_QUEUE_TIMEOUT секунд, после
+чего получает WriteTimeout, а не висит вместе с зависшим писателем.
+"""
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db import models, transaction
+
+from .benchmark import percentile
+from .db_router import record_write
+
+logger = logging.getLogger(
+    __name__
+)
+
+# Сколько последних ожиданий хранится для перцентилей.
+WAIT_SAMPLES = 1000
+
+# Статистика процесса для метрик очереди.
+stats = {
+    'submitted': 0,
+    'completed': 0,
+    'failed': 0,
+    'batches': 0,
+    'retries': 0,
+    'timeouts': 0,
+    'max_depth': 0,
+}
+waits = deque(
+    maxlen=WAIT_SAMPLES
+)
+stats_lock = threading.Lock()
+
+
+def is_locked(
+    error
+):
+    """Ошибка занятой базы, после которой транзакцию можно повторить."""
+    message = str(
+        error
+    )
+    return isinstance(
+        error,
+        OperationalError
+    ) and ('locked' in message or 'busy' in message)
+
+
+class DatabaseLocked(
+    Exception
+):
+    """Прерывает пакет, чтобы повторить его целиком."""
+
+
+class WriteTimeout(
+    OperationalError
+):
+    """Поток-писатель не выполнил запись за WRITE_QUEUE_TIMEOUT секунд."""
+
+
+def model_instances(
+    func,
+    args,
+    kwargs
+):
+    """Объекты моделей, которые сохраняет func: post.save, form.save."""
+    owner = getattr(
+        func,
+        '__self__',
+        None
+    )
+    candidates = (
+        owner,
+        getattr(owner, 'instance', None),
+        *args,
+        *kwargs.values(),
+    )
+    return [
+        candidate for candidate in candidates
+        if isinstance(candidate, models.Model)
+    ]
+
+
+class Job:
+    def __init__(
+        self,
+        func,
+        args,
+        kwargs
+    ):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.submitted = time.perf_counter()
+        self.states = [
+            (instance, instance.pk, instance._state.adding)
+            for instance in model_instances(func, args, kwargs)
+        ]
+
+    def reset(
+        self
+    ):
+        """Возвращает объектам pk и _state.adding до записи."""
+        for instance, pk, adding in self.states:
+            instance.pk = pk
+            instance._state.adding = adding
+
+
+class WriteQueue:
+    def __init__(
+        self,
+        using=DEFAULT_DB_ALIAS
+    ):
+        self.using = using
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+
+    def submit(
+        self,
+        func,
+        *args,
+        **kwargs
+    ):
+        """Ставит запись в очередь и ждет ее результата."""
+        job = Job(
+            func,
+            args,
+            kwargs
+        )
+        self.start()
+        self.queue.put(
+            job
+        )
+        with stats_lock:
+            stats['submitted'] += 1
+            stats['max_depth'] = max(
+                stats['max_depth'],
+                self.queue.qsize()
+            )
+        try:
+            return job.future.result(
+                timeout=settings.WRITE_QUEUE_TIMEOUT
+            )
+        except FutureTimeoutError:
+            pass
+        with stats_lock:
+            stats['timeouts'] += 1
+        # Запись, которую писатель еще не взял, снимается с очереди;
+        # начатая может завершиться и после ответа.
+        if job.future.cancel():
+            outcome = 'отменена'
+        else:
+            outcome = 'еще выполняется'
+        raise WriteTimeout(
+            'Очередь записей не ответила за {} с, запись {}'.format(
+                settings.WRITE_QUEUE_TIMEOUT,
+                outcome
+            )
+        )
+
+    def start(
+        self
+    ):
+        # После fork поток-писатель остается в родительском процессе.
+        if self.thread is not None and self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.thread is not None and self.pid == os.getpid():
+                return
+            self.queue = queue.Queue()
+            self.pid = os.getpid()
+            self.thread = threading.Thread(
+                target=self.run,
+                name='write-queue',
+                daemon=True
+            )
+            self.thread.start()
+
+    def stop(
+        self
+    ):
+        """Дожидается записей в очереди и останавливает писателя."""
+        if self.thread is None or self.pid != os.getpid():
+            return
+        self.queue.put(
+            None
+        )
+        self.thread.join()
+        self.thread = None
+
+    def run(
+        self
+    ):
+        try:
+            while True:
+                jobs = self.take()
+                if jobs is None:
+                    return
+                if not jobs:
+                    continue
+                self.run_batch(
+                    jobs
+                )
+        finally:
+            connections.close_all()
+
+    def take(
+        self
+    ):
+        """Первая запись и все, что накопилось за ней в очереди."""
+        job = self.queue.get()
+        if job is None:
+            return None
+        jobs = [
+            job
+        ]
+        while len(jobs) < settings.WRITE_QUEUE_BATCH_SIZE:
+            try:
+                job = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                # Остановка после того, как пакет будет записан.
+                self.queue.put(
+                    None
+                )
+                break
+            jobs.append(
+                job
+            )
+        # Записи, которые не дождались писателя, уже отменены.
+        return [
+            job for job in jobs
+            if job.future.set_running_or_notify_cancel()
+        ]
+
+    def run_batch(
+        self,
+        jobs
+    ):
+        started = time.perf_counter()
+        with stats_lock:
+            stats['batches'] += 1
+            waits.extend(
+                (started - job.submitted) * 1000 for job in jobs
+            )
+        for attempt in range(settings.WRITE_QUEUE_RETRIES + 1):
+            if attempt:
+                with stats_lock:
+                    stats['retries'] += 1
+                time.sleep(
+                    settings.WRITE_QUEUE_BACKOFF * 2 ** (attempt - 1)
+                    * random.uniform(1, 1.5)
+                )
+            try:
+                results = self.write(
+                    jobs
+                )
+            except DatabaseLocked:
+                continue
+            except Exception as error:
+                # BEGIN или COMMIT не удались не из-за блокировки.
+                self.finish(
+                    jobs,
+                    [(None, error)] * len(jobs)
+                )
+                return
+            self.finish(
+                jobs,
+                results
+            )
+            return
+        logger.warning(
+            'База занята, %d записей не выполнено после %d попыток',
+            len(jobs),
+            settings.WRITE_QUEUE_RETRIES + 1
+        )
+        self.finish(
+            jobs,
+            [(None, OperationalError('database is locked'))] * len(jobs)
+        )
+
+    def write(
+        self,
+        jobs
+    ):
+        """Выполняет пакет одной транзакцией: (результат, ошибка) на запись.
+
+        Ошибка одной записи откатывает только ее точку сохранения.
+        """
+        results = []
+        try:
+            with transaction.atomic(using=self.using):
+                for job in jobs:
+                    try:
+                        with transaction.atomic(using=self.using):
+                            result = job.func(
+                                *job.args,
+                                **job.kwargs
+                            )
+                    except Exception as error:
+                        job.reset()
+                        if is_locked(error):
+                            raise DatabaseLocked from error
+                        results.append(
+                            (None, error)
+                        )
+                    else:
+                        results.append(
+                            (result, None)
+                        )
+        except Exception as error:
+            # Откатились и записи, выполненные раньше в этом пакете.
+            for job in jobs:
+                job.reset()
+            if is_locked(error):
+                raise DatabaseLocked from error
+            raise
+        finally:
+            connections[self.using].close_if_unusable_or_obsolete()
+        return results
+
+    def finish(
+        self,
+        jobs,
+        results
+    ):
+        with stats_lock:
+            for result, error in results:
+                stats['failed' if error else 'completed'] += 1
+        for job, (result, error) in zip(jobs, results):
+            if error is None:
+                job.future.set_result(
+                    result
+                )
+            else:
+                job.future.set_exception(
+                    error
+                )
+
+    def metrics(
+        self
+    ):
+        """Снимок статистики: глубина очереди и ожидание записи, мс."""
+        with stats_lock:
+            samples = list(
+                waits
+            )
+            snapshot = dict(
+                stats
+            )
+        snapshot['depth'] = self.queue.qsize()
+        for percent in (50, 95, 99):
+            snapshot[f'wait_p{percent}_ms'] = percentile(
+                samples,
+                percent
+            ) if samples else 0
+        return snapshot
+
+
+write_queue = WriteQueue()
+
+
+def run_write(
+    func,
+    *args,
+    **kwargs
+):
+    """Выполняет func(*args, **kwargs) через поток-писатель.
+
+    Внутри уже открытой транзакции (и при выключенном
+    WRITE_QUEUE_ENABLED) запись выполняется на месте: она должна
+    попасть в транзакцию вызывающего кода.
+    """
+    if (
+        not settings.WRITE_QUEUE_ENABLED
+        or connections[write_queue.using].in_atomic_block
+    ):
+        return func(
+            *args,
+            **kwargs
+        )
+    result = write_queue.submit(
+        func,
+        *args,
+        **kwargs
+    )
+    # Запись прошла в другом потоке; клиент все равно должен читать
+    # из default, пока реплики ее не получили.
+    record_write()
+    return result
@@ -24,6 +24,19 @@ class PostAdmin(
     )
     empty_value_display = '-пусто-'
 
+    def get_search_results(
+        self,
+        request,
+        queryset,
+        search_term
+    ):
+        # Поиск по тексту идет через полнотекстовый индекс, а не LIKE.
+        if not search_term:
+            return queryset, False
+        return queryset.search(
+            search_term
+        ), False
+
 
 admin.site.register(
     Post,
@@ -0,0 +1,325 @@
+"""JSON API только для чтения: ленты постов и отдельный пост.
+
+Ответы собираются из тех же запросов, что и HTML-страницы posts.views,
+но без шаблонов. Ленты листаются курсорами (?after=/?before=), набор
+полей поста задается параметром ?fields=id,text,...; лента загружает из
+базы только колонки этих полей.
+"""
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.http import JsonResponse
+
+from core.paginator import CursorPaginator, InvalidCursor
+
+from .models import Group, Post, User
+from .views import NAMBER_OF_POSTS, author_posts_count
+
+MAX_LIMIT = 100
+
+POST_FIELDS = {
+    'id': lambda post: post.pk,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date.isoformat(),
+    'updated_at': lambda post: post.updated_at.isoformat(),
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group else None,
+}
+
+# Колонки, которые нужны полю ответа; pub_date и id нужны курсору всегда.
+POST_COLUMNS = {
+    'id': (),
+    'text': ('text',),
+    'pub_date': (),
+    'updated_at': ('updated_at',),
+    'author': ('author', 'author__username'),
+    'group': ('group', 'group__slug'),
+}
+RELATED_FIELDS = (
+    'author',
+    'group',
+)
+
+
+class BadRequest(
+    Exception
+):
+    pass
+
+
+def json_response(
+    data,
+    status=200
+):
+    return JsonResponse(
+        data,
+        status=status,
+        json_dumps_params={
+            'ensure_ascii': False,
+            'separators': (',', ':'),
+        }
+    )
+
+
+def not_found():
+    return json_response(
+        {
+            'detail': 'Не найдено.'
+        },
+        status=404
+    )
+
+
+def api_view(
+    view_func
+):
+    """Переводит BadRequest в ответ 400 с текстом ошибки."""
+    @wraps(view_func)
+    def wrapper(
+        request,
+        *args,
+        **kwargs
+    ):
+        try:
+            return view_func(
+                request,
+                *args,
+                **kwargs
+            )
+        except BadRequest as error:
+            return json_response(
+                {
+                    'detail': str(error)
+                },
+                status=400
+            )
+    return wrapper
+
+
+def get_fields(
+    request
+):
+    fields = request.GET.get(
+        'fields'
+    )
+    if not fields:
+        return list(
+            POST_FIELDS
+        )
+    fields = fields.split(
+        ','
+    )
+    unknown = set(
+        fields
+    ) - set(
+        POST_FIELDS
+    )
+    if unknown:
+        raise BadRequest(
+            'Неизвестные поля: {}'.format(
+                ', '.join(sorted(unknown))
+            )
+        )
+    return fields
+
+
+def get_limit(
+    request
+):
+    try:
+        limit = int(
+            request.GET.get(
+                'limit',
+                NAMBER_OF_POSTS
+            )
+        )
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(
+            f'limit должен быть от 1 до {MAX_LIMIT}.'
+        )
+    return limit
+
+
+def only_fields(
+    post_list,
+    fields
+):
+    """Лента, из которой загружаются только колонки полей fields."""
+    post_list = post_list.select_related(
+        None
+    )
+    related = [
+        field for field in RELATED_FIELDS if field in fields
+    ]
+    if related:
+        post_list = post_list.select_related(
+            *related
+        )
+    return post_list.only(
+        'pub_date',
+        *(
+            column for field in fields for column in POST_COLUMNS[field]
+        )
+    )
+
+
+def serialize_post(
+    post,
+    fields
+):
+    return {
+        field: POST_FIELDS[field](post) for field in fields
+    }
+
+
+def page_url(
+    request,
+    **cursor
+):
+    params = {
+        key: value for key, value in request.GET.items()
+        if key not in ('after', 'before')
+    }
+    params.update(
+        cursor
+    )
+    return request.build_absolute_uri(
+        '{}?{}'.format(
+            request.path,
+            urlencode(params)
+        )
+    )
+
+
+def feed_response(
+    request,
+    post_list,
+    **extra
+):
+    """Страница ленты: посты, ссылки на соседние страницы и extra."""
+    fields = get_fields(
+        request
+    )
+    try:
+        page = CursorPaginator(
+            only_fields(
+                post_list,
+                fields
+            ),
+            get_limit(
+                request
+            )
+        ).cursor_page(
+            request.GET.get('after'),
+            request.GET.get('before')
+        )
+    except InvalidCursor as error:
+        raise BadRequest(
+            str(error)
+        )
+    return json_response(
+        {
+            **extra,
+            'results': [
+                serialize_post(post, fields) for post in page
+            ],
+            'next': page_url(
+                request,
+                after=page.next_cursor
+            ) if page.has_next() else None,
+            'previous': page_url(
+                request,
+                before=page.previous_cursor
+            ) if page.has_previous() else None,
+        }
+    )
+
+
+@api_view
+def post_list(
+    request
+):
+    return feed_response(
+        request,
+        Post.objects.feed()
+    )
+
+
+@api_view
+def group_posts(
+    request,
+    slug
+):
+    group = Group.objects.filter(
+        slug=slug
+    ).first()
+    if group is None:
+        return not_found()
+    return feed_response(
+        request,
+        group.posts.feed(),
+        group={
+            'slug': group.slug,
+            'title': group.title,
+            'description': group.description,
+            'posts_count': group.posts_count,
+        }
+    )
+
+
+@api_view
+def profile_posts(
+    request,
+    username
+):
+    author = User.objects.select_related(
+        'post_counter'
+    ).filter(
+        username=username
+    ).first()
+    if author is None:
+        return not_found()
+    return feed_response(
+        request,
+        Post.objects.feed().filter(
+            author=author.id
+        ),
+        author={
+            'username': author.username,
+            'full_name': author.get_full_name(),
+            'posts_count': author_posts_count(
+                author
+            ),
+        }
+    )
+
+
+@api_view
+def post_detail(
+    request,
+    post_id
+):
+    fields = get_fields(
+        request
+    )
+    post = Post.objects.select_related(
+        'author__post_counter',
+        'group'
+    ).filter(
+        pk=post_id
+    ).first()
+    if post is None:
+        return not_found()
+    return json_response(
+        {
+            **serialize_post(
+                post,
+                fields
+            ),
+            'author_posts_count': author_posts_count(
+                post.author
+            ),
+        }
+    )
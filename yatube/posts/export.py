@@ -0,0 +1,230 @@
+"""Потоковая выгрузка постов в JSONL и CSV.
+
+Строки читаются из базы через iterator() пачками по CHUNK_SIZE и сразу
+превращаются в текст, поэтому память не зависит от размера выгрузки.
+"""
+import csv
+import io
+import itertools
+import json
+import zlib
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Post
+
+CHUNK_SIZE = 2000
+
+COLUMNS = (
+    'id',
+    'text',
+    'pub_date',
+    'updated_at',
+    'author',
+    'group',
+)
+
+FORMATS = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class ExportError(
+    ValueError
+):
+    pass
+
+
+def parse_bound(
+    value,
+    end=False
+):
+    """Граница периода: дата-время ISO 8601 или дата (весь день)."""
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(
+            value
+        )
+        if moment is None:
+            day = parse_date(
+                value
+            )
+            if day is not None:
+                moment = datetime.combine(
+                    day,
+                    time.max if end else time.min
+                )
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ExportError(
+            f'Некорректная дата: {value}'
+        )
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(
+            moment
+        )
+    return moment
+
+
+def export_rows(
+    group=None,
+    author=None,
+    since=None,
+    until=None
+):
+    """Кортежи COLUMNS выбранных постов по возрастанию id.
+
+    group — slug группы, author — username, since и until — границы
+    pub_date включительно (строки для parse_bound).
+    """
+    posts = Post.objects.all()
+    if group:
+        posts = posts.filter(
+            group__slug=group
+        )
+    if author:
+        posts = posts.filter(
+            author__username=author
+        )
+    since = parse_bound(
+        since
+    )
+    if since is not None:
+        posts = posts.filter(
+            pub_date__gte=since
+        )
+    until = parse_bound(
+        until,
+        end=True
+    )
+    if until is not None:
+        posts = posts.filter(
+            pub_date__lte=until
+        )
+    return posts.order_by(
+        'pk'
+    ).values_list(
+        'pk',
+        'text',
+        'pub_date',
+        'updated_at',
+        'author__username',
+        'group__slug'
+    ).iterator(
+        chunk_size=CHUNK_SIZE
+    )
+
+
+def to_jsonl(
+    rows
+):
+    for row in rows:
+        row = dict(
+            zip(
+                COLUMNS,
+                row
+            )
+        )
+        row['pub_date'] = row['pub_date'].isoformat()
+        row['updated_at'] = row['updated_at'].isoformat()
+        yield json.dumps(
+            row,
+            ensure_ascii=False
+        ) + '\n'
+
+
+def to_csv(
+    rows
+):
+    buffer = io.StringIO()
+    writer = csv.writer(
+        buffer
+    )
+    rows = (
+        (
+            *row[:2],
+            row[2].isoformat(),
+            row[3].isoformat(),
+            *row[4:],
+        )
+        for row in rows
+    )
+    for row in itertools.chain([COLUMNS], rows):
+        writer.writerow(
+            row
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+SERIALIZERS = {
+    'jsonl': to_jsonl,
+    'csv': to_csv,
+}
+
+
+def encode(
+    lines,
+    gzip=False,
+    buffer_size=64 * 1024
+):
+    """Склеивает строки в куски байтов около buffer_size, по желанию gzip."""
+    compressor = zlib.compressobj(
+        wbits=16 + zlib.MAX_WBITS
+    ) if gzip else None
+    chunk = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        chunk.append(
+            data
+        )
+        size += len(data)
+        if size < buffer_size:
+            continue
+        data = b''.join(
+            chunk
+        )
+        chunk = []
+        size = 0
+        if compressor is not None:
+            data = compressor.compress(
+                data
+            )
+        if data:
+            yield data
+    data = b''.join(
+        chunk
+    )
+    if compressor is not None:
+        data = compressor.compress(
+            data
+        ) + compressor.flush()
+    if data:
+        yield data
+
+
+def export(
+    format='jsonl',
+    gzip=False,
+    **filters
+):
+    """Куски байтов выгрузки постов в формате format (см. FORMATS)."""
+    if format not in SERIALIZERS:
+        raise ExportError(
+            f'Неизвестный формат: {format}'
+        )
+    return encode(
+        SERIALIZERS[format](
+            export_rows(
+                **filters
+            )
+        ),
+        gzip
+    )
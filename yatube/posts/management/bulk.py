@@ -0,0 +1,108 @@
+"""Общие части команд массовой загрузки постов."""
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from posts.models import Post
+
+
+@contextmanager
+def explicit_post_dates():
+    """Сохраняет pub_date и updated_at, заданные у постов явно.
+
+    Обычно pub_date ставится автоматически при создании, а updated_at —
+    при каждом сохранении; при загрузке данных даты берутся из источника.
+    """
+    fields = {
+        'pub_date': 'auto_now_add',
+        'updated_at': 'auto_now',
+    }
+    previous = {
+        name: getattr(
+            Post._meta.get_field(name),
+            flag
+        )
+        for name, flag in fields.items()
+    }
+    for name, flag in fields.items():
+        setattr(
+            Post._meta.get_field(name),
+            flag,
+            False
+        )
+    try:
+        yield
+    finally:
+        for name, flag in fields.items():
+            setattr(
+                Post._meta.get_field(name),
+                flag,
+                previous[name]
+            )
+
+
+class LookupCache:
+    """Ограниченный LRU-кэш значение поля -> pk для массовой загрузки.
+
+    Недостающие ключи целой пачки строк разрешаются одним запросом
+    field__in, поэтому поиск авторов и групп не дает запроса на строку,
+    а память не растет вместе с числом разных ключей.
+    """
+
+    # Столько ключей помещается в один запрос с учетом лимита SQLite.
+    CHUNK_SIZE = 500
+
+    def __init__(
+        self,
+        queryset,
+        field,
+        size=10000
+    ):
+        self.queryset = queryset
+        self.field = field
+        self.size = size
+        self.found = OrderedDict()
+
+    def resolve(
+        self,
+        keys
+    ):
+        """Загружает в кэш ключи пачки, которых в нем еще нет."""
+        keys = set(
+            keys
+        ) - {None}
+        missing = []
+        for key in keys:
+            if key in self.found:
+                # Ключи пачки не должны вытесняться ниже.
+                self.found.move_to_end(
+                    key
+                )
+            else:
+                missing.append(
+                    key
+                )
+        for first in range(0, len(missing), self.CHUNK_SIZE):
+            self.found.update(
+                self.queryset.filter(
+                    **{
+                        f'{self.field}__in':
+                            missing[first:first + self.CHUNK_SIZE]
+                    }
+                ).values_list(
+                    self.field,
+                    'pk'
+                )
+            )
+        while len(self.found) > max(self.size, len(keys)):
+            self.found.popitem(
+                last=False
+            )
+
+    def get(
+        self,
+        key
+    ):
+        """pk по значению поля или None, если такой записи нет."""
+        return self.found.get(
+            key
+        )
@@ -0,0 +1,127 @@
+import time
+from statistics import mean
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import resolve
+
+from core.benchmark import temporary_database
+from core.testing import RuntimeDirectory
+from posts.models import Group, Post
+from posts.views import NAMBER_OF_POSTS, paginate
+
+User = get_user_model()
+
+
+class Command(
+    BaseCommand
+):
+    help = (
+        'Сравнивает время рендера страницы из 10 постов '
+        'с пустым и заполненным кэшем фрагментов постов.'
+    )
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help='Сколько раз рендерить страницу в каждом режиме.'
+        )
+
+    def handle(
+        self,
+        *args,
+        repeat,
+        **options
+    ):
+        # Посты создаются во временной базе, а фрагменты кэшируются во
+        # временном RUNTIME_DIR: замер не трогает данные и кэш сайта.
+        with RuntimeDirectory(), temporary_database():
+            self.create_posts()
+            request = RequestFactory().get(
+                '/'
+            )
+            request.user = AnonymousUser()
+            request.resolver_match = resolve(
+                request.path
+            )
+            page_obj = paginate(
+                request,
+                Post.objects.feed()
+            )
+            context = {
+                'page_obj': page_obj,
+                'title': 'Последние обновления на сайте',
+            }
+
+            cold = []
+            warm = []
+            for _ in range(repeat):
+                cache.clear()
+                cold.append(
+                    self.render(
+                        context,
+                        request
+                    )
+                )
+                warm.append(
+                    self.render(
+                        context,
+                        request
+                    )
+                )
+
+        self.stdout.write(
+            f'Рендер страницы из {len(page_obj)} постов, '
+            f'{repeat} повторов:'
+        )
+        self.stdout.write(
+            f'  без кэша фрагментов: {mean(cold) * 1000:.3f} мс'
+        )
+        self.stdout.write(
+            f'  с кэшем фрагментов:  {mean(warm) * 1000:.3f} мс'
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'  ускорение: {mean(cold) / mean(warm):.2f}x'
+            )
+        )
+
+    def create_posts(
+        self
+    ):
+        author = User.objects.create_user(
+            username='benchmark-fragments'
+        )
+        group = Group.objects.create(
+            title='Группа для замера',
+            slug='benchmark-fragments',
+            description='Временная группа',
+        )
+        for number in range(NAMBER_OF_POSTS):
+            Post.objects.create(
+                author=author,
+                group=group,
+                text=f'Пост для замера рендера номер {number} ' * 5
+            )
+
+    def render(
+        self,
+        context,
+        request
+    ):
+        started = time.perf_counter()
+        render_to_string(
+            'posts/index.html',
+            context,
+            request=request
+        )
+        return time.perf_counter() - started
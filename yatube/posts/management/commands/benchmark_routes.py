@@ -0,0 +1,368 @@
+import json
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core.benchmark import (
+    Route,
+    compare,
+    run_route,
+    temporary_database
+)
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# HTML-страница и ответ JSON API с теми же данными.
+API_PAIRS = {
+    'app_posts:index': 'api:post_list',
+    'app_posts:group_list': 'api:group_posts',
+    'app_posts:profile': 'api:profile_posts',
+    'app_posts:post_detail': 'api:post_detail',
+}
+
+
+class Command(
+    BaseCommand
+):
+    help = (
+        'Замеряет задержку (p50/p95/p99), пропускную способность и число '
+        'SQL-запросов на страницах posts, users и about под нагрузкой '
+        'из нескольких параллельных клиентов. JSON API сравнивается с '
+        'HTML-страницами, собранными без кэша страниц: у API его нет.'
+    )
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=50,
+            help='Сколько авторов создать.'
+        )
+        parser.add_argument(
+            '--groups',
+            type=int,
+            default=10,
+            help='Сколько групп создать.'
+        )
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=5000,
+            help='Сколько постов создать.'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Сколько запросов отправить на каждую страницу.'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Сколько клиентов работает параллельно.'
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Отключить кэш страниц и мерить рендер каждый раз.'
+        )
+        parser.add_argument(
+            '--current-db',
+            action='store_true',
+            help=(
+                'Наполнять текущую базу вместо временной тестовой. '
+                'Созданные данные не удаляются.'
+            )
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл, в который записать результаты в JSON.'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON с прошлыми результатами для сравнения.'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.1,
+            help='Допустимое ухудшение относительно baseline, в долях.'
+        )
+
+    def handle(
+        self,
+        *args,
+        **options
+    ):
+        if min(
+            options['concurrency'],
+            options['requests'],
+            options['posts']
+        ) < 1:
+            raise CommandError(
+                'Число постов, запросов и клиентов должно быть положительным.'
+            )
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(
+                    file
+                )
+
+        if options['current_db']:
+            results = self.run(
+                options
+            )
+        else:
+            with temporary_database():
+                results = self.run(
+                    options
+                )
+
+        self.report(
+            results
+        )
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(
+                    results,
+                    file,
+                    indent=2,
+                    ensure_ascii=False
+                )
+        if baseline is not None:
+            self.compare(
+                results,
+                baseline,
+                options['threshold']
+            )
+
+    def run(
+        self,
+        options
+    ):
+        user = self.seed(
+            options['users'],
+            options['groups'],
+            options['posts']
+        )
+        results = {
+            'dataset': {
+                'users': options['users'],
+                'groups': options['groups'],
+                'posts': options['posts'],
+            },
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'cold': options['cold'],
+            'routes': {},
+        }
+        page_cache_timeout = {'PAGE_CACHE_TIMEOUT': 0} if (
+            options['cold']
+        ) else {}
+        routes = self.get_routes(
+            user
+        )
+        with override_settings(**page_cache_timeout):
+            for route in routes:
+                results['routes'][route.label] = run_route(
+                    route,
+                    user,
+                    options['requests'],
+                    options['concurrency']
+                )
+        if options['cold']:
+            results['html_uncached'] = {
+                name: results['routes'][name] for name in API_PAIRS
+            }
+            return results
+        # Для сравнения с API страницы мерятся еще раз без кэша страниц.
+        results['html_uncached'] = {}
+        with override_settings(PAGE_CACHE_TIMEOUT=0):
+            for route in routes:
+                if route.label in API_PAIRS:
+                    results['html_uncached'][route.label] = run_route(
+                        route,
+                        user,
+                        options['requests'],
+                        options['concurrency']
+                    )
+        return results
+
+    def seed(
+        self,
+        users,
+        groups,
+        posts
+    ):
+        """Наполняет базу и возвращает самого активного автора."""
+        call_command(
+            'seed_yatube',
+            users=max(users, 1),
+            groups=max(groups, 1),
+            posts=posts,
+            stdout=self.stdout
+        )
+        return User.objects.order_by(
+            '-post_counter__posts_count',
+            'pk'
+        ).first()
+
+    def get_routes(
+        self,
+        user
+    ):
+        post = Post.objects.filter(
+            author=user
+        ).order_by(
+            '-pk'
+        ).first()
+        group = Group.objects.order_by(
+            '-posts_count'
+        ).first()
+        return [
+            Route(
+                'app_posts:index'
+            ),
+            Route(
+                'app_posts:index',
+                query='page=5'
+            ),
+            Route(
+                'app_posts:group_list',
+                {'slug': group.slug}
+            ),
+            Route(
+                'app_posts:profile',
+                {'username': user.username}
+            ),
+            Route(
+                'app_posts:post_detail',
+                {'post_id': post.pk}
+            ),
+            Route(
+                'app_posts:post_edit',
+                {'post_id': post.pk},
+                login=True
+            ),
+            Route(
+                'app_posts:search',
+                query=urlencode(
+                    {'q': post.text.split()[0]}
+                ),
+                label='app_posts:search'
+            ),
+            Route(
+                'app_posts:post_create',
+                login=True
+            ),
+            Route(
+                'about:author'
+            ),
+            Route(
+                'about:tech'
+            ),
+            Route(
+                'users:signup'
+            ),
+            Route(
+                'users:login'
+            ),
+            Route(
+                'api:post_list'
+            ),
+            Route(
+                'api:group_posts',
+                {'slug': group.slug}
+            ),
+            Route(
+                'api:profile_posts',
+                {'username': user.username}
+            ),
+            Route(
+                'api:post_detail',
+                {'post_id': post.pk}
+            ),
+        ]
+
+    def report(
+        self,
+        results
+    ):
+        self.stdout.write(
+            '{:<32} {:>9} {:>9} {:>9} {:>9} {:>8} {:>8} {:>7}'.format(
+                'страница',
+                'p50, мс',
+                'p95, мс',
+                'p99, мс',
+                'зап./с',
+                'SQL',
+                'байт',
+                'ошибки'
+            )
+        )
+        for name, route in results['routes'].items():
+            self.stdout.write(
+                '{:<32} {:>9.2f} {:>9.2f} {:>9.2f} {:>9.1f} '
+                '{:>8.1f} {:>8.0f} {:>7}'.format(
+                    name,
+                    route['p50_ms'],
+                    route['p95_ms'],
+                    route['p99_ms'],
+                    route['throughput_rps'],
+                    route['queries'],
+                    route['bytes'],
+                    route['errors']
+                )
+            )
+
+        self.stdout.write(
+            '\nJSON API относительно HTML без кэша страниц '
+            '(доля объема и p50):'
+        )
+        for html_name, api_name in API_PAIRS.items():
+            html = results['html_uncached'][html_name]
+            api = results['routes'][api_name]
+            self.stdout.write(
+                '{:<32} {:>8.0%} {:>9.0%}'.format(
+                    api_name,
+                    api['bytes'] / html['bytes'],
+                    api['p50_ms'] / html['p50_ms']
+                )
+            )
+
+    def compare(
+        self,
+        results,
+        baseline,
+        threshold
+    ):
+        regressions = compare(
+            results,
+            baseline,
+            threshold
+        )
+        if not regressions:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    'Ухудшений относительно baseline нет.'
+                )
+            )
+            return
+        for name, metric, previous, current in regressions:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'{name}: {metric} {previous:.2f} -> {current:.2f}'
+                )
+            )
+        raise CommandError(
+            f'Ухудшений относительно baseline: {len(regressions)}'
+        )
@@ -0,0 +1,268 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test.utils import override_settings
+
+from core.benchmark import percentile, temporary_database
+from posts.models import Post
+from posts.views import NAMBER_OF_POSTS
+
+User = get_user_model()
+
+# Настройки SQLite и Django по умолчанию: журнал отката, полная
+# синхронизация и новое соединение на каждый запрос.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+}
+
+
+class Command(
+    BaseCommand
+):
+    help = (
+        'Сравнивает SQLite без настройки, с SQLITE_PRAGMAS и с SQLITE_PRAGMAS '
+        'плюс постоянными соединениями под смешанной нагрузкой: '
+        'читатели листают ленту, писатели создают посты.'
+    )
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=20000,
+            help='Сколько постов создать перед замером.'
+        )
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=4,
+            help='Сколько потоков читает ленту.'
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=2,
+            help='Сколько потоков создает посты.'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Сколько секунд длится каждый замер.'
+        )
+        parser.add_argument(
+            '--write-pause',
+            type=float,
+            default=10,
+            help='Пауза писателя между постами, мс.'
+        )
+
+    def handle(
+        self,
+        *args,
+        **options
+    ):
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                'Замер имеет смысл только для SQLite.'
+            )
+        if min(
+            options['posts'],
+            options['readers'],
+            options['writers']
+        ) < 1 or options['duration'] <= 0:
+            raise CommandError(
+                'Число постов, потоков и длительность должны быть '
+                'положительными.'
+            )
+        profiles = (
+            ('по умолчанию', DEFAULT_PRAGMAS, False),
+            ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS, False),
+            ('SQLITE_PRAGMAS + CONN_MAX_AGE', settings.SQLITE_PRAGMAS, True),
+        )
+        with temporary_database():
+            call_command(
+                'seed_yatube',
+                users=50,
+                groups=10,
+                posts=options['posts'],
+                stdout=self.stdout
+            )
+            self.authors = list(
+                User.objects.values_list(
+                    'pk',
+                    flat=True
+                )
+            )
+            results = []
+            for name, pragmas, persistent in profiles:
+                # PRAGMA выполняются при открытии соединения, а
+                # journal_mode можно сменить, только пока оно одно.
+                connections.close_all()
+                with override_settings(SQLITE_PRAGMAS=pragmas):
+                    connection.ensure_connection()
+                    results.append(
+                        (
+                            name,
+                            self.run(
+                                options,
+                                persistent
+                            ),
+                        )
+                    )
+            connections.close_all()
+        self.report(
+            results
+        )
+
+    def run(
+        self,
+        options,
+        persistent
+    ):
+        """Один замер: читатели и писатели работают duration секунд."""
+        stop = threading.Event()
+        stats = {
+            'reads': 0,
+            'writes': [],
+            'errors': 0,
+        }
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(
+                    self.read,
+                    stop,
+                    stats,
+                    lock,
+                    persistent,
+                    0
+                )
+            )
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=self.worker,
+                args=(
+                    self.write,
+                    stop,
+                    stats,
+                    lock,
+                    persistent,
+                    options['write_pause'] / 1000
+                )
+            )
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(
+            options['duration']
+        )
+        stop.set()
+        for thread in threads:
+            thread.join()
+        writes = stats['writes'] or [0]
+        return {
+            'reads_per_second': stats['reads'] / options['duration'],
+            'writes': len(stats['writes']),
+            'write_p50_ms': percentile(writes, 50),
+            'write_p95_ms': percentile(writes, 95),
+            'write_p99_ms': percentile(writes, 99),
+            'errors': stats['errors'],
+        }
+
+    def worker(
+        self,
+        operation,
+        stop,
+        stats,
+        lock,
+        persistent,
+        pause
+    ):
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    operation()
+                except OperationalError:
+                    # Блокировка, которую не дождался busy_timeout.
+                    with lock:
+                        stats['errors'] += 1
+                    continue
+                finally:
+                    if not persistent:
+                        connection.close()
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    if operation == self.read:
+                        stats['reads'] += 1
+                    else:
+                        stats['writes'].append(
+                            elapsed
+                        )
+                if pause:
+                    time.sleep(
+                        pause
+                    )
+        finally:
+            connections.close_all()
+
+    def read(
+        self
+    ):
+        list(
+            Post.objects.feed()[:NAMBER_OF_POSTS]
+        )
+
+    def write(
+        self
+    ):
+        # Как post_create: пост и счетчики пишутся в автокоммите.
+        Post.objects.create(
+            author_id=random.choice(
+                self.authors
+            ),
+            text='Пост из замера SQLite'
+        )
+
+    def report(
+        self,
+        results
+    ):
+        self.stdout.write(
+            '{:<32} {:>9} {:>8} {:>9} {:>9} {:>9} {:>7}'.format(
+                'настройка',
+                'чтений/с',
+                'записей',
+                'p50, мс',
+                'p95, мс',
+                'p99, мс',
+                'ошибки'
+            )
+        )
+        for name, result in results:
+            self.stdout.write(
+                '{:<32} {:>9.1f} {:>8} {:>9.2f} {:>9.2f} {:>9.2f} '
+                '{:>7}'.format(
+                    name,
+                    result['reads_per_second'],
+                    result['writes'],
+                    result['write_p50_ms'],
+                    result['write_p95_ms'],
+                    result['write_p99_ms'],
+                    result['errors']
+                )
+            )
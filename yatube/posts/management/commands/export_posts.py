@@ -0,0 +1,93 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(
+    BaseCommand
+):
+    help = (
+        'Выгружает посты с автором и группой в JSONL или CSV, '
+        'не загружая их в память целиком.'
+    )
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            '--format',
+            choices=export.FORMATS,
+            default='jsonl',
+            help='Формат выгрузки.'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать выгрузку gzip.'
+        )
+        parser.add_argument(
+            '--group',
+            help='Только посты группы с этим slug.'
+        )
+        parser.add_argument(
+            '--author',
+            help='Только посты пользователя с этим username.'
+        )
+        parser.add_argument(
+            '--since',
+            help='Только посты не раньше этой даты (ISO 8601).'
+        )
+        parser.add_argument(
+            '--until',
+            help='Только посты не позже этой даты (ISO 8601).'
+        )
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл для выгрузки; по умолчанию stdout.'
+        )
+
+    def handle(
+        self,
+        *args,
+        output,
+        **options
+    ):
+        try:
+            chunks = export.export(
+                options['format'],
+                options['gzip'],
+                group=options['group'],
+                author=options['author'],
+                since=options['since'],
+                until=options['until']
+            )
+        except export.ExportError as error:
+            raise CommandError(
+                error
+            )
+        if output == '-':
+            self.write(
+                chunks,
+                sys.stdout.buffer
+            )
+            return
+        with open(output, 'wb') as file:
+            self.write(
+                chunks,
+                file
+            )
+
+    def write(
+        self,
+        chunks,
+        file
+    ):
+        for chunk in chunks:
+            file.write(
+                chunk
+            )
+        file.flush()
@@ -0,0 +1,389 @@
+import csv
+import itertools
+import json
+import sys
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache_versions import bump_versions
+from posts.forms import PostForm
+from posts.management.bulk import LookupCache, explicit_post_dates
+from posts.models import Group, Post
+from posts.page_cache import INDEX_SCOPE, group_scope, profile_scope
+from posts.signals import change_author_count, change_group_count
+
+User = get_user_model()
+
+
+class InvalidRow(
+    Exception
+):
+    pass
+
+
+def read_jsonl(
+    file
+):
+    for line in file:
+        if not line.strip():
+            yield None
+            continue
+        try:
+            row = json.loads(
+                line
+            )
+        except ValueError as error:
+            yield InvalidRow(
+                f'некорректный JSON: {error}'
+            )
+            continue
+        if not isinstance(row, dict):
+            row = InvalidRow(
+                'строка должна быть JSON-объектом'
+            )
+        yield row
+
+
+def read_csv(
+    file
+):
+    yield from csv.DictReader(
+        file
+    )
+
+
+READERS = {
+    'jsonl': read_jsonl,
+    'csv': read_csv,
+}
+
+
+class Command(
+    BaseCommand
+):
+    help = (
+        'Импортирует посты из JSONL или CSV (файл или stdin) пачками. '
+        'Поля строки: text, author (username), group (slug, '
+        'необязательно), pub_date (ISO 8601, необязательно).'
+    )
+    stealth_options = (
+        'stdin',
+    )
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            'path',
+            help='Файл с постами или «-» для чтения из stdin.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=READERS,
+            help='Формат данных; по умолчанию по расширению файла.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько строк вставлять за одну транзакцию.'
+        )
+        parser.add_argument(
+            '--offset',
+            type=int,
+            default=0,
+            help=(
+                'Сколько строк данных пропустить, например уже '
+                'импортированных до сбоя.'
+            )
+        )
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            default=0,
+            help='Сколько некорректных строк пропустить до остановки.'
+        )
+
+    def handle(
+        self,
+        *args,
+        path,
+        format,
+        batch_size,
+        offset,
+        max_errors,
+        **options
+    ):
+        if batch_size < 1 or offset < 0:
+            raise CommandError(
+                'Размер пачки должен быть положительным, а смещение — нет.'
+            )
+        self.verbosity = options['verbosity']
+        if format is None:
+            format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+        self.text_field = PostForm.base_fields['text']
+        self.authors = LookupCache(
+            User.objects.all(),
+            'username'
+        )
+        self.groups = LookupCache(
+            Group.objects.all(),
+            'slug'
+        )
+
+        if path == '-':
+            file = options.get(
+                'stdin',
+                sys.stdin
+            )
+            self.run(
+                READERS[format](file),
+                batch_size,
+                offset,
+                max_errors
+            )
+            return
+        with open(path, newline='', encoding='utf-8') as file:
+            self.run(
+                READERS[format](file),
+                batch_size,
+                offset,
+                max_errors
+            )
+
+    def run(
+        self,
+        rows,
+        batch_size,
+        offset,
+        max_errors
+    ):
+        position = offset
+        imported = 0
+        errors = 0
+        rows = itertools.islice(
+            rows,
+            offset,
+            None
+        )
+        while True:
+            batch = list(
+                itertools.islice(
+                    rows,
+                    batch_size
+                )
+            )
+            if not batch:
+                break
+            posts, invalid = self.build_posts(
+                batch,
+                position
+            )
+            for number, error in invalid:
+                self.stderr.write(
+                    f'Строка {number}: {error}'
+                )
+            errors += len(invalid)
+            if errors > max_errors:
+                raise CommandError(
+                    f'Некорректных строк больше {max_errors}. '
+                    f'Строки до {position} импортированы, после '
+                    f'исправления продолжите с --offset={position}'
+                )
+            try:
+                self.save_posts(
+                    posts
+                )
+            except DatabaseError as error:
+                raise CommandError(
+                    f'Ошибка базы данных: {error}. Строки до {position} '
+                    f'импортированы, продолжите с --offset={position}'
+                )
+            position += len(batch)
+            imported += len(posts)
+            if self.verbosity >= 1:
+                self.stdout.write(
+                    f'Обработано строк: {position}, '
+                    f'импортировано постов: {imported}, ошибок: {errors}'
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Импорт завершен: {imported} постов.'
+            )
+        )
+
+    def build_posts(
+        self,
+        batch,
+        position
+    ):
+        """Проверяет пачку строк; возвращает посты и ошибки по номерам."""
+        rows = [
+            row for row in batch if isinstance(row, dict)
+        ]
+        self.authors.resolve(
+            row.get('author') for row in rows
+            if isinstance(row.get('author'), str)
+        )
+        self.groups.resolve(
+            row.get('group') for row in rows
+            if isinstance(row.get('group'), str)
+        )
+        now = timezone.now()
+        posts = []
+        invalid = []
+        for number, row in enumerate(batch, position + 1):
+            if row is None:
+                continue
+            try:
+                posts.append(
+                    self.build_post(
+                        row,
+                        now
+                    )
+                )
+            except InvalidRow as error:
+                invalid.append(
+                    (
+                        number,
+                        error
+                    )
+                )
+        return posts, invalid
+
+    def build_post(
+        self,
+        row,
+        now
+    ):
+        if isinstance(row, InvalidRow):
+            raise row
+        pub_date = self.clean_date(
+            row.get('pub_date')
+        ) or now
+        return Post(
+            text=self.clean_text(
+                row.get('text')
+            ),
+            author_id=self.find(
+                self.authors,
+                row.get('author'),
+                'нет пользователя'
+            ),
+            group_id=self.find(
+                self.groups,
+                row.get('group'),
+                'нет группы'
+            ) if row.get('group') else None,
+            pub_date=pub_date,
+            updated_at=pub_date
+        )
+
+    def clean_text(
+        self,
+        value
+    ):
+        """Текст по тем же правилам, что в PostForm и в модели."""
+        try:
+            text = self.text_field.clean(
+                value
+            )
+            Post._meta.get_field(
+                'text'
+            ).run_validators(
+                text
+            )
+        except ValidationError as error:
+            raise InvalidRow(
+                'text: ' + ' '.join(error.messages)
+            )
+        return text
+
+    def find(
+        self,
+        lookups,
+        value,
+        message
+    ):
+        pk = lookups.get(
+            value
+        ) if isinstance(value, str) else None
+        if pk is None:
+            raise InvalidRow(
+                f'{message} {value!r}'
+            )
+        return pk
+
+    def clean_date(
+        self,
+        value
+    ):
+        if not value:
+            return None
+        try:
+            date = parse_datetime(
+                str(value)
+            )
+        except ValueError:
+            date = None
+        if date is None:
+            raise InvalidRow(
+                f'некорректная дата {value!r}'
+            )
+        if timezone.is_naive(date):
+            date = timezone.make_aware(
+                date
+            )
+        return date
+
+    def save_posts(
+        self,
+        posts
+    ):
+        """Вставляет пачку и обновляет счетчики в одной транзакции.
+
+        bulk_create обходит сигналы Post, поэтому счетчики постов и кэш
+        лент обновляются здесь, по одному запросу на автора и группу.
+        """
+        if not posts:
+            return
+        authors = Counter(
+            post.author_id for post in posts
+        )
+        groups = Counter(
+            post.group_id for post in posts if post.group_id is not None
+        )
+        with transaction.atomic(), explicit_post_dates():
+            Post.objects.bulk_create(
+                posts
+            )
+            for author_id, count in authors.items():
+                change_author_count(
+                    author_id,
+                    count
+                )
+            for group_id, count in groups.items():
+                change_group_count(
+                    group_id,
+                    count
+                )
+        bump_versions(
+            INDEX_SCOPE,
+            *(
+                profile_scope(username)
+                for username, pk in self.authors.found.items()
+                if pk in authors
+            ),
+            *(
+                group_scope(slug)
+                for slug, pk in self.groups.found.items()
+                if pk in groups
+            )
+        )
@@ -0,0 +1,164 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import AuthorCounter, Group, Post
+
+User = get_user_model()
+
+
+def iterate_batches(
+    queryset,
+    batch_size
+):
+    """Отдает списки pk по возрастанию, не загружая всю таблицу в память."""
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(
+                pk__gt=last_pk
+            ).order_by(
+                'pk'
+            ).values_list(
+                'pk',
+                flat=True
+            )[:batch_size]
+        )
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def count_posts(
+    field,
+    pks
+):
+    return dict(
+        Post.objects.filter(
+            **{f'{field}__in': pks}
+        ).order_by().values_list(
+            field
+        ).annotate(
+            total=Count('pk')
+        )
+    )
+
+
+class Command(
+    BaseCommand
+):
+    help = 'Пересчитывает счетчики постов авторов и групп.'
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько авторов или групп пересчитывать за транзакцию.'
+        )
+
+    def handle(
+        self,
+        *args,
+        batch_size,
+        **options
+    ):
+        fixed = 0
+        for pks in iterate_batches(
+            Group.objects.all(),
+            batch_size
+        ):
+            fixed += self.rebuild_groups(
+                pks
+            )
+        self.stdout.write(
+            f'Группы пересчитаны, исправлено: {fixed}'
+        )
+
+        fixed = 0
+        for pks in iterate_batches(
+            User.objects.all(),
+            batch_size
+        ):
+            fixed += self.rebuild_authors(
+                pks
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Авторы пересчитаны, исправлено: {fixed}'
+            )
+        )
+
+    @transaction.atomic
+    def rebuild_groups(
+        self,
+        pks
+    ):
+        totals = count_posts(
+            'group',
+            pks
+        )
+        groups = [
+            group for group in Group.objects.filter(
+                pk__in=pks
+            ).only(
+                'posts_count'
+            )
+            if group.posts_count != totals.get(group.pk, 0)
+        ]
+        for group in groups:
+            group.posts_count = totals.get(
+                group.pk,
+                0
+            )
+        Group.objects.bulk_update(
+            groups,
+            [
+                'posts_count'
+            ]
+        )
+        return len(groups)
+
+    @transaction.atomic
+    def rebuild_authors(
+        self,
+        pks
+    ):
+        totals = count_posts(
+            'author',
+            pks
+        )
+        counters = AuthorCounter.objects.in_bulk(
+            pks
+        )
+        changed = [
+            counter for counter in counters.values()
+            if counter.posts_count != totals.get(counter.pk, 0)
+        ]
+        for counter in changed:
+            counter.posts_count = totals.get(
+                counter.pk,
+                0
+            )
+        AuthorCounter.objects.bulk_update(
+            changed,
+            [
+                'posts_count'
+            ]
+        )
+        missing = [
+            AuthorCounter(
+                author_id=pk,
+                posts_count=totals.get(pk, 0)
+            )
+            for pk in pks if pk not in counters
+        ]
+        AuthorCounter.objects.bulk_create(
+            missing
+        )
+        return len(changed) + len(missing)
@@ -0,0 +1,363 @@
+import itertools
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from posts.management.bulk import explicit_post_dates
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# Сколько разных предложений Faker собирать для текстов постов.
+SENTENCES = 2000
+# Доля постов без группы.
+NO_GROUP_SHARE = 0.3
+# Насколько днем постов больше, чем ночью (0 — равномерно, до 1).
+DAILY_AMPLITUDE = 0.6
+
+
+def zipf_weights(
+    count
+):
+    """Накопленные веса: первый автор пишет чаще всех, дальше по 1/n."""
+    return list(
+        itertools.accumulate(
+            1 / rank for rank in range(1, count + 1)
+        )
+    )
+
+
+def post_dates(
+    count,
+    days,
+    rng,
+    now
+):
+    """Даты count постов за последние days дней по возрастанию.
+
+    Случайные точки отрезка генерируются сразу упорядоченными, без списка
+    в памяти. Постов становится больше к текущей дате, как у растущего
+    сайта, а внутри суток их больше днем, чем ночью.
+    """
+    # Отсчет от полуночи, чтобы пик приходился на середину местного дня.
+    start = timezone.localtime(
+        now
+    ).replace(
+        hour=0,
+        minute=0,
+        second=0,
+        microsecond=0
+    ) - timedelta(
+        days=days
+    )
+    position = 1.0
+    for remaining in range(count, 0, -1):
+        # Максимум из remaining равномерных величин, не больших position.
+        position *= rng.random() ** (1 / remaining)
+        offset = math.sqrt(
+            1 - position
+        ) * days
+        day = math.floor(
+            offset
+        )
+        hour = offset - day
+        hour += DAILY_AMPLITUDE * math.sin(
+            2 * math.pi * hour
+        ) / (2 * math.pi)
+        yield start + timedelta(
+            days=day + hour
+        )
+
+
+class Command(
+    BaseCommand
+):
+    help = (
+        'Наполняет базу случайными, но воспроизводимыми пользователями, '
+        'группами и постами для замеров на больших данных.'
+    )
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1000,
+            help='Сколько пользователей создать.'
+        )
+        parser.add_argument(
+            '--groups',
+            type=int,
+            default=50,
+            help='Сколько групп создать.'
+        )
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=100000,
+            help='Сколько постов создать.'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=730,
+            help='За сколько последних дней распределить посты.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=2022,
+            help='Зерно генератора: одинаковое зерно дает одинаковые данные.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Сколько записей вставлять за одну транзакцию.'
+        )
+        parser.add_argument(
+            '--password',
+            help='Пароль всех пользователей; без него вход по паролю закрыт.'
+        )
+
+    def handle(
+        self,
+        *args,
+        users,
+        groups,
+        posts,
+        days,
+        seed,
+        batch_size,
+        password,
+        **options
+    ):
+        if users < 1 or batch_size < 1 or days < 1:
+            raise CommandError(
+                'Нужен хотя бы один пользователь, день и запись в пачке.'
+            )
+        self.verbosity = options['verbosity']
+        rng = random.Random(
+            seed
+        )
+        fake = Faker(
+            'ru_RU'
+        )
+        fake.seed_instance(
+            seed
+        )
+        started = time.perf_counter()
+
+        try:
+            author_ids = self.create_users(
+                fake,
+                users,
+                password,
+                batch_size
+            )
+            group_ids = self.create_groups(
+                fake,
+                groups
+            )
+        except IntegrityError:
+            raise CommandError(
+                'Пользователи или группы с такими именами уже есть: '
+                'команда рассчитана на пустую базу.'
+            )
+        self.create_posts(
+            fake,
+            rng,
+            author_ids,
+            group_ids,
+            posts,
+            days,
+            batch_size
+        )
+        call_command(
+            'rebuild_post_counters',
+            verbosity=self.verbosity,
+            stdout=self.stdout
+        )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Создано пользователей: {users}, групп: {groups}, '
+                f'постов: {posts} за {elapsed:.1f} с'
+            )
+        )
+
+    def insert(
+        self,
+        model,
+        objs
+    ):
+        """Вставляет объекты и возвращает pk новых строк по возрастанию.
+
+        SQLite не возвращает pk из bulk_create, поэтому новые строки
+        находятся по pk больше прежнего максимума.
+        """
+        last_pk = model.objects.aggregate(
+            last_pk=Max('pk')
+        )['last_pk'] or 0
+        model.objects.bulk_create(
+            objs
+        )
+        return list(
+            model.objects.filter(
+                pk__gt=last_pk
+            ).order_by(
+                'pk'
+            ).values_list(
+                'pk',
+                flat=True
+            )
+        )
+
+    def create_users(
+        self,
+        fake,
+        count,
+        password,
+        batch_size
+    ):
+        # Хэш пароля считается один раз: это самая медленная часть.
+        password = make_password(
+            password
+        )
+        ids = []
+        for first in range(0, count, batch_size):
+            with transaction.atomic():
+                ids.extend(
+                    self.insert(
+                        User,
+                        [
+                            User(
+                                username=f'{fake.user_name()}{number}',
+                                first_name=fake.first_name(),
+                                last_name=fake.last_name(),
+                                password=password
+                            )
+                            for number in range(
+                                first,
+                                min(first + batch_size, count)
+                            )
+                        ]
+                    )
+                )
+        return ids
+
+    def create_groups(
+        self,
+        fake,
+        count
+    ):
+        with transaction.atomic():
+            return self.insert(
+                Group,
+                [
+                    Group(
+                        title=fake.sentence(
+                            nb_words=3
+                        ).rstrip('.'),
+                        slug=f'group-{number}',
+                        description=fake.paragraph()
+                    )
+                    for number in range(count)
+                ]
+            )
+
+    def create_posts(
+        self,
+        fake,
+        rng,
+        author_ids,
+        group_ids,
+        count,
+        days,
+        batch_size
+    ):
+        sentences = [
+            fake.sentence(
+                nb_words=10
+            )
+            for _ in range(SENTENCES)
+        ]
+        # Самые активные авторы и группы выбираются случайно.
+        author_ids = rng.sample(
+            author_ids,
+            len(author_ids)
+        )
+        group_ids = rng.sample(
+            group_ids,
+            len(group_ids)
+        )
+        author_weights = zipf_weights(
+            len(author_ids)
+        )
+        group_weights = zipf_weights(
+            len(group_ids)
+        )
+        dates = post_dates(
+            count,
+            days,
+            rng,
+            timezone.now()
+        )
+
+        with explicit_post_dates():
+            for first in range(0, count, batch_size):
+                size = min(
+                    batch_size,
+                    count - first
+                )
+                authors = rng.choices(
+                    author_ids,
+                    cum_weights=author_weights,
+                    k=size
+                )
+                batch = []
+                for author_id, pub_date in zip(
+                    authors,
+                    itertools.islice(dates, size)
+                ):
+                    group_id = None
+                    if group_ids and rng.random() >= NO_GROUP_SHARE:
+                        group_id = rng.choices(
+                            group_ids,
+                            cum_weights=group_weights
+                        )[0]
+                    batch.append(
+                        Post(
+                            text=' '.join(
+                                rng.choices(
+                                    sentences,
+                                    k=rng.randint(1, 6)
+                                )
+                            ),
+                            author_id=author_id,
+                            group_id=group_id,
+                            pub_date=pub_date,
+                            updated_at=pub_date
+                        )
+                    )
+                with transaction.atomic():
+                    Post.objects.bulk_create(
+                        batch
+                    )
+                if self.verbosity >= 2:
+                    self.stdout.write(
+                        f'Постов: {first + size}/{count}'
+                    )
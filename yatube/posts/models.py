@@ -1,10 +1,113 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MinLengthValidator
-from django.db import models
+from django.db import connections, models
+
+from core.cache_versions import bump_versions
+
+from . import search
 
 User = get_user_model()
 
 
+class PostQuerySet(
+    models.QuerySet
+):
+    FEED_FIELDS = (
+        'text',
+        'pub_date',
+        'updated_at',
+        'author',
+        'author__username',
+        'author__first_name',
+        'author__last_name',
+        'group',
+        'group__title',
+        'group__slug',
+        'group__description',
+    )
+
+    def feed(
+        self
+    ):
+        """Посты для лент: автор и группа подгружаются тем же запросом.
+
+        Загружаются только поля, которые выводят шаблоны лент.
+        """
+        return self.select_related(
+            'author',
+            'group'
+        ).only(
+            *self.FEED_FIELDS
+        )
+
+    def search(
+        self,
+        query
+    ):
+        """Посты, в тексте которых есть все слова запроса, лучшие первыми.
+
+        На SQLite поиск идет по индексу FTS5 (см. posts.search), на других
+        СУБД — обычным icontains.
+        """
+        expression = search.match_expression(
+            query
+        )
+        if not expression:
+            return self.none()
+        if not search.is_supported(connections[self.db]):
+            return self.filter(
+                text__icontains=query
+            )
+        return self.extra(
+            select={
+                'search_rank': f'{search.FTS_TABLE}.rank',
+            },
+            tables=[
+                search.FTS_TABLE
+            ],
+            where=[
+                f'{search.FTS_TABLE}.rowid = posts_post.id',
+                f'{search.FTS_TABLE} MATCH %s',
+            ],
+            params=[
+                expression
+            ]
+        ).order_by(
+            'search_rank'
+        )
+
+    # Массовые операции обходят сигналы, поэтому сами сбрасывают
+    # закэшированные счетчики постов.
+
+    def bulk_create(
+        self,
+        *args,
+        **kwargs
+    ):
+        objs = super().bulk_create(
+            *args,
+            **kwargs
+        )
+        bump_versions(
+            self.model._meta.label_lower
+        )
+        return objs
+
+    def update(
+        self,
+        **kwargs
+    ):
+        rows = super().update(
+            **kwargs
+        )
+        bump_versions(
+            self.model._meta.label_lower
+        )
+        return rows
+
+    update.alters_data = True
+
+
 class Group(
     models.Model
 ):
@@ -16,12 +119,33 @@ class Group(
         unique=True
     )
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False
+    )
 
     def __str__(
         self
     ):
         return self.title
 
+    def save(
+        self,
+        *args,
+        **kwargs
+    ):
+        # Счетчик меняют только сигналы Post через UPDATE ... F(),
+        # сохранение группы не должно перезаписать его старым значением.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'posts_count'
+            ]
+        super().save(
+            *args,
+            **kwargs
+        )
+
 
 class Post(
     models.Model
@@ -37,6 +161,9 @@ class Post(
     pub_date = models.DateTimeField(
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -50,12 +177,57 @@ class Post(
         related_name='posts'
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = [
             '-pub_date'
         ]
+        indexes = [
+            models.Index(
+                fields=[
+                    'pub_date'
+                ],
+                name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=[
+                    'author',
+                    'pub_date'
+                ],
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=[
+                    'group',
+                    'pub_date'
+                ],
+                name='post_group_pub_date_idx'
+            ),
+        ]
 
     def __str__(
         self
     ):
         return self.text
+
+
+class AuthorCounter(
+    models.Model
+):
+    """Хранимое число постов автора, обновляется сигналами Post."""
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0
+    )
+
+    def __str__(
+        self
+    ):
+        return f'{self.author}: {self.posts_count}'
@@ -0,0 +1,79 @@
+"""Области кэша страниц posts для core.page_cache.
+
+Страница ленты зависит от своей области и от областей групп и авторов,
+которые сбрасывает любое изменение групп и имен пользователей: ссылки
+на группы и имена авторов есть на всех лентах.
+"""
+
+INDEX_SCOPE = 'page:index'
+GROUPS_SCOPE = 'page:groups'
+AUTHORS_SCOPE = 'page:authors'
+
+
+def group_scope(
+    slug
+):
+    return f'page:group:{slug}'
+
+
+def profile_scope(
+    username
+):
+    return f'page:profile:{username}'
+
+
+def post_scope(
+    post_id
+):
+    return f'page:post:{post_id}'
+
+
+def index_page_scopes(
+    request
+):
+    return [
+        INDEX_SCOPE,
+        GROUPS_SCOPE,
+        AUTHORS_SCOPE,
+    ]
+
+
+def group_page_scopes(
+    request,
+    slug
+):
+    return [
+        group_scope(
+            slug
+        ),
+        GROUPS_SCOPE,
+        AUTHORS_SCOPE,
+    ]
+
+
+def profile_page_scopes(
+    request,
+    username
+):
+    return [
+        profile_scope(
+            username
+        ),
+        GROUPS_SCOPE,
+        AUTHORS_SCOPE,
+    ]
+
+
+def detail_page_scopes(
+    request,
+    post_id
+):
+    # Автор поста станет известен только во view, его область
+    # добавляется через core.page_cache.add_scopes.
+    return [
+        post_scope(
+            post_id
+        ),
+        GROUPS_SCOPE,
+        AUTHORS_SCOPE,
+    ]
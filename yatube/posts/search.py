@@ -0,0 +1,103 @@
+"""Полнотекстовый индекс постов на SQLite FTS5.
+
+Виртуальная таблица posts_post_fts хранит только индекс: текст она берет
+из posts_post (external content), а синхронизируют их триггеры.
+"""
+import re
+
+FTS_TABLE = 'posts_post_fts'
+TRIGGERS = {
+    'posts_post_fts_insert': (
+        'AFTER INSERT ON posts_post BEGIN '
+        'INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); '
+        'END'
+    ),
+    'posts_post_fts_delete': (
+        'AFTER DELETE ON posts_post BEGIN '
+        'INSERT INTO posts_post_fts(posts_post_fts, rowid, text) '
+        "VALUES ('delete', old.id, old.text); "
+        'END'
+    ),
+    'posts_post_fts_update': (
+        'AFTER UPDATE OF text ON posts_post BEGIN '
+        'INSERT INTO posts_post_fts(posts_post_fts, rowid, text) '
+        "VALUES ('delete', old.id, old.text); "
+        'INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); '
+        'END'
+    ),
+}
+
+
+def is_supported(
+    connection
+):
+    return connection.vendor == 'sqlite'
+
+
+def install(
+    connection
+):
+    """Создает индекс и триггеры, если их нет, и заполняет индекс.
+
+    Django пересоздает таблицу SQLite при изменении схемы и теряет ее
+    триггеры, поэтому функция вызывается и после каждой миграции.
+    """
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name FROM sqlite_master '
+            "WHERE type IN ('table', 'trigger') "
+            "AND name LIKE 'posts_post_fts%'"
+        )
+        existing = {
+            row[0] for row in cursor.fetchall()
+        }
+        if FTS_TABLE not in existing:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+                "text, content='posts_post', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        missing = [
+            name for name in TRIGGERS if name not in existing
+        ]
+        for name in missing:
+            cursor.execute(
+                f'CREATE TRIGGER {name} {TRIGGERS[name]}'
+            )
+        if FTS_TABLE not in existing or missing:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+            )
+
+
+def uninstall(
+    connection
+):
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for name in TRIGGERS:
+            cursor.execute(
+                f'DROP TRIGGER IF EXISTS {name}'
+            )
+        cursor.execute(
+            f'DROP TABLE IF EXISTS {FTS_TABLE}'
+        )
+
+
+def match_expression(
+    query
+):
+    """Превращает пользовательский запрос в безопасное выражение MATCH.
+
+    Каждое слово берется в кавычки, поэтому синтаксис FTS5 из запроса
+    не интерпретируется; все слова должны встретиться в тексте.
+    """
+    return ' '.join(
+        f'"{word}"' for word in re.findall(
+            r'\w+',
+            query
+        )
+    )
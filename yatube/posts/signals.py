@@ -0,0 +1,298 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core.cache_versions import bump_versions
+
+from .models import AuthorCounter, Group, Post
+from .page_cache import (AUTHORS_SCOPE, GROUPS_SCOPE, INDEX_SCOPE,
+                         group_scope, post_scope, profile_scope)
+
+User = get_user_model()
+
+# Поля пользователя, которые видны на страницах постов.
+AUTHOR_FIELDS = (
+    'username',
+    'first_name',
+    'last_name',
+)
+
+
+def change_group_count(
+    group_id,
+    delta
+):
+    if group_id is None:
+        return
+    groups = Group.objects.filter(
+        pk=group_id
+    )
+    if delta < 0:
+        groups = groups.filter(
+            posts_count__gte=-delta
+        )
+    groups.update(
+        posts_count=F('posts_count') + delta
+    )
+
+
+def change_author_count(
+    author_id,
+    delta
+):
+    counters = AuthorCounter.objects.filter(
+        author_id=author_id
+    )
+    if delta < 0:
+        counters = counters.filter(
+            posts_count__gte=-delta
+        )
+    updated = counters.update(
+        posts_count=F('posts_count') + delta
+    )
+    if not updated and delta > 0:
+        AuthorCounter.objects.get_or_create(
+            author_id=author_id
+        )
+        counters.update(
+            posts_count=F('posts_count') + delta
+        )
+
+
+@receiver(
+    pre_save,
+    sender=Post
+)
+def remember_previous_group(
+    sender,
+    instance,
+    **kwargs
+):
+    if instance._state.adding:
+        return
+    previous = Post.objects.filter(
+        pk=instance.pk
+    ).values_list(
+        'group_id',
+        'group__slug'
+    ).first()
+    if previous is not None:
+        (
+            instance._previous_group_id,
+            instance._previous_group_slug
+        ) = previous
+
+
+@receiver(
+    post_save,
+    sender=Post
+)
+def count_saved_post(
+    sender,
+    instance,
+    created,
+    **kwargs
+):
+    bump_versions(
+        sender._meta.label_lower
+    )
+    if created:
+        change_author_count(
+            instance.author_id,
+            1
+        )
+        change_group_count(
+            instance.group_id,
+            1
+        )
+        return
+    previous_group_id = getattr(
+        instance,
+        '_previous_group_id',
+        instance.group_id
+    )
+    if previous_group_id != instance.group_id:
+        change_group_count(
+            previous_group_id,
+            -1
+        )
+        change_group_count(
+            instance.group_id,
+            1
+        )
+
+
+@receiver(
+    post_delete,
+    sender=Post
+)
+def count_deleted_post(
+    sender,
+    instance,
+    **kwargs
+):
+    bump_versions(
+        sender._meta.label_lower
+    )
+    change_author_count(
+        instance.author_id,
+        -1
+    )
+    change_group_count(
+        instance.group_id,
+        -1
+    )
+
+
+@receiver(
+    post_save,
+    sender=Post
+)
+@receiver(
+    post_delete,
+    sender=Post
+)
+def invalidate_post_pages(
+    sender,
+    instance,
+    **kwargs
+):
+    scopes = [
+        INDEX_SCOPE,
+        post_scope(
+            instance.pk
+        ),
+        profile_scope(
+            instance.author.username
+        ),
+    ]
+    if instance.group_id is not None:
+        scopes.append(
+            group_scope(
+                instance.group.slug
+            )
+        )
+    previous_slug = getattr(
+        instance,
+        '_previous_group_slug',
+        None
+    )
+    if previous_slug is not None:
+        scopes.append(
+            group_scope(
+                previous_slug
+            )
+        )
+    bump_versions(
+        *scopes
+    )
+
+
+@receiver(
+    pre_save,
+    sender=Group
+)
+@receiver(
+    pre_delete,
+    sender=Group
+)
+def remember_previous_slug(
+    sender,
+    instance,
+    **kwargs
+):
+    if instance._state.adding:
+        return
+    instance._previous_slug = Group.objects.filter(
+        pk=instance.pk
+    ).values_list(
+        'slug',
+        flat=True
+    ).first()
+
+
+@receiver(
+    post_save,
+    sender=Group
+)
+@receiver(
+    post_delete,
+    sender=Group
+)
+def invalidate_group_pages(
+    sender,
+    instance,
+    **kwargs
+):
+    slugs = {
+        instance.slug,
+        getattr(
+            instance,
+            '_previous_slug',
+            None
+        ),
+    }
+    bump_versions(
+        GROUPS_SCOPE,
+        *(
+            group_scope(slug) for slug in slugs if slug
+        )
+    )
+
+
+@receiver(
+    pre_save,
+    sender=User
+)
+def remember_previous_author(
+    sender,
+    instance,
+    update_fields=None,
+    **kwargs
+):
+    # Вход пользователя сохраняет только last_login.
+    if instance._state.adding or (
+        update_fields is not None
+        and not set(update_fields) & set(AUTHOR_FIELDS)
+    ):
+        return
+    instance._previous_author = User.objects.filter(
+        pk=instance.pk
+    ).values_list(
+        *AUTHOR_FIELDS
+    ).first()
+
+
+@receiver(
+    post_save,
+    sender=User
+)
+def invalidate_author_pages(
+    sender,
+    instance,
+    **kwargs
+):
+    previous = getattr(
+        instance,
+        '_previous_author',
+        None
+    )
+    if previous is None:
+        return
+    del instance._previous_author
+    current = tuple(
+        getattr(instance, field) for field in AUTHOR_FIELDS
+    )
+    if previous == current:
+        return
+    bump_versions(
+        AUTHORS_SCOPE,
+        profile_scope(
+            previous[0]
+        ),
+        profile_scope(
+            instance.username
+        )
+    )
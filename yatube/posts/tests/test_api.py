@@ -0,0 +1,277 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..api import MAX_LIMIT, POST_FIELDS
+from ..models import Group, Post
+from ..views import NAMBER_OF_POSTS
+
+User = get_user_model()
+
+POSTS_COUNT = NAMBER_OF_POSTS + 3
+
+
+@override_settings(
+    QUERY_BUDGET_RAISE=True
+)
+class PostApiTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='auth',
+            first_name='Лев',
+            last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        for number in range(POSTS_COUNT):
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group if number % 2 else None,
+                text=f'Тестовый пост номер {number}'
+            )
+        cls.post = Post.objects.order_by(
+            '-pub_date',
+            '-pk'
+        ).first()
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+
+    def get_json(
+        self,
+        url,
+        **params
+    ):
+        response = self.client.get(
+            url,
+            params
+        )
+        self.assertEqual(
+            response.status_code,
+            200
+        )
+        return response.json()
+
+    def test_feed_pages(
+        self
+    ):
+        """Лента листается курсорами вперед и назад."""
+        url = reverse(
+            'api:post_list'
+        )
+        with self.assertNumQueries(1):
+            first = self.get_json(
+                url
+            )
+        self.assertEqual(
+            len(first['results']),
+            NAMBER_OF_POSTS
+        )
+        self.assertEqual(
+            first['results'][0],
+            {
+                'id': self.post.pk,
+                'text': self.post.text,
+                'pub_date': self.post.pub_date.isoformat(),
+                'updated_at': self.post.updated_at.isoformat(),
+                'author': 'auth',
+                'group': None,
+            }
+        )
+        self.assertIsNone(
+            first['previous']
+        )
+
+        second = self.client.get(
+            first['next']
+        ).json()
+        self.assertEqual(
+            len(second['results']),
+            POSTS_COUNT - NAMBER_OF_POSTS
+        )
+        self.assertIsNone(
+            second['next']
+        )
+        self.assertEqual(
+            self.client.get(
+                second['previous']
+            ).json()['results'],
+            first['results']
+        )
+
+    def test_fields_and_limit(
+        self
+    ):
+        """?fields= оставляет только нужные поля, ?limit= задает размер."""
+        data = self.get_json(
+            reverse(
+                'api:post_list'
+            ),
+            fields='id,author',
+            limit=2
+        )
+
+        self.assertEqual(
+            data['results'],
+            [
+                {'id': self.post.pk, 'author': 'auth'},
+                {'id': self.post.pk - 1, 'author': 'auth'},
+            ]
+        )
+        self.assertIn(
+            'fields=id%2Cauthor',
+            data['next']
+        )
+
+    def test_fields_narrow_query(
+        self
+    ):
+        """Лента читает из базы только колонки запрошенных полей."""
+        cases = (
+            ('id', ('"posts_post"."text"', 'JOIN')),
+            ('id,text', ('JOIN',)),
+            ('id,author', ('"posts_post"."text"', '"auth_user"."first_name"')),
+        )
+        for fields, absent in cases:
+            with self.subTest(
+                fields=fields
+            ):
+                with CaptureQueriesContext(connection) as queries:
+                    self.get_json(
+                        reverse(
+                            'api:post_list'
+                        ),
+                        fields=fields
+                    )
+                sql = next(
+                    query['sql'] for query in queries
+                    if 'FROM "posts_post"' in query['sql']
+                )
+                for column in absent:
+                    self.assertNotIn(
+                        column,
+                        sql
+                    )
+
+    def test_group_and_profile_feeds(
+        self
+    ):
+        """Ленты группы и автора отдают их данные и свои посты."""
+        cases = (
+            (
+                reverse('api:group_posts', kwargs={'slug': 'test-slug'}),
+                'group',
+                {
+                    'slug': 'test-slug',
+                    'title': 'Тестовая группа',
+                    'description': 'Тестовое описание',
+                    'posts_count': POSTS_COUNT // 2,
+                },
+            ),
+            (
+                reverse('api:profile_posts', kwargs={'username': 'auth'}),
+                'author',
+                {
+                    'username': 'auth',
+                    'full_name': 'Лев Толстой',
+                    'posts_count': POSTS_COUNT,
+                },
+            ),
+        )
+        for url, key, expected in cases:
+            with self.subTest(url=url):
+                with self.assertNumQueries(2):
+                    data = self.get_json(
+                        url,
+                        fields='group'
+                    )
+                self.assertEqual(
+                    data[key],
+                    expected
+                )
+        self.assertEqual(
+            {
+                post['group'] for post in self.get_json(
+                    cases[0][0],
+                    limit=MAX_LIMIT
+                )['results']
+            },
+            {'test-slug'}
+        )
+
+    def test_post_detail(
+        self
+    ):
+        """Пост отдается одним запросом вместе с числом постов автора."""
+        with self.assertNumQueries(1):
+            data = self.get_json(
+                reverse(
+                    'api:post_detail',
+                    kwargs={
+                        'post_id': self.post.pk
+                    }
+                )
+            )
+
+        self.assertEqual(
+            set(data),
+            set(POST_FIELDS) | {'author_posts_count'}
+        )
+        self.assertEqual(
+            data['author_posts_count'],
+            POSTS_COUNT
+        )
+
+    def test_errors(
+        self
+    ):
+        """Ошибки параметров дают 400, неизвестные объекты — 404."""
+        cases = (
+            (reverse('api:post_list'), {'fields': 'id,password'}, 400),
+            (reverse('api:post_list'), {'limit': MAX_LIMIT + 1}, 400),
+            (reverse('api:post_list'), {'after': 'не-курсор'}, 400),
+            (
+                reverse('api:group_posts', kwargs={'slug': 'nope'}),
+                {},
+                404,
+            ),
+            (
+                reverse('api:profile_posts', kwargs={'username': 'nope'}),
+                {},
+                404,
+            ),
+            (
+                reverse('api:post_detail', kwargs={'post_id': 10 ** 6}),
+                {},
+                404,
+            ),
+        )
+        for url, params, status in cases:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(
+                    url,
+                    params
+                )
+                self.assertEqual(
+                    response.status_code,
+                    status
+                )
+                self.assertIn(
+                    'detail',
+                    response.json()
+                )
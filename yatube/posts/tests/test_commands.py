@@ -0,0 +1,363 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import F, Sum
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import AuthorCounter, Group, Post
+
+User = get_user_model()
+
+
+class SeedCommandTest(
+    TestCase
+):
+    def seed(
+        self,
+        **options
+    ):
+        call_command(
+            'seed_yatube',
+            users=5,
+            groups=3,
+            posts=200,
+            days=30,
+            batch_size=64,
+            stdout=StringIO(),
+            **options
+        )
+
+    def snapshot(
+        self
+    ):
+        return list(
+            Post.objects.order_by(
+                'pk'
+            ).values_list(
+                'text',
+                'author__username',
+                'group__slug'
+            )
+        )
+
+    def test_creates_requested_amounts(
+        self
+    ):
+        """Создается заданное число записей, счетчики согласованы."""
+        self.seed()
+
+        self.assertEqual(
+            User.objects.count(),
+            5
+        )
+        self.assertEqual(
+            Group.objects.count(),
+            3
+        )
+        self.assertEqual(
+            Post.objects.count(),
+            200
+        )
+        self.assertEqual(
+            Group.objects.aggregate(
+                total=Sum('posts_count')
+            )['total'],
+            Post.objects.exclude(
+                group=None
+            ).count()
+        )
+
+    def test_dates_are_spread(
+        self
+    ):
+        """Даты постов разнесены по периоду и растут вместе с pk."""
+        self.seed()
+
+        dates = list(
+            Post.objects.order_by(
+                'pk'
+            ).values_list(
+                'pub_date',
+                flat=True
+            )
+        )
+        self.assertEqual(
+            dates,
+            sorted(dates)
+        )
+        self.assertGreater(
+            (dates[-1] - dates[0]).days,
+            7
+        )
+        self.assertFalse(
+            Post.objects.exclude(
+                updated_at=F('pub_date')
+            ).exists()
+        )
+
+    def test_same_seed_gives_same_data(
+        self
+    ):
+        """Одинаковое зерно дает одинаковые посты, другое — другие."""
+        self.seed()
+        first = self.snapshot()
+
+        Post.objects.all().delete()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.seed()
+        self.assertEqual(
+            self.snapshot(),
+            first
+        )
+
+        Post.objects.all().delete()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.seed(
+            seed=1
+        )
+        self.assertNotEqual(
+            self.snapshot(),
+            first
+        )
+
+    def test_refuses_to_duplicate(
+        self
+    ):
+        """Повторный запуск на той же базе завершается понятной ошибкой."""
+        self.seed()
+
+        with self.assertRaises(CommandError):
+            self.seed()
+
+
+class ImportCommandTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='auth'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+
+    def setUp(
+        self
+    ):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(
+            directory.cleanup
+        )
+        self.directory = directory.name
+
+    def write(
+        self,
+        name,
+        content
+    ):
+        path = os.path.join(
+            self.directory,
+            name
+        )
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(
+                content
+            )
+        return path
+
+    def jsonl(
+        self,
+        rows
+    ):
+        return ''.join(
+            json.dumps(row, ensure_ascii=False) + '\n' for row in rows
+        )
+
+    def make_rows(
+        self,
+        count
+    ):
+        return [
+            {
+                'text': f'Импортированный пост номер {number}',
+                'author': 'auth',
+                'group': 'test-slug' if number % 2 else '',
+                'pub_date': f'2020-01-{number % 28 + 1:02}T10:00:00',
+            }
+            for number in range(count)
+        ]
+
+    def test_import_jsonl(
+        self
+    ):
+        """Посты из JSONL создаются с датами и обновляют счетчики."""
+        path = self.write(
+            'posts.jsonl',
+            self.jsonl(
+                self.make_rows(5)
+            )
+        )
+
+        call_command(
+            'import_posts',
+            path,
+            batch_size=2,
+            stdout=StringIO()
+        )
+
+        self.assertEqual(
+            Post.objects.count(),
+            5
+        )
+        self.assertEqual(
+            Post.objects.order_by(
+                'pk'
+            ).first().pub_date.year,
+            2020
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(
+            self.group.posts_count,
+            2
+        )
+        self.assertEqual(
+            self.user.post_counter.posts_count,
+            5
+        )
+
+    def test_import_csv_from_stdin(
+        self
+    ):
+        """CSV читается из stdin, пустая дата заменяется текущей."""
+        content = StringIO()
+        writer = csv.DictWriter(
+            content,
+            ['text', 'author', 'group', 'pub_date']
+        )
+        writer.writeheader()
+        writer.writerow(
+            {
+                'text': 'Пост из CSV, с запятой и "кавычками"',
+                'author': 'auth',
+                'group': 'test-slug',
+                'pub_date': '',
+            }
+        )
+        content.seek(0)
+
+        call_command(
+            'import_posts',
+            '-',
+            format='csv',
+            stdin=content,
+            stdout=StringIO()
+        )
+
+        post = Post.objects.get()
+        self.assertEqual(
+            post.text,
+            'Пост из CSV, с запятой и "кавычками"'
+        )
+        self.assertEqual(
+            post.group,
+            self.group
+        )
+        self.assertEqual(
+            post.pub_date.date(),
+            timezone.now().date()
+        )
+
+    def test_invalid_rows(
+        self
+    ):
+        """Строки проверяются как в PostForm; ошибки останавливают импорт."""
+        rows = self.make_rows(4)
+        rows[2]['text'] = 'Короткий'
+        rows.append(
+            {'text': 'Пост неизвестного автора', 'author': 'nobody'}
+        )
+        path = self.write(
+            'posts.jsonl',
+            self.jsonl(rows) + 'не JSON\n'
+        )
+
+        with self.assertRaisesMessage(CommandError, '--offset=2'):
+            call_command(
+                'import_posts',
+                path,
+                batch_size=2,
+                stdout=StringIO(),
+                stderr=StringIO()
+            )
+        self.assertEqual(
+            Post.objects.count(),
+            2
+        )
+
+        stderr = StringIO()
+        call_command(
+            'import_posts',
+            path,
+            offset=2,
+            max_errors=3,
+            stdout=StringIO(),
+            stderr=stderr
+        )
+        self.assertEqual(
+            Post.objects.count(),
+            3
+        )
+        for number in (3, 5, 6):
+            with self.subTest(number=number):
+                self.assertIn(
+                    f'Строка {number}:',
+                    stderr.getvalue()
+                )
+
+    def test_lookups_are_batched(
+        self
+    ):
+        """Число запросов на пачку не зависит от числа строк в ней."""
+        AuthorCounter.objects.create(
+            author=self.user
+        )
+        queries = []
+        for count in (10, 100):
+            path = self.write(
+                f'posts-{count}.jsonl',
+                self.jsonl(
+                    self.make_rows(count)
+                )
+            )
+            with CaptureQueriesContext(connection) as context:
+                call_command(
+                    'import_posts',
+                    path,
+                    batch_size=count,
+                    stdout=StringIO()
+                )
+            queries.append(
+                len(context)
+            )
+        self.assertEqual(
+            queries[0],
+            queries[1]
+        )
@@ -0,0 +1,217 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ExportPostsTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='auth'
+        )
+        cls.other_user = User.objects.create_user(
+            username='other'
+        )
+        cls.staff = User.objects.create_user(
+            username='staff',
+            is_staff=True
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Пост в группе, с запятой'
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.other_user,
+            text='Пост без группы'
+        )
+        Post.objects.filter(
+            pk=cls.other_post.pk
+        ).update(
+            pub_date='2020-01-01T12:00:00Z'
+        )
+
+    def setUp(
+        self
+    ):
+        self.client.force_login(
+            self.staff
+        )
+
+    def export(
+        self,
+        **params
+    ):
+        return self.client.get(
+            reverse(
+                'app_posts:export'
+            ),
+            params
+        )
+
+    def read_jsonl(
+        self,
+        response
+    ):
+        return [
+            json.loads(line) for line in b''.join(
+                response.streaming_content
+            ).decode().splitlines()
+        ]
+
+    def test_export_is_staff_only(
+        self
+    ):
+        """Выгрузка доступна только персоналу."""
+        self.client.force_login(
+            self.user
+        )
+        response = self.export()
+
+        self.assertEqual(
+            response.status_code,
+            302
+        )
+
+    def test_export_jsonl(
+        self
+    ):
+        """Выгрузка отдается потоком, по строке JSON на пост."""
+        response = self.export()
+
+        self.assertTrue(
+            response.streaming
+        )
+        self.assertIn(
+            'attachment; filename="posts.jsonl"',
+            response['Content-Disposition']
+        )
+        rows = self.read_jsonl(
+            response
+        )
+        self.assertEqual(
+            rows[0],
+            {
+                'id': self.post.pk,
+                'text': self.post.text,
+                'pub_date': self.post.pub_date.isoformat(),
+                'updated_at': self.post.updated_at.isoformat(),
+                'author': 'auth',
+                'group': 'test-slug',
+            }
+        )
+        self.assertEqual(
+            rows[1]['group'],
+            None
+        )
+
+    def test_export_filters(
+        self
+    ):
+        """Фильтры по группе, автору и периоду отбирают нужные посты."""
+        cases = (
+            ({'group': 'test-slug'}, [self.post.pk]),
+            ({'author': 'other'}, [self.other_post.pk]),
+            ({'since': '2021-01-01'}, [self.post.pk]),
+            ({'until': '2020-01-01'}, [self.other_post.pk]),
+            ({'group': 'test-slug', 'author': 'other'}, []),
+        )
+        for params, expected in cases:
+            with self.subTest(params=params):
+                rows = self.read_jsonl(
+                    self.export(
+                        **params
+                    )
+                )
+                self.assertEqual(
+                    [row['id'] for row in rows],
+                    expected
+                )
+
+    def test_export_bad_date(
+        self
+    ):
+        """Некорректная дата дает ошибку 400 до начала выгрузки."""
+        response = self.export(
+            since='вчера'
+        )
+
+        self.assertEqual(
+            response.status_code,
+            400
+        )
+
+    def test_export_csv_gzip(
+        self
+    ):
+        """CSV сжимается gzip на лету и читается обратно."""
+        response = self.export(
+            format='csv',
+            gzip='1'
+        )
+
+        self.assertEqual(
+            response['Content-Type'],
+            'application/gzip'
+        )
+        content = gzip.decompress(
+            b''.join(
+                response.streaming_content
+            )
+        ).decode()
+        rows = list(
+            csv.DictReader(
+                io.StringIO(content)
+            )
+        )
+        self.assertEqual(
+            [row['text'] for row in rows],
+            [self.post.text, self.other_post.text]
+        )
+
+    def test_export_command(
+        self
+    ):
+        """Команда export_posts пишет ту же выгрузку в файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(
+                directory,
+                'posts.jsonl'
+            )
+            call_command(
+                'export_posts',
+                author='auth',
+                output=path
+            )
+            with open(path, encoding='utf-8') as file:
+                rows = [
+                    json.loads(line) for line in file
+                ]
+
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [self.post.pk]
+        )
@@ -1,9 +1,16 @@
+import threading
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.db import OperationalError
+from django.db.models.signals import post_save, pre_save
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
 from django.urls import reverse
 
+from core.write_queue import stats
+
 from ..models import Group, Post
 
 User = get_user_model()
@@ -33,6 +40,7 @@ class PostForm(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(
             self.user
@@ -156,3 +164,191 @@ class PostForm(TestCase):
                 self.assertEqual(
                     actual, expected
                 )
+
+
+@override_settings(
+    WRITE_QUEUE_BACKOFF=0
+)
+class PostFormWriteQueueTest(
+    TransactionTestCase
+):
+    """Формы постов вне транзакции теста: запись идет через очередь."""
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='auth',
+        )
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        self.authorized_client = Client()
+        self.authorized_client.force_login(
+            self.user
+        )
+        self.form_data = {
+            'text': 'Запись через очередь',
+            'group': self.group.pk,
+        }
+        self.writers = []
+        self.saves = []
+
+    def record_save(
+        self,
+        sender,
+        instance,
+        **kwargs
+    ):
+        self.writers.append(
+            threading.current_thread().name
+        )
+        self.saves.append(
+            (instance.pk, instance._state.adding)
+        )
+
+    def lock_once(
+        self,
+        sender,
+        **kwargs
+    ):
+        """Первая запись поста упирается в занятую базу."""
+        if len(self.saves) == 1:
+            raise OperationalError('database is locked')
+
+    def connect(
+        self,
+        signal,
+        receiver
+    ):
+        signal.connect(
+            receiver,
+            sender=Post
+        )
+        self.addCleanup(
+            signal.disconnect,
+            receiver,
+            sender=Post
+        )
+
+    def test_create_post_through_queue(
+        self
+    ):
+        """Новый пост сохраняет поток-писатель."""
+        self.connect(
+            pre_save,
+            self.record_save
+        )
+        completed = stats['completed']
+
+        response = self.authorized_client.post(
+            reverse(
+                'app_posts:post_create'
+            ),
+            data=self.form_data
+        )
+
+        self.assertRedirects(
+            response,
+            reverse(
+                'app_posts:profile',
+                kwargs={
+                    'username': self.user.username
+                }
+            )
+        )
+        self.assertEqual(
+            self.writers,
+            ['write-queue']
+        )
+        self.assertEqual(
+            stats['completed'] - completed,
+            1
+        )
+        self.assertTrue(
+            Post.objects.filter(
+                author=self.user,
+                **self.form_data
+            ).exists()
+        )
+
+    def test_edit_post_through_queue(
+        self
+    ):
+        """Изменения поста сохраняет поток-писатель."""
+        post = Post.objects.create(
+            author=self.user,
+            text='Тестовый пост 555'
+        )
+        self.connect(
+            pre_save,
+            self.record_save
+        )
+
+        response = self.authorized_client.post(
+            reverse(
+                'app_posts:post_edit',
+                args=(
+                    post.pk,
+                )
+            ),
+            data=self.form_data
+        )
+
+        self.assertRedirects(
+            response,
+            reverse(
+                'app_posts:post_detail',
+                args=(
+                    post.pk,
+                )
+            )
+        )
+        self.assertEqual(
+            self.writers,
+            ['write-queue']
+        )
+        post.refresh_from_db()
+        self.assertEqual(
+            (post.text, post.group_id),
+            (self.form_data['text'], self.group.pk)
+        )
+
+    def test_retried_create_inserts_post_again(
+        self
+    ):
+        """Повтор после отката вставляет пост заново, а не обновляет."""
+        self.connect(
+            pre_save,
+            self.record_save
+        )
+        self.connect(
+            post_save,
+            self.lock_once
+        )
+        retries = stats['retries']
+
+        self.authorized_client.post(
+            reverse(
+                'app_posts:post_create'
+            ),
+            data=self.form_data
+        )
+
+        self.assertEqual(
+            stats['retries'] - retries,
+            1
+        )
+        self.assertEqual(
+            self.saves,
+            [(None, True), (None, True)]
+        )
+        self.assertEqual(
+            Post.objects.filter(
+                author=self.user
+            ).count(),
+            1
+        )
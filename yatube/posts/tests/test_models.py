@@ -1,4 +1,7 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
 from ..models import Group, Post
@@ -50,3 +53,87 @@ class PostModelTest(
                 group.slug
             )
         )
+
+
+class PostCounterTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+
+    def assertCounts(
+        self,
+        author_count,
+        group_count,
+        other_group_count
+    ):
+        self.user.post_counter.refresh_from_db()
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(
+            (
+                self.user.post_counter.posts_count,
+                self.group.posts_count,
+                self.other_group.posts_count,
+            ),
+            (
+                author_count,
+                group_count,
+                other_group_count,
+            )
+        )
+
+    def test_counters_follow_post_changes(
+        self
+    ):
+        """Счетчики меняются при создании, переносе и удалении поста."""
+        post = Post.objects.create(
+            author=self.user,
+            text='Тестовый пост',
+            group=self.group
+        )
+        self.assertCounts(1, 1, 0)
+
+        post.group = self.other_group
+        post.save()
+        self.assertCounts(1, 0, 1)
+
+        post.delete()
+        self.assertCounts(0, 0, 0)
+
+    def test_rebuild_command_fixes_drift(
+        self
+    ):
+        """Команда rebuild_post_counters исправляет разошедшиеся счетчики."""
+        Post.objects.bulk_create(
+            Post(
+                author=self.user,
+                text=f'Тестовый пост {number}',
+                group=self.group
+            )
+            for number in range(3)
+        )
+
+        call_command(
+            'rebuild_post_counters',
+            batch_size=1,
+            stdout=StringIO()
+        )
+
+        self.assertCounts(3, 3, 0)
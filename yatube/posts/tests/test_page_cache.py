@@ -0,0 +1,506 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache_versions import bump_versions
+from core.page_cache import USER_MENU_HOLE
+from core.testing import in_other_process
+
+from ..models import Group, Post
+from ..page_cache import INDEX_SCOPE
+
+User = get_user_model()
+
+
+class PageCacheTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='auth',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group
+        )
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(
+            self.user
+        )
+        self.urls = {
+            'index': reverse(
+                'app_posts:index'
+            ),
+            'group': reverse(
+                'app_posts:group_list',
+                kwargs={
+                    'slug': self.group.slug
+                }
+            ),
+            'other_group': reverse(
+                'app_posts:group_list',
+                kwargs={
+                    'slug': self.other_group.slug
+                }
+            ),
+            'profile': reverse(
+                'app_posts:profile',
+                kwargs={
+                    'username': self.user.username
+                }
+            ),
+            'detail': reverse(
+                'app_posts:post_detail',
+                kwargs={
+                    'post_id': self.post.pk
+                }
+            ),
+        }
+
+    def test_anonymous_page_is_served_from_cache(
+        self
+    ):
+        """Повторный запрос страницы отдается из кэша без запросов к БД."""
+        for url in self.urls.values():
+            with self.subTest(
+                url=url
+            ):
+                first = self.client.get(
+                    url
+                )
+                with self.assertNumQueries(0):
+                    second = self.client.get(
+                        url
+                    )
+                self.assertEqual(
+                    second['X-Page-Cache'],
+                    'hit'
+                )
+                self.assertEqual(
+                    first.content,
+                    second.content
+                )
+
+    def test_cached_page_gets_current_user_menu(
+        self
+    ):
+        """Закэшированная страница получает меню текущего пользователя."""
+        self.client.get(
+            self.urls['index']
+        )
+
+        response = self.authorized_client.get(
+            self.urls['index']
+        )
+
+        self.assertEqual(
+            response['X-Page-Cache'],
+            'hit'
+        )
+        self.assertContains(
+            response,
+            f'Пользователь: {self.user.username}'
+        )
+        self.assertNotContains(
+            response,
+            USER_MENU_HOLE
+        )
+        self.assertNotContains(
+            self.client.get(
+                self.urls['index']
+            ),
+            f'Пользователь: {self.user.username}'
+        )
+
+    def test_new_post_invalidates_related_pages_only(
+        self
+    ):
+        """Новый пост сбрасывает кэш только страниц, где он виден."""
+        for url in self.urls.values():
+            self.client.get(
+                url
+            )
+
+        Post.objects.create(
+            author=self.user,
+            text='Еще один тестовый пост',
+            group=self.group
+        )
+
+        expected = {
+            'index': 'miss',
+            'group': 'miss',
+            'other_group': 'hit',
+            'profile': 'miss',
+            'detail': 'miss',
+        }
+        for name, state in expected.items():
+            with self.subTest(
+                page=name
+            ):
+                self.assertEqual(
+                    self.client.get(
+                        self.urls[name]
+                    )['X-Page-Cache'],
+                    state
+                )
+
+    def test_change_in_other_process_invalidates_page(
+        self
+    ):
+        """Изменение, записанное другим процессом сервера, сбрасывает кэш."""
+        self.client.get(
+            self.urls['index']
+        )
+
+        self.assertTrue(
+            in_other_process(
+                lambda: bump_versions(INDEX_SCOPE) or True
+            )
+        )
+
+        self.assertEqual(
+            self.client.get(
+                self.urls['index']
+            )['X-Page-Cache'],
+            'miss'
+        )
+
+    def test_group_change_invalidates_group_pages(
+        self
+    ):
+        """Изменение группы сбрасывает кэш ее страницы."""
+        self.client.get(
+            self.urls['group']
+        )
+
+        self.group.description = 'Новое описание'
+        self.group.save()
+
+        response = self.client.get(
+            self.urls['group']
+        )
+        self.assertEqual(
+            response['X-Page-Cache'],
+            'miss'
+        )
+        self.assertContains(
+            response,
+            'Новое описание'
+        )
+
+    def test_author_rename_invalidates_pages_with_author(
+        self
+    ):
+        """Новое имя автора сразу видно на всех страницах с его постами."""
+        urls = [
+            self.urls[name]
+            for name in ('index', 'group', 'profile', 'detail')
+        ]
+        for url in urls:
+            self.client.get(
+                url
+            )
+
+        author = User.objects.get(
+            pk=self.user.pk
+        )
+        author.first_name = 'Новое'
+        author.last_name = 'Имя'
+        author.save()
+
+        for url in urls:
+            with self.subTest(
+                url=url
+            ):
+                response = self.client.get(
+                    url
+                )
+                self.assertEqual(
+                    response['X-Page-Cache'],
+                    'miss'
+                )
+                self.assertContains(
+                    response,
+                    'Новое Имя'
+                )
+
+    def test_login_keeps_pages_cached(
+        self
+    ):
+        """Вход пользователя (обновление last_login) не сбрасывает кэш."""
+        self.client.get(
+            self.urls['index']
+        )
+
+        self.user.set_password(
+            'password'
+        )
+        self.user.save()
+        self.assertTrue(
+            Client().login(
+                username=self.user.username,
+                password='password'
+            )
+        )
+
+        self.assertEqual(
+            self.client.get(
+                self.urls['index']
+            )['X-Page-Cache'],
+            'hit'
+        )
+
+    def test_unchanged_page_is_not_modified(
+        self
+    ):
+        """Клиент с актуальным ETag получает 304 без запросов к БД."""
+        for url in self.urls.values():
+            with self.subTest(
+                url=url
+            ):
+                etag = self.client.get(
+                    url
+                )['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(
+                        url,
+                        HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(
+                    response.status_code,
+                    304
+                )
+                self.assertEqual(
+                    response['ETag'],
+                    etag
+                )
+
+    def test_if_modified_since(
+        self
+    ):
+        """Страница не отдается заново, если не менялась с Last-Modified."""
+        last_modified = self.client.get(
+            self.urls['group']
+        )['Last-Modified']
+
+        response = self.client.get(
+            self.urls['group'],
+            HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(
+            response.status_code,
+            304
+        )
+
+    def test_changed_page_gets_new_etag(
+        self
+    ):
+        """После изменения данных старый ETag дает полную страницу."""
+        etags = {
+            name: self.client.get(
+                url
+            )['ETag']
+            for name, url in self.urls.items()
+        }
+
+        self.post.text = 'Отредактированный пост'
+        self.post.save()
+
+        expected = {
+            'index': 200,
+            'group': 200,
+            'other_group': 304,
+            'profile': 200,
+            'detail': 200,
+        }
+        for name, status in expected.items():
+            with self.subTest(
+                page=name
+            ):
+                self.assertEqual(
+                    self.client.get(
+                        self.urls[name],
+                        HTTP_IF_NONE_MATCH=etags[name]
+                    ).status_code,
+                    status
+                )
+
+    def test_etag_is_shared_between_processes(
+        self
+    ):
+        """Другой процесс сервера отдает тот же ETag и видит его смену."""
+        url = self.urls['index']
+        etag = self.client.get(
+            url
+        )['ETag']
+
+        self.assertTrue(
+            in_other_process(
+                lambda: Client().get(
+                    url,
+                    HTTP_IF_NONE_MATCH=etag
+                ).status_code == 304
+            )
+        )
+        self.assertTrue(
+            in_other_process(
+                lambda: bump_versions(INDEX_SCOPE) or True
+            )
+        )
+
+        response = self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(
+            response.status_code,
+            200
+        )
+        self.assertNotEqual(
+            response['ETag'],
+            etag
+        )
+
+    def test_etag_depends_on_user(
+        self
+    ):
+        """ETag анонима не подходит авторизованному: у них разные шапки."""
+        etag = self.client.get(
+            self.urls['index']
+        )['ETag']
+
+        response = self.authorized_client.get(
+            self.urls['index'],
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(
+            response.status_code,
+            200
+        )
+        self.assertNotEqual(
+            response['ETag'],
+            etag
+        )
+
+
+class PostFragmentCacheTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.post = Post.objects.create(
+            author=User.objects.create_user(
+                username='auth',
+            ),
+            text='Тестовый пост'
+        )
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+        # Тесты меняют автора, поэтому он загружается заново.
+        self.user = User.objects.get(
+            pk=self.post.author_id
+        )
+
+    def get_index(
+        self
+    ):
+        return self.client.get(
+            reverse(
+                'app_posts:index'
+            )
+        )
+
+    def test_post_block_is_cached_until_post_is_saved(
+        self
+    ):
+        """Блок поста берется из кэша, пока не изменится updated_at."""
+        self.get_index()
+
+        Post.objects.filter(
+            pk=self.post.pk
+        ).update(
+            text='Текст без обновления updated_at'
+        )
+        # Страница собирается заново, но блок поста берется из кэша.
+        bump_versions(
+            INDEX_SCOPE
+        )
+        self.assertContains(
+            self.get_index(),
+            'Тестовый пост'
+        )
+
+        self.post.text = 'Отредактированный пост'
+        self.post.save()
+        self.assertContains(
+            self.get_index(),
+            'Отредактированный пост'
+        )
+
+    def test_post_block_shows_renamed_author_and_group(
+        self
+    ):
+        """Новое имя автора и адрес группы сразу видны в блоке поста."""
+        group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.filter(
+            pk=self.post.pk
+        ).update(
+            group=group
+        )
+        self.get_index()
+
+        self.user.first_name = 'Новое'
+        self.user.last_name = 'Имя'
+        self.user.save()
+        self.assertContains(
+            self.get_index(),
+            'Новое Имя'
+        )
+
+        group.slug = 'new-slug'
+        group.save()
+        self.assertContains(
+            self.get_index(),
+            reverse(
+                'app_posts:group_list',
+                kwargs={
+                    'slug': 'new-slug'
+                }
+            )
+        )
@@ -0,0 +1,165 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.query_budget import QueryBudgetExceeded
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(
+    QUERY_BUDGET_RAISE=True
+)
+class QueryBudgetTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        Group.objects.bulk_create(
+            Group(
+                title=f'Тестовая группа {number}',
+                slug=f'test-slug-{number}',
+                description='Тестовое описание',
+            )
+            for number in range(5)
+        )
+        cls.groups = list(
+            Group.objects.all()
+        )
+        User.objects.bulk_create(
+            User(
+                username=f'author{number}',
+                first_name='Имя',
+                last_name=f'Фамилия {number}',
+            )
+            for number in range(20)
+        )
+        cls.authors = list(
+            User.objects.all()
+        )
+        Post.objects.bulk_create(
+            Post(
+                author=cls.authors[number % len(cls.authors)],
+                group=cls.groups[number % len(cls.groups)],
+                text=f'Тестовый пост номер {number}',
+            )
+            for number in range(500)
+        )
+        call_command(
+            'rebuild_post_counters',
+            stdout=StringIO()
+        )
+        cls.user = cls.authors[0]
+        cls.post = Post.objects.filter(
+            author=cls.user
+        ).first()
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(
+            self.user
+        )
+
+    def test_posts_urls_fit_query_budget(
+        self
+    ):
+        """Страницы posts укладываются в бюджет запросов на большой базе."""
+        urls = [
+            reverse(
+                'app_posts:index'
+            ),
+            reverse(
+                'app_posts:index'
+            ) + '?page=20',
+            reverse(
+                'app_posts:group_list',
+                kwargs={
+                    'slug': self.groups[0].slug
+                }
+            ),
+            reverse(
+                'app_posts:profile',
+                kwargs={
+                    'username': self.user.username
+                }
+            ),
+            reverse(
+                'app_posts:post_detail',
+                kwargs={
+                    'post_id': self.post.pk
+                }
+            ),
+            reverse(
+                'app_posts:post_create'
+            ),
+            reverse(
+                'app_posts:post_edit',
+                kwargs={
+                    'post_id': self.post.pk
+                }
+            ),
+        ]
+        for client in (self.client, self.authorized_client):
+            for url in urls:
+                with self.subTest(
+                    url=url
+                ):
+                    cache.clear()
+                    client.get(
+                        url
+                    )
+
+    def test_post_forms_fit_query_budget(
+        self
+    ):
+        """Создание и редактирование поста укладываются в бюджет."""
+        self.authorized_client.post(
+            reverse(
+                'app_posts:post_create'
+            ),
+            data={
+                'text': 'Тестовый пост из формы',
+                'group': self.groups[0].pk,
+            }
+        )
+        self.authorized_client.post(
+            reverse(
+                'app_posts:post_edit',
+                kwargs={
+                    'post_id': self.post.pk
+                }
+            ),
+            data={
+                'text': 'Отредактированный пост',
+                'group': self.groups[1].pk,
+            }
+        )
+
+    @override_settings(
+        QUERY_BUDGETS={
+            'app_posts:index': 0
+        }
+    )
+    def test_exceeded_budget_raises(
+        self
+    ):
+        """Превышение бюджета выбрасывает QueryBudgetExceeded."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(
+                reverse(
+                    'app_posts:index'
+                )
+            )
@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from .utils import QueryPlanMixin, find_slow_steps
+
+User = get_user_model()
+
+
+class PostQueryPlanTest(
+    QueryPlanMixin,
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='auth',
+        )
+
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+        Post.objects.bulk_create(
+            Post(
+                text=f'Тестовый пост номер {number}',
+                author=cls.user,
+                group=cls.group if number % 2 else None
+            )
+            for number in range(25)
+        )
+        cls.post = Post.objects.first()
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+        if connection.vendor != 'sqlite':
+            self.skipTest(
+                'EXPLAIN QUERY PLAN есть только в SQLite'
+            )
+
+    def test_feed_views_use_indexes(
+        self
+    ):
+        """Ленты и страница поста не сканируют таблицу и не сортируют."""
+        index = reverse(
+            'app_posts:index'
+        )
+        first_page = self.client.get(
+            index + '?after='
+        ).context['page_obj']
+
+        urls = [
+            index,
+            index + '?page=2',
+            index + f'?after={first_page.next_cursor}',
+            reverse(
+                'app_posts:group_list',
+                kwargs={
+                    'slug': self.group.slug
+                }
+            ),
+            reverse(
+                'app_posts:profile',
+                kwargs={
+                    'username': self.user.username
+                }
+            ),
+            reverse(
+                'app_posts:post_detail',
+                kwargs={
+                    'post_id': self.post.pk
+                }
+            ),
+        ]
+        for url in urls:
+            self.assertQueryPlansUseIndexes(
+                self.client,
+                url
+            )
+
+    def test_helper_detects_full_scan(
+        self
+    ):
+        """Проверка плана ловит запрос без подходящего индекса."""
+        sql = str(
+            Post.objects.order_by(
+                'text'
+            ).query
+        )
+
+        self.assertNotEqual(
+            find_slow_steps(
+                sql
+            ),
+            []
+        )
@@ -0,0 +1,178 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post
+from ..views import NAMBER_OF_POSTS
+
+User = get_user_model()
+
+
+class PostSearchTest(
+    TestCase
+):
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='auth',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост про котов и собак'
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user,
+            text='Пост про котов, котов и еще раз котов'
+        )
+        Post.objects.create(
+            author=cls.user,
+            text='Пост про погоду в городе'
+        )
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+
+    def search(
+        self,
+        query,
+        client=None
+    ):
+        return (client or self.client).get(
+            reverse(
+                'app_posts:search'
+            ),
+            {
+                'q': query
+            }
+        )
+
+    def test_search_returns_ranked_matches(
+        self
+    ):
+        """Поиск находит посты со всеми словами, лучшие первыми."""
+        response = self.search(
+            'котов'
+        )
+
+        self.assertEqual(
+            list(
+                response.context['page_obj']
+            ),
+            [
+                self.other_post,
+                self.post,
+            ]
+        )
+        self.assertEqual(
+            list(
+                self.search(
+                    'котов собак'
+                ).context['page_obj']
+            ),
+            [
+                self.post,
+            ]
+        )
+
+    def test_search_syntax_is_escaped(
+        self
+    ):
+        """Служебный синтаксис FTS5 в запросе не ломает страницу."""
+        for query in ('"котов', 'котов OR', 'NEAR(', '*', ''):
+            with self.subTest(
+                query=query
+            ):
+                self.assertEqual(
+                    self.search(
+                        query
+                    ).status_code,
+                    200
+                )
+
+    def test_index_follows_post_changes(
+        self
+    ):
+        """Индекс обновляется при изменении и удалении поста."""
+        post = Post.objects.get(
+            pk=self.post.pk
+        )
+        post.text = 'Пост про попугаев'
+        post.save()
+        self.assertEqual(
+            list(
+                self.search(
+                    'попугаев'
+                ).context['page_obj']
+            ),
+            [
+                post,
+            ]
+        )
+
+        post.delete()
+        self.assertEqual(
+            len(
+                self.search(
+                    'попугаев'
+                ).context['page_obj']
+            ),
+            0
+        )
+
+    def test_search_pages_keep_query(
+        self
+    ):
+        """Ссылки пагинатора сохраняют поисковый запрос."""
+        Post.objects.bulk_create(
+            Post(
+                author=self.user,
+                text=f'Еще один пост про котов номер {number}'
+            )
+            for number in range(NAMBER_OF_POSTS)
+        )
+
+        self.assertContains(
+            self.search(
+                'котов'
+            ),
+            '?q=%D0%BA%D0%BE%D1%82%D0%BE%D0%B2&amp;page=2'
+        )
+
+    def test_admin_search_uses_index(
+        self
+    ):
+        """Поиск в админке находит посты по индексу."""
+        admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='password'
+        )
+        client = Client()
+        client.force_login(
+            admin
+        )
+
+        response = client.get(
+            reverse(
+                'admin:posts_post_changelist'
+            ),
+            {
+                'q': 'собак'
+            }
+        )
+
+        self.assertEqual(
+            list(
+                response.context['cl'].result_list
+            ),
+            [
+                self.post,
+            ]
+        )
@@ -1,6 +1,9 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from ..models import Group, Post
@@ -36,6 +39,7 @@ class PostPagesTest(
     def setUp(
         self
     ):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(
             self.user
@@ -278,6 +282,11 @@ class GroupViewsTest(TestCase):
             )
         Post.objects.bulk_create(cls.post)
 
+    def setUp(
+        self
+    ):
+        cache.clear()
+
     def test_first_page_contains_ten_records(
         self
     ):
@@ -312,3 +321,263 @@ class GroupViewsTest(TestCase):
             ),
             Post.objects.count() - NAMBER_OF_POSTS
         )
+
+
+class CursorPaginatorViewsTest(TestCase):
+
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='auth',
+        )
+
+        Post.objects.bulk_create(
+            Post(
+                text=f'Тестовый пост номер {number}',
+                author=cls.user
+            )
+            for number in range(13)
+        )
+
+    def get_page_obj(
+        self,
+        query
+    ):
+        cache.clear()
+        response = self.client.get(
+            reverse(
+                'app_posts:index'
+            ) + query
+        )
+        return response.context[
+            'page_obj'
+        ]
+
+    def test_cursor_pages_cover_all_posts_once(
+        self
+    ):
+        """Курсорные страницы отдают все посты по порядку без повторов."""
+        first_page = self.get_page_obj(
+            '?after='
+        )
+        second_page = self.get_page_obj(
+            f'?after={first_page.next_cursor}'
+        )
+
+        self.assertEqual(
+            len(first_page),
+            NAMBER_OF_POSTS
+        )
+        self.assertFalse(
+            first_page.has_previous()
+        )
+        self.assertFalse(
+            second_page.has_next()
+        )
+        self.assertEqual(
+            [post.pk for post in first_page] + [
+                post.pk for post in second_page
+            ],
+            list(
+                Post.objects.order_by(
+                    '-pub_date',
+                    '-pk'
+                ).values_list(
+                    'pk',
+                    flat=True
+                )
+            )
+        )
+
+    def test_cursor_before_returns_previous_page(
+        self
+    ):
+        """Курсор before возвращает на предыдущую страницу."""
+        first_page = self.get_page_obj(
+            '?after='
+        )
+        second_page = self.get_page_obj(
+            f'?after={first_page.next_cursor}'
+        )
+        previous_page = self.get_page_obj(
+            f'?before={second_page.previous_cursor}'
+        )
+
+        self.assertEqual(
+            list(previous_page),
+            list(first_page)
+        )
+
+    def test_invalid_cursor_returns_first_page(
+        self
+    ):
+        """Некорректный курсор отдает первую страницу."""
+        page_obj = self.get_page_obj(
+            '?after=broken'
+        )
+
+        self.assertEqual(
+            len(page_obj),
+            NAMBER_OF_POSTS
+        )
+        self.assertFalse(
+            page_obj.has_previous()
+        )
+
+    def test_cursor_page_does_not_count_rows(
+        self
+    ):
+        """Курсорная страница выбирается без COUNT(*) и OFFSET."""
+        first_page = self.get_page_obj(
+            '?after='
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse(
+                    'app_posts:index'
+                ) + f'?after={first_page.next_cursor}'
+            )
+
+        for query in queries:
+            with self.subTest(
+                sql=query['sql']
+            ):
+                self.assertNotIn(
+                    'COUNT(',
+                    query['sql']
+                )
+                self.assertNotIn(
+                    'OFFSET',
+                    query['sql']
+                )
+
+
+class PaginatorTemplateTest(TestCase):
+
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='auth',
+        )
+
+        Post.objects.bulk_create(
+            Post(
+                text=f'Тестовый пост номер {number}',
+                author=cls.user
+            )
+            for number in range(NAMBER_OF_POSTS * 30)
+        )
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+
+    def test_paginator_renders_page_window(
+        self
+    ):
+        """Шаблон выводит окно номеров страниц, а не все страницы."""
+        response = self.client.get(
+            reverse(
+                'app_posts:index'
+            ) + '?page=15'
+        )
+
+        self.assertContains(
+            response,
+            '?page=30"'
+        )
+        self.assertContains(
+            response,
+            '<span class="page-link">15</span>',
+            html=False
+        )
+        self.assertNotContains(
+            response,
+            '?page=5"'
+        )
+        self.assertNotContains(
+            response,
+            '?page=25"'
+        )
+
+
+class FeedQueriesTest(TestCase):
+
+    @classmethod
+    def setUpClass(
+        cls
+    ):
+        super().setUpClass()
+
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+        cls.authors = [
+            User.objects.create_user(
+                username=f'author{number}',
+                first_name='Имя',
+                last_name=f'Фамилия {number}',
+            )
+            for number in range(NAMBER_OF_POSTS)
+        ]
+        for author in cls.authors:
+            Post.objects.create(
+                author=author,
+                text=f'Тестовый пост автора {author.username}',
+                group=cls.group
+            )
+        cls.post = Post.objects.first()
+
+    def setUp(
+        self
+    ):
+        cache.clear()
+
+    def test_feed_pages_use_one_query_for_posts(
+        self
+    ):
+        """Авторы и группы постов ленты не запрашиваются по одному."""
+        urls = {
+            reverse(
+                'app_posts:index'
+            ): 2,
+            reverse(
+                'app_posts:group_list',
+                kwargs={
+                    'slug': self.group.slug
+                }
+            ): 2,
+            reverse(
+                'app_posts:profile',
+                kwargs={
+                    'username': self.authors[0].username
+                }
+            ): 2,
+            reverse(
+                'app_posts:post_detail',
+                kwargs={
+                    'post_id': self.post.pk
+                }
+            ): 1,
+        }
+        for url, queries in urls.items():
+            with self.subTest(
+                url=url
+            ):
+                with self.assertNumQueries(queries):
+                    self.client.get(
+                        url
+                    )
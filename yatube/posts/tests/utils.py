@@ -0,0 +1,64 @@
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Полный проход по таблице без индекса: "SCAN posts_post"
+# (в старых версиях SQLite — "SCAN TABLE posts_post").
+FULL_SCAN = re.compile(
+    r'^SCAN (TABLE )?\S+$'
+)
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def explain_query_plan(
+    sql
+):
+    """Возвращает шаги EXPLAIN QUERY PLAN для SQL-запроса."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'EXPLAIN QUERY PLAN {sql}'
+        )
+        return [
+            row[-1] for row in cursor.fetchall()
+        ]
+
+
+def find_slow_steps(
+    sql
+):
+    """Шаги плана с полным сканированием таблицы или временной сортировкой."""
+    return [
+        step for step in explain_query_plan(
+            sql
+        )
+        if FULL_SCAN.match(step) or TEMP_SORT in step
+    ]
+
+
+class QueryPlanMixin:
+    """Проверки планов запросов, которые выполняет view."""
+
+    def assertQueryPlansUseIndexes(
+        self,
+        client,
+        url
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            client.get(
+                url
+            )
+        for query in queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            with self.subTest(
+                url=url,
+                sql=query['sql']
+            ):
+                self.assertEqual(
+                    find_slow_steps(
+                        query['sql']
+                    ),
+                    [],
+                    f'Запрос страницы {url} не использует индекс'
+                )
@@ -29,6 +29,16 @@ urlpatterns = [
         views.post_detail,
         name="post_detail"
     ),
+    path(
+        "search/",
+        views.search,
+        name="search"
+    ),
+    path(
+        "export/",
+        views.export_posts,
+        name="export"
+    ),
     path(
         "create/",
         views.post_create,
@@ -1,28 +1,80 @@
+from urllib.parse import urlencode
+
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.page_cache import add_scopes, cached_page
+from core.paginator import CachedCountPaginator, CursorPaginator
+from core.write_queue import run_write
+
+from . import export
 from .forms import PostForm
-from .models import Group, Post, User
+from .models import AuthorCounter, Group, Post, User
+from .page_cache import (detail_page_scopes, group_page_scopes,
+                         index_page_scopes, profile_page_scopes,
+                         profile_scope)
 
 NAMBER_OF_POSTS = 10
 
 
-def index(
-    request
+def paginate(
+    request,
+    post_list,
+    count=None
 ):
-    post_list = Post.objects.select_related(
-        'group'
-    ).all()
-    paginator = Paginator(
-        post_list,
-        NAMBER_OF_POSTS
+    """Возвращает страницу ленты по номеру ?page= или курсору ?after=/?before=.
+
+    Курсорный режим не считает COUNT(*) и не использует OFFSET.
+    В постраничном режиме число постов берется из count, если оно
+    известно заранее, иначе из кэша.
+    """
+    after = request.GET.get(
+        "after"
     )
-    page_number = request.GET.get(
-        "page"
+    before = request.GET.get(
+        "before"
     )
-    page_obj = paginator.get_page(
-        page_number
+    if after is not None or before is not None:
+        return CursorPaginator(
+            post_list,
+            NAMBER_OF_POSTS
+        ).get_cursor_page(
+            after,
+            before
+        )
+    return CachedCountPaginator(
+        post_list,
+        NAMBER_OF_POSTS,
+        count=count
+    ).get_page(
+        request.GET.get(
+            "page"
+        )
+    )
+
+
+def author_posts_count(
+    author
+):
+    """Число постов автора из счетчика, без COUNT(*) по таблице постов."""
+    try:
+        return author.post_counter.posts_count
+    except AuthorCounter.DoesNotExist:
+        return author.posts.count()
+
+
+@cached_page(
+    index_page_scopes
+)
+def index(
+    request
+):
+    post_list = Post.objects.feed()
+    page_obj = paginate(
+        request,
+        post_list
     )
     template = "posts/index.html"
     title = "Последние обновления на сайте"
@@ -37,6 +89,9 @@ def index(
     )
 
 
+@cached_page(
+    group_page_scopes
+)
 def group_posts(
     request,
     slug
@@ -46,18 +101,11 @@ def group_posts(
         Group,
         slug=slug
     )
-    post_list = group.posts.order_by(
-        "-pub_date"
-    )
-    paginator = Paginator(
+    post_list = group.posts.feed()
+    page_obj = paginate(
+        request,
         post_list,
-        NAMBER_OF_POSTS
-    )
-    page_number = request.GET.get(
-        "page"
-    )
-    page_obj = paginator.get_page(
-        page_number
+        count=group.posts_count
     )
     context = {
         "group": group,
@@ -70,31 +118,31 @@ def group_posts(
     )
 
 
+@cached_page(
+    profile_page_scopes
+)
 def profile(
     request,
     username
 ):
     author = get_object_or_404(
-        User,
+        User.objects.select_related(
+            'post_counter'
+        ),
         username=username
     )
-    post_list = Post.objects.filter(
+    post_list = Post.objects.feed().filter(
         author=author.id
-    ).order_by(
-        "-pub_date"
     )
-    paginator = Paginator(
-        post_list,
-        NAMBER_OF_POSTS
+    count = author_posts_count(
+        author
     )
-    page_number = request.GET.get(
-        "page"
-    )
-    page_obj = paginator.get_page(
-        page_number
+    page_obj = paginate(
+        request,
+        post_list,
+        count=count
     )
     template = "posts/profile.html"
-    count = post_list.count()
     context = {
         "post_list": post_list,
         "author": author,
@@ -108,18 +156,32 @@ def profile(
     )
 
 
+@cached_page(
+    detail_page_scopes
+)
 def post_detail(
     request,
     post_id
 ):
     one_post = get_object_or_404(
-        Post,
+        Post.objects.select_related(
+            'author__post_counter',
+            'group'
+        ),
         pk=post_id
     )
-    post_list = Post.objects.filter(
-        pk=post_id
+    post_list = [
+        one_post
+    ]
+    count = author_posts_count(
+        one_post.author
+    )
+    add_scopes(
+        request,
+        profile_scope(
+            one_post.author.username
+        )
     )
-    count = one_post.author.posts.count()
     template = "posts/post_detail.html"
     context = {
         'one_post': one_post,
@@ -133,6 +195,81 @@ def post_detail(
     )
 
 
+def search(
+    request
+):
+    query = request.GET.get(
+        "q",
+        ""
+    ).strip()
+    post_list = Post.objects.feed().search(
+        query
+    )
+    page_obj = CachedCountPaginator(
+        post_list,
+        NAMBER_OF_POSTS
+    ).get_page(
+        request.GET.get(
+            "page"
+        )
+    )
+    context = {
+        "query": query,
+        "page_obj": page_obj,
+        "paginator_query": urlencode(
+            {
+                "q": query
+            }
+        ) + "&",
+    }
+    return render(
+        request,
+        "posts/search.html",
+        context
+    )
+
+
+@staff_member_required
+def export_posts(
+    request
+):
+    """Потоковая выгрузка постов для персонала.
+
+    Параметры: format (jsonl или csv), gzip=1, group, author, since, until.
+    """
+    export_format = request.GET.get(
+        "format",
+        "jsonl"
+    )
+    gzip = request.GET.get(
+        "gzip"
+    ) == "1"
+    try:
+        chunks = export.export(
+            export_format,
+            gzip,
+            group=request.GET.get("group"),
+            author=request.GET.get("author"),
+            since=request.GET.get("since"),
+            until=request.GET.get("until")
+        )
+    except export.ExportError as error:
+        return HttpResponseBadRequest(
+            str(error)
+        )
+    filename = f"posts.{export_format}"
+    content_type = export.FORMATS[export_format]
+    if gzip:
+        filename += ".gz"
+        content_type = "application/gzip"
+    response = StreamingHttpResponse(
+        chunks,
+        content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 @login_required
 def post_create(
     request
@@ -146,7 +283,9 @@ def post_create(
             commit=False
         )
         post.author = request.user
-        post.save()
+        run_write(
+            post.save
+        )
         return redirect(
             "app_posts:profile",
             username=post.author
@@ -166,16 +305,21 @@ def post_edit(
     post_id
 ):
     post = get_object_or_404(
-        Post,
+        Post.objects.select_related(
+            'author',
+            'group'
+        ),
         pk=post_id
     )
     form = PostForm(
         request.POST or None,
         instance=post
     )
-    if post.author == request.user:
+    if post.author_id == request.user.id:
         if form.is_valid():
-            form.save()
+            run_write(
+                form.save
+            )
             return redirect(
                 "app_posts:post_detail",
                 post_id
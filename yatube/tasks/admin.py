@@ -0,0 +1,94 @@
+from django.contrib import admin
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .models import Task
+
+
+class TaskAdmin(
+    admin.ModelAdmin
+):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'finished_at',
+    )
+    list_filter = (
+        'status',
+        'name',
+    )
+    search_fields = (
+        'name',
+        'last_error',
+    )
+    readonly_fields = (
+        'claim',
+        'created_at',
+        'started_at',
+        'finished_at',
+        'last_error',
+    )
+    actions = (
+        'retry',
+    )
+
+    def retry(
+        self,
+        request,
+        queryset
+    ):
+        count = queryset.exclude(
+            status=Task.RUNNING
+        ).update(
+            status=Task.QUEUED,
+            run_at=timezone.now(),
+            attempts=0,
+            claim=''
+        )
+        self.message_user(
+            request,
+            f'Поставлено в очередь: {count}'
+        )
+    retry.short_description = 'Выполнить заново'
+
+    def changelist_view(
+        self,
+        request,
+        extra_context=None
+    ):
+        # Сводка над списком: сколько задач в каждом статусе и насколько
+        # очередь отстает от расписания.
+        counts = dict(
+            Task.objects.values_list(
+                'status'
+            ).annotate(
+                Count('pk')
+            ).order_by()
+        )
+        oldest = Task.objects.filter(
+            status=Task.QUEUED,
+            run_at__lte=timezone.now()
+        ).aggregate(
+            oldest=Min('run_at')
+        )['oldest']
+        extra_context = {
+            **(extra_context or {}),
+            'task_counts': [
+                (label, counts.get(status, 0))
+                for status, label in Task.STATUSES
+            ],
+            'task_lag': timezone.now() - oldest if oldest else None,
+        }
+        return super().changelist_view(
+            request,
+            extra_context
+        )
+
+
+admin.site.register(
+    Task,
+    TaskAdmin
+)
@@ -0,0 +1,23 @@
+from django.core.mail import send_mail
+
+from .queue import task
+
+
+@task(
+    max_attempts=5
+)
+def send_email(
+    subject,
+    message,
+    from_email,
+    recipient_list,
+    html_message=None
+):
+    """Отправка письма вне запроса: медленный SMTP не задерживает ответ."""
+    send_mail(
+        subject,
+        message,
+        from_email,
+        recipient_list,
+        html_message=html_message
+    )
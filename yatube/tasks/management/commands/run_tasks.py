@@ -0,0 +1,124 @@
+import logging
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.queue import claim, run_task
+
+logger = logging.getLogger(
+    __name__
+)
+
+
+class Command(
+    BaseCommand
+):
+    help = (
+        'Выполняет фоновые задачи из таблицы tasks_task в пуле потоков '
+        'или процессов.'
+    )
+
+    def add_arguments(
+        self,
+        parser
+    ):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Сколько задач выполняется одновременно.'
+        )
+        parser.add_argument(
+            '--processes',
+            action='store_true',
+            help='Пул процессов вместо потоков: для задач, нагружающих CPU.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить задачи, которым уже пора, и выйти.'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.TASKS_POLL_INTERVAL,
+            help='Пауза между проверками пустой очереди, в секундах.'
+        )
+
+    def handle(
+        self,
+        *args,
+        **options
+    ):
+        if options['processes']:
+            # Дочерние процессы не должны унаследовать открытые
+            # соединения родителя.
+            connections.close_all()
+            executor = ProcessPoolExecutor
+        else:
+            executor = ThreadPoolExecutor
+        with executor(max_workers=options['concurrency']) as pool:
+            try:
+                done = self.work(
+                    pool,
+                    options
+                )
+            except KeyboardInterrupt:
+                # Захваченные задачи дорабатывают при выходе из with.
+                self.stderr.write(
+                    'Остановка: ждем задачи, которые уже выполняются.'
+                )
+                return
+        if options['verbosity'] >= 1:
+            self.stdout.write(
+                f'Задач выполнено: {done}'
+            )
+
+    def work(
+        self,
+        pool,
+        options
+    ):
+        # Задачи, которые выполняются: {future: id задачи}.
+        running = {}
+        done = 0
+        while True:
+            free = options['concurrency'] - len(running)
+            ids = claim(free) if free else []
+            for task_id in ids:
+                running[pool.submit(
+                    run_task,
+                    task_id
+                )] = task_id
+            if not running:
+                if options['once']:
+                    return done
+                time.sleep(
+                    options['poll_interval']
+                )
+                continue
+            finished, _ = wait(
+                running,
+                timeout=None if ids else options['poll_interval'],
+                return_when=FIRST_COMPLETED
+            )
+            for future in finished:
+                task_id = running.pop(
+                    future
+                )
+                # Ошибки задач run_task записывает в таблицу; здесь
+                # остаются сбои самой очереди: задачу удалили, база
+                # занята. Они не должны останавливать остальные задачи.
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception(
+                        'Задача %s не выполнена',
+                        task_id
+                    )
+                    continue
+                done += 1
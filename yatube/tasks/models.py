@@ -0,0 +1,77 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(
+    models.Model
+):
+    """Вызов функции, отмеченной tasks.queue.task, в процессе run_tasks."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        max_length=200
+    )
+    # Аргументы вызова в JSON: {"args": [...], "kwargs": {...}}.
+    payload = models.TextField()
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now
+    )
+    attempts = models.PositiveIntegerField(
+        default=0
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=3
+    )
+    # Метка захвата: по ней worker находит задачи, которые взял он.
+    claim = models.CharField(
+        max_length=64,
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(
+        blank=True
+    )
+
+    class Meta:
+        ordering = [
+            'run_at'
+        ]
+        indexes = [
+            models.Index(
+                fields=[
+                    'status',
+                    'run_at'
+                ],
+                name='task_status_run_at_idx'
+            ),
+        ]
+
+    def __str__(
+        self
+    ):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,244 @@
+"""Очередь фоновых задач в таблице SQLite.
+
+Функция, отмеченная декоратором task, получает методы delay() и
+schedule(): они сохраняют вызов в таблицу Task, а команда run_tasks
+выполняет его в пуле потоков или процессов. Упавшая задача
+повторяется с растущей паузой, пока не исчерпает max_attempts.
+"""
+import json
+import traceback
+import uuid
+from datetime import timedelta
+from functools import update_wrapper
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+
+class TaskFunction:
+    def __init__(
+        self,
+        func,
+        max_attempts,
+        retry_delay
+    ):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        update_wrapper(
+            self,
+            func
+        )
+
+    def __call__(
+        self,
+        *args,
+        **kwargs
+    ):
+        return self.func(
+            *args,
+            **kwargs
+        )
+
+    def delay(
+        self,
+        *args,
+        **kwargs
+    ):
+        """Ставит вызов в очередь на ближайшее время."""
+        return self.schedule(
+            timezone.now(),
+            *args,
+            **kwargs
+        )
+
+    def schedule(
+        self,
+        run_at,
+        *args,
+        **kwargs
+    ):
+        """Ставит вызов в очередь на время run_at.
+
+        При TASKS_EAGER вызов выполняется сразу, без очереди.
+        """
+        payload = json.dumps(
+            {
+                'args': args,
+                'kwargs': kwargs,
+            },
+            ensure_ascii=False
+        )
+        if settings.TASKS_EAGER:
+            self.func(
+                *args,
+                **kwargs
+            )
+            return None
+        return Task.objects.create(
+            name=self.name,
+            payload=payload,
+            run_at=run_at,
+            max_attempts=self.max_attempts
+        )
+
+
+def task(
+    max_attempts=3,
+    retry_delay=None
+):
+    """Делает функцию фоновой задачей.
+
+    Аргументы вызова сохраняются в JSON, поэтому должны быть простыми
+    значениями: строками, числами, списками, словарями. retry_delay —
+    пауза перед первым повтором в секундах, по умолчанию
+    TASKS_RETRY_DELAY; каждый следующий повтор ждет вдвое дольше.
+    """
+    def decorator(
+        func
+    ):
+        return TaskFunction(
+            func,
+            max_attempts,
+            retry_delay
+        )
+    return decorator
+
+
+def claim(
+    limit
+):
+    """Захватывает до limit задач, которым пора выполняться.
+
+    Захват — один UPDATE по статусу, поэтому задачу получает только
+    один worker, даже если их несколько. Задачи, которые выполняются
+    дольше TASKS_TIMEOUT, считаются брошенными и захватываются снова.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = Q(
+        status=Task.QUEUED,
+        run_at__lte=now
+    ) | Q(
+        status=Task.RUNNING,
+        started_at__lt=now - timedelta(
+            seconds=settings.TASKS_TIMEOUT
+        )
+    )
+    ids = list(
+        Task.objects.filter(
+            due
+        ).order_by(
+            'run_at'
+        ).values_list(
+            'pk',
+            flat=True
+        )[:limit]
+    )
+    if not ids:
+        return []
+    # Условие повторяется в UPDATE: задачи, которые успел захватить
+    # другой worker, под него уже не подходят.
+    Task.objects.filter(
+        due,
+        pk__in=ids
+    ).update(
+        status=Task.RUNNING,
+        claim=token,
+        started_at=now
+    )
+    return list(
+        Task.objects.filter(
+            claim=token
+        ).values_list(
+            'pk',
+            flat=True
+        )
+    )
+
+
+def retry_delay(
+    task_function,
+    attempts
+):
+    delay = task_function.retry_delay
+    if delay is None:
+        delay = settings.TASKS_RETRY_DELAY
+    return timedelta(
+        seconds=delay * 2 ** (attempts - 1)
+    )
+
+
+def run_task(
+    task_id
+):
+    """Выполняет захваченную задачу и записывает результат.
+
+    Вызывается из пула run_tasks, в том числе в дочернем процессе,
+    поэтому принимает только id и сама закрывает соединения с базой.
+    Если задачу, пока она выполнялась дольше TASKS_TIMEOUT, захватил
+    другой worker, результат не записывается и возвращается None.
+    """
+    close_old_connections()
+    try:
+        task_row = Task.objects.get(
+            pk=task_id
+        )
+        token = task_row.claim
+        task_row.attempts += 1
+        task_function = None
+        try:
+            task_function = import_string(
+                task_row.name
+            )
+            if not isinstance(task_function, TaskFunction):
+                raise TypeError(
+                    f'{task_row.name} не отмечена декоратором task'
+                )
+            payload = json.loads(
+                task_row.payload
+            )
+            with transaction.atomic():
+                task_function(
+                    *payload['args'],
+                    **payload['kwargs']
+                )
+        except Exception:
+            task_row.last_error = traceback.format_exc()
+            if (
+                isinstance(task_function, TaskFunction)
+                and task_row.attempts < task_row.max_attempts
+            ):
+                task_row.status = Task.QUEUED
+                task_row.run_at = timezone.now() + retry_delay(
+                    task_function,
+                    task_row.attempts
+                )
+            else:
+                task_row.status = Task.FAILED
+                task_row.finished_at = timezone.now()
+        else:
+            task_row.status = Task.DONE
+            task_row.finished_at = timezone.now()
+            task_row.last_error = ''
+        # Запись только под своим захватом: иначе устаревший worker
+        # затрет статус задачи, которую уже выполняет другой.
+        updated = Task.objects.filter(
+            pk=task_row.pk,
+            claim=token
+        ).update(
+            attempts=task_row.attempts,
+            status=task_row.status,
+            run_at=task_row.run_at,
+            finished_at=task_row.finished_at,
+            last_error=task_row.last_error
+        )
+        return task_row.status if updated else None
+    finally:
+        close_old_connections()
@@ -0,0 +1,315 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Task
+from ..queue import claim, run_task, task
+
+User = get_user_model()
+
+calls = []
+
+
+@task()
+def remember(
+    value
+):
+    calls.append(
+        value
+    )
+
+
+@task(
+    max_attempts=2,
+    retry_delay=10
+)
+def broken():
+    raise ValueError('сбой')
+
+
+@task()
+def outlive_timeout():
+    """Выполняется дольше TASKS_TIMEOUT: задачу захватывают снова."""
+    Task.objects.update(
+        started_at=timezone.now() - timedelta(minutes=2)
+    )
+    claim(10)
+
+
+class RunTasksTest(
+    TransactionTestCase
+):
+    def setUp(
+        self
+    ):
+        calls.clear()
+
+    def test_delayed_task_runs_in_worker(
+        self
+    ):
+        """delay() только сохраняет вызов, выполняет его run_tasks."""
+        remember.delay(
+            'значение'
+        )
+        self.assertEqual(
+            calls,
+            []
+        )
+
+        call_command(
+            'run_tasks',
+            once=True,
+            concurrency=2,
+            verbosity=0
+        )
+
+        self.assertEqual(
+            calls,
+            ['значение']
+        )
+        self.assertEqual(
+            Task.objects.get().status,
+            Task.DONE
+        )
+
+    def test_worker_survives_deleted_task(
+        self
+    ):
+        """Задача, удаленная после захвата, не останавливает worker."""
+        deleted = remember.delay(
+            'удаленная'
+        )
+        remember.delay(
+            'следующая'
+        )
+
+        def delete_then_run(
+            task_id
+        ):
+            # Сотрудник удалил задачу в админке, пока она ждала потока.
+            Task.objects.filter(
+                pk=deleted.pk
+            ).delete()
+            return run_task(
+                task_id
+            )
+
+        with mock.patch(
+            'tasks.management.commands.run_tasks.run_task',
+            delete_then_run
+        ), self.assertLogs(
+            'tasks.management.commands.run_tasks',
+            'ERROR'
+        ) as logs:
+            call_command(
+                'run_tasks',
+                once=True,
+                concurrency=1,
+                verbosity=0
+            )
+
+        self.assertIn(
+            f'Задача {deleted.pk} не выполнена',
+            logs.output[0]
+        )
+        self.assertEqual(
+            calls,
+            ['следующая']
+        )
+        self.assertEqual(
+            Task.objects.get().status,
+            Task.DONE
+        )
+
+    def test_scheduled_task_waits(
+        self
+    ):
+        """Задача с run_at в будущем не выполняется раньше времени."""
+        remember.schedule(
+            timezone.now() + timedelta(hours=1),
+            'позже'
+        )
+
+        call_command(
+            'run_tasks',
+            once=True,
+            verbosity=0
+        )
+
+        self.assertEqual(
+            calls,
+            []
+        )
+        self.assertEqual(
+            Task.objects.get().status,
+            Task.QUEUED
+        )
+
+
+class TaskQueueTest(
+    TestCase
+):
+    def test_failed_task_is_retried_with_backoff(
+        self
+    ):
+        """Упавшая задача повторяется позже, затем помечается ошибкой."""
+        broken.delay()
+        task_id, = claim(10)
+
+        start = timezone.now()
+        self.assertEqual(
+            run_task(task_id),
+            Task.QUEUED
+        )
+        row = Task.objects.get()
+        self.assertGreaterEqual(
+            row.run_at,
+            start + timedelta(seconds=10)
+        )
+        self.assertIn(
+            'ValueError',
+            row.last_error
+        )
+        self.assertEqual(
+            claim(10),
+            []
+        )
+
+        self.assertEqual(
+            run_task(task_id),
+            Task.FAILED
+        )
+        self.assertEqual(
+            Task.objects.get().attempts,
+            2
+        )
+
+    def test_claim_takes_task_once(
+        self
+    ):
+        """Захваченную задачу не получает второй worker."""
+        remember.delay(
+            1
+        )
+
+        self.assertEqual(
+            len(claim(10)),
+            1
+        )
+        self.assertEqual(
+            claim(10),
+            []
+        )
+
+    @override_settings(
+        TASKS_TIMEOUT=60
+    )
+    def test_stale_task_is_claimed_again(
+        self
+    ):
+        """Задачу, брошенную упавшим worker, захватывают снова."""
+        remember.delay(
+            1
+        )
+        task_id, = claim(10)
+        Task.objects.update(
+            started_at=timezone.now() - timedelta(minutes=2)
+        )
+
+        self.assertEqual(
+            claim(10),
+            [task_id]
+        )
+
+    @override_settings(
+        TASKS_TIMEOUT=60
+    )
+    def test_stale_worker_does_not_overwrite_reclaimed_task(
+        self
+    ):
+        """Worker, у которого задачу захватили снова, не пишет результат."""
+        outlive_timeout.delay()
+        task_id, = claim(10)
+        token = Task.objects.get().claim
+
+        self.assertIsNone(
+            run_task(task_id)
+        )
+        row = Task.objects.get()
+        self.assertNotEqual(
+            row.claim,
+            token
+        )
+        self.assertEqual(
+            (row.status, row.attempts),
+            (Task.RUNNING, 0)
+        )
+
+    def test_password_reset_mail_is_queued(
+        self
+    ):
+        """Письмо сброса пароля отправляется не в запросе, а задачей."""
+        User.objects.create_user(
+            username='auth',
+            email='auth@example.com',
+            password='password-42'
+        )
+
+        response = self.client.post(
+            reverse('users:password_reset'),
+            {'email': 'auth@example.com'}
+        )
+
+        self.assertRedirects(
+            response,
+            reverse('password_reset_done')
+        )
+        self.assertEqual(
+            len(mail.outbox),
+            0
+        )
+        task_id, = claim(10)
+        run_task(
+            task_id
+        )
+        self.assertEqual(
+            len(mail.outbox),
+            1
+        )
+        self.assertEqual(
+            mail.outbox[0].to,
+            ['auth@example.com']
+        )
+
+    def test_admin_dashboard(
+        self
+    ):
+        """Список задач в админке показывает сводку по статусам."""
+        admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='password-42'
+        )
+        self.client.force_login(
+            admin
+        )
+        broken.delay()
+
+        response = self.client.get(
+            reverse('admin:tasks_task_changelist')
+        )
+
+        self.assertContains(
+            response,
+            'task-dashboard'
+        )
+        self.assertEqual(
+            response.context['task_counts'][0],
+            ('В очереди', 1)
+        )
@@ -1,6 +1,9 @@
 from django import forms
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+from django.template import loader
+
+from tasks.mail import send_email
 
 from .models import Contact
 
@@ -33,3 +36,45 @@ class CreationForm(
             'username',
             'email'
         )
+
+
+class QueuedPasswordResetForm(
+    PasswordResetForm
+):
+    """Письмо для сброса пароля уходит через очередь задач.
+
+    Письмо рендерится в запросе (шаблонам нужен контекст со ссылкой),
+    а отправляет его run_tasks: ответ не ждет SMTP-сервер.
+    """
+
+    def send_mail(
+        self,
+        subject_template_name,
+        email_template_name,
+        context,
+        from_email,
+        to_email,
+        html_email_template_name=None
+    ):
+        subject = ''.join(
+            loader.render_to_string(
+                subject_template_name,
+                context
+            ).splitlines()
+        )
+        html_message = None
+        if html_email_template_name is not None:
+            html_message = loader.render_to_string(
+                html_email_template_name,
+                context
+            )
+        send_email.delay(
+            subject,
+            loader.render_to_string(
+                email_template_name,
+                context
+            ),
+            from_email,
+            [to_email],
+            html_message=html_message
+        )
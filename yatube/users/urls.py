@@ -1,7 +1,9 @@
-from django.contrib.auth.views import LoginView, LogoutView
-from django.urls import path
+from django.contrib.auth.views import (LoginView, LogoutView,
+                                       PasswordResetView)
+from django.urls import path, reverse_lazy
 
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -25,4 +27,12 @@ urlpatterns = [
         ),
         name='login'
     ),
+    path(
+        'password_reset/',
+        PasswordResetView.as_view(
+            form_class=QueuedPasswordResetForm,
+            success_url=reverse_lazy('password_reset_done')
+        ),
+        name='password_reset'
+    ),
 ]
@@ -1,6 +1,9 @@
+from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 
+from core.write_queue import run_write
+
 from .forms import CreationForm
 
 
@@ -12,3 +15,14 @@ class SignUp(
         'app_posts:index'
     )
     template_name = 'users/signup.html'
+
+    def form_valid(
+        self,
+        form
+    ):
+        self.object = run_write(
+            form.save
+        )
+        return HttpResponseRedirect(
+            self.get_success_url()
+        )
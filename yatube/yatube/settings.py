@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'tasks.apps.TasksConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -49,7 +50,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Метрики стоят первыми, чтобы время ответа включало все остальное.
+    'core.metrics.MetricsMiddleware',
+    # Заголовки безопасности и редирект на HTTPS нужны всем ответам,
+    # в том числе статике и готовым страницам ниже.
     'django.middleware.security.SecurityMiddleware',
+    # Статика отдается раньше подсчета запросов, сессий и пользователя.
+    'core.staticfiles.StaticFilesMiddleware',
+    # Статические страницы тоже: сессия читается, только чтобы собрать
+    # меню пользователя в шапке.
+    'core.prerender.PrerenderedPagesMiddleware',
+    'core.query_budget.QueryBudgetMiddleware',
+    'core.db_router.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -60,10 +72,15 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 
+# Тесты пишут кэши и метрики во временный каталог, а не в RUNTIME_DIR.
+TEST_RUNNER = 'core.testing.TestRunner'
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Шаблоны Django с замером времени рендера для метрик.
+        'BACKEND': 'core.metrics.DjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -88,9 +105,109 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        # Соединение живет между запросами: не приходится каждый раз
+        # открывать файл и выполнять SQLITE_PRAGMAS.
+        'CONN_MAX_AGE': 60,
+    },
+    # Локальная замена реплики: копия default, которую обновляет
+    # команда refresh_replica (core.replica). Файл реплики подменяется
+    # целиком, поэтому ее соединения не переиспользуются между запросами,
+    # а журнал остается обычным: файл -wal пережил бы подмену.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        'SQLITE_PRAGMAS': {
+            'journal_mode': 'delete',
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+# PRAGMA для каждого нового соединения SQLite (core.sqlite); ключ
+# SQLITE_PRAGMAS в настройках базы дополняет их. WAL позволяет читать
+# во время записи, а synchronous=NORMAL в режиме WAL не ломает базу
+# при сбое питания, теряются лишь последние транзакции.
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    # Отрицательное значение — размер в КиБ: 64 МиБ на соединение.
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
+DATABASE_ROUTERS = [
+    'core.db_router.ReplicaRouter',
+]
+
+# Реплики, с которых читают GET-запросы к REPLICA_READ_VIEWS
+# (core.db_router). Пока список пуст, все читают из default.
+DATABASE_REPLICAS = []
+REPLICA_READ_VIEWS = (
+    'posts.views',
+    'posts.api',
+    'about.views',
+)
+# Сколько секунд после записи клиент читает из default. Должно быть
+# больше периода обновления реплик.
+REPLICA_PIN_SECONDS = 60
+
+# Очередь записей core.write_queue: один писатель на процесс, до
+# WRITE_QUEUE_BATCH_SIZE записей в одной транзакции и до
+# WRITE_QUEUE_RETRIES повторов, если база занята другим процессом.
+# Пауза перед повтором начинается с WRITE_QUEUE_BACKOFF секунд и
+# удваивается. Запрос ждет свою запись не дольше WRITE_QUEUE_TIMEOUT
+# секунд.
+WRITE_QUEUE_ENABLED = True
+WRITE_QUEUE_BATCH_SIZE = 20
+WRITE_QUEUE_RETRIES = 5
+WRITE_QUEUE_BACKOFF = 0.05
+WRITE_QUEUE_TIMEOUT = 30
+
+# Файлы, которые процессы сервера пишут во время работы: кэши и общие
+# метрики (METRICS_SHARED_FILE). Тесты подменяют каталог на временный
+# (core.testing).
+RUNTIME_DIR = os.environ.get(
+    'YATUBE_RUNTIME_DIR',
+    os.path.join(BASE_DIR, 'runtime')
+)
+
+# Кэши общие для всех процессов WSGI-сервера и команд: версии страниц,
+# сессии и пользователи, сброшенные в одном процессе, сразу сбрасываются
+# и в остальных. Сессии лежат в отдельном кэше, чтобы сброс основного
+# (например, cache.clear() в тестах) не разлогинивал пользователей.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(RUNTIME_DIR, 'cache', 'default'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(RUNTIME_DIR, 'cache', 'sessions'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
+# Сессия читается из кэша; база нужна, только если записи в кэше нет
+# (например, ее вытеснили).
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Пользователь запроса берется из кэша (core.auth) и сбрасывается при
+# сохранении пользователя, в том числе при смене пароля.
+AUTHENTICATION_BACKENDS = [
+    'core.auth.CachedModelBackend',
+]
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -134,6 +251,11 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+# collectstatic добавляет хэш к именам файлов и пишет сжатые копии .gz
+# и .br, а core.staticfiles.StaticFilesMiddleware отдает их из
+# STATIC_ROOT с кэшированием на год.
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStorage'
 
 
 LOGIN_URL = 'users:login'
@@ -142,3 +264,93 @@ LOGIN_REDIRECT_URL = 'app_posts:index'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Кэш числа объектов для CachedCountPaginator
+PAGINATOR_COUNT_CACHE_TIMEOUT = 60 * 60
+PAGINATOR_APPROXIMATE_COUNT_THRESHOLD = 100000
+PAGINATOR_APPROXIMATE_COUNT_TIMEOUT = 60 * 5
+
+# Бюджеты SQL-запросов на страницу для core.query_budget.QueryBudgetMiddleware
+# (с учетом запросов сессии и пользователя)
+QUERY_BUDGETS = {
+    'app_posts:index': 4,
+    'app_posts:group_list': 4,
+    'app_posts:profile': 4,
+    'app_posts:post_detail': 3,
+    'app_posts:post_create': 7,
+    'app_posts:post_edit': 9,
+    'app_posts:search': 4,
+    'about:author': 2,
+    'about:tech': 2,
+    'api:post_list': 4,
+    'api:group_posts': 4,
+    'api:profile_posts': 4,
+    'api:post_detail': 3,
+}
+QUERY_BUDGET_RAISE = DEBUG
+
+# Время жизни страниц в кэше core.page_cache.cached_page
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Страницы без данных из базы, которые отдаются заранее отрендеренными
+# (core.prerender). Команда prerender_pages сохраняет их в
+# PRERENDER_ROOT; раз в PRERENDER_CHECK_INTERVAL секунд процесс
+# проверяет, не изменились ли шаблоны, и при необходимости рендерит
+# страницы заново.
+PRERENDERED_PAGES = (
+    'about:author',
+    'about:tech',
+)
+PRERENDER_ROOT = os.path.join(BASE_DIR, 'prerendered')
+PRERENDER_CHECK_INTERVAL = 2
+
+# Фоновые задачи (tasks.queue). При TASKS_EAGER задачи выполняются сразу
+# в запросе. Упавшая задача повторяется через TASKS_RETRY_DELAY секунд,
+# каждый следующий раз вдвое позже; задача, которая выполняется дольше
+# TASKS_TIMEOUT секунд, считается брошенной и захватывается заново.
+TASKS_EAGER = False
+TASKS_RETRY_DELAY = 30
+TASKS_TIMEOUT = 60 * 10
+TASKS_POLL_INTERVAL = 1
+
+# Метрики запросов (core.metrics) на странице /metrics. Границы корзин
+# гистограммы времени ответа — в секундах. Сборщик метрик без сессии
+# передает METRICS_TOKEN в заголовке Authorization: Bearer.
+METRICS_ENABLED = True
+METRICS_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Общий для процессов WSGI-сервера файл метрик (core.shared_metrics):
+# у каждого процесса своя область из METRICS_SHARED_REGIONS. Коды ответа
+# не из METRICS_STATUS_CODES учитываются как status="other". Без файла
+# (None) /metrics показывает только процесс, ответивший на запрос.
+METRICS_SHARED_FILE = os.path.join(RUNTIME_DIR, 'metrics.mmap')
+METRICS_SHARED_REGIONS = 64
+METRICS_STATUS_CODES = (
+    200,
+    201,
+    204,
+    301,
+    302,
+    304,
+    400,
+    401,
+    403,
+    404,
+    405,
+    500,
+    502,
+    503,
+)
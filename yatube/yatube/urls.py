@@ -17,6 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from core.metrics import metrics_view
+
 urlpatterns = [
     path(
         '',
@@ -25,6 +27,13 @@ urlpatterns = [
             namespace='app_posts'
         )
     ),
+    path(
+        'api/v1/',
+        include(
+            'posts.api_urls',
+            namespace='api'
+        )
+    ),
     path(
         'admin/',
         admin.site.urls
@@ -42,6 +51,11 @@ urlpatterns = [
             'django.contrib.auth.urls'
         )
     ),
+    path(
+        'metrics',
+        metrics_view,
+        name='metrics'
+    ),
     path(
         'about/',
         include(